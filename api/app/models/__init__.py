@@ -1,14 +1,21 @@
 """
 数据模型包
 """
-from .request_models import SolarRequest, HoroscopeRequest, GenderType, LangueType, TimeIndexType
+from .request_models import SolarRequest, LunarRequest, HoroscopeRequest, HoroscopeSeriesRequest, SimilarRequest, CompatibleRequest, SurroundedPalacesRequest, GenderType, LangueType, TimeIndexType, SimilarityMetricType, HoroscopeStepType
 from .response_models import APIResponse
 
 __all__ = [
     'SolarRequest',
+    'LunarRequest',
     'HoroscopeRequest',
+    'HoroscopeSeriesRequest',
+    'SimilarRequest',
+    'CompatibleRequest',
+    'SurroundedPalacesRequest',
     'APIResponse',
     'GenderType',
     'LangueType',
-    'TimeIndexType'
+    'TimeIndexType',
+    'SimilarityMetricType',
+    'HoroscopeStepType'
 ] 
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 日历相关数据模型
 """
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -10,4 +10,25 @@ class MonthDaysResponse(BaseModel):
     year: int = Field(..., description="年份")
     month: int = Field(..., description="月份")
     days: List[str] = Field(..., description="该月的所有日期，格式为YYYY-MM-DD")
-    count: int = Field(..., description="天数") 
\ No newline at end of file
+    count: int = Field(..., description="天数")
+
+
+class LunarDayInfo(BaseModel):
+    """农历月历中单日的信息"""
+    solar_date: str = Field(..., description="公历日期，格式为YYYY-MM-DD")
+    lunar_year: int = Field(..., description="农历年")
+    lunar_month: int = Field(..., description="农历月")
+    lunar_day: int = Field(..., description="农历日")
+    is_leap_month: bool = Field(..., description="是否闰月")
+    lunar_date: str = Field(..., description="农历日期，如二〇〇〇年七月十七")
+    heavenly_stem: str = Field(..., description="日天干")
+    earthly_branch: str = Field(..., description="日地支")
+    solar_term: Optional[str] = Field(None, description="当天交节的节气，无节气时为空")
+
+
+class MonthGridResponse(BaseModel):
+    """农历月历响应"""
+    year: int = Field(..., description="年份")
+    month: int = Field(..., description="月份")
+    days: List[LunarDayInfo] = Field(..., description="该月每一天的农历信息")
+    count: int = Field(..., description="天数")
@@ -1,14 +1,18 @@
 """
 请求模型定义
 """
-from pydantic import BaseModel
-from typing import Literal
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, Union
 
 # 定义类型别名
 GenderType = Literal["男", "女"]
 LangueType = Literal["zh-CN", "zh-TW", "en-US"]
 # 时辰索引类型：0-12，0为早子时，1为丑时，依此类推
 TimeIndexType = int
+# 相似度类型：shared为共同特征数，hamming为汉明距离
+SimilarityMetricType = Literal["shared", "hamming"]
+# 运限序列步长：day为逐日，hour为逐时辰
+HoroscopeStepType = Literal["day", "hour"]
 
 class SolarRequest(BaseModel):
     """阳历请求模型"""
@@ -18,6 +22,15 @@ class SolarRequest(BaseModel):
     fix_leap: bool = True
     language: LangueType = "zh-CN"
 
+class LunarRequest(BaseModel):
+    """农历请求模型"""
+    lunar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+    is_leap_month: bool = False
+    fix_leap: bool = True
+    language: LangueType = "zh-CN"
+
 class HoroscopeRequest(BaseModel):
     """大限流年请求模型"""
     solar_date: str
@@ -27,3 +40,43 @@ class HoroscopeRequest(BaseModel):
     target_date: str
     fix_leap: bool = True
     language: LangueType = "zh-CN"
+
+class HoroscopeSeriesRequest(BaseModel):
+    """运限序列请求模型"""
+    solar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+    target_date: str
+    target_time_index: TimeIndexType = 0
+    count: int = 24
+    step: HoroscopeStepType = "day"
+    delta: bool = True
+    keyframe_every: int = 0
+    fix_leap: bool = True
+    language: LangueType = "zh-CN"
+
+class SimilarRequest(BaseModel):
+    """相似星盘检索请求模型"""
+    solar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+    fix_leap: bool = True
+    top_k: int = Field(10, ge=1, le=1000, description="返回数量")
+    metric: SimilarityMetricType = "shared"
+
+class CompatibleRequest(BaseModel):
+    """合盘检索请求模型"""
+    solar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+    fix_leap: bool = True
+    top_k: int = Field(10, ge=1, le=1000, description="返回数量")
+
+class SurroundedPalacesRequest(BaseModel):
+    """三方四正请求模型"""
+    solar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+    palace: Optional[Union[int, str]] = None
+    fix_leap: bool = True
+    language: LangueType = "zh-CN"
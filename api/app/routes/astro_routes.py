@@ -1,14 +1,22 @@
 """
 紫微斗数API路由
 """
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, Query, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Query, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from ..models import SolarRequest, HoroscopeRequest, APIResponse
-from ..models import GenderType, LangueType, TimeIndexType
-from ..services import AstroService
+from ..models import SolarRequest, LunarRequest, HoroscopeRequest, HoroscopeSeriesRequest, SimilarRequest, CompatibleRequest, SurroundedPalacesRequest, APIResponse
+from ..models import GenderType, LangueType, TimeIndexType, SimilarityMetricType, HoroscopeStepType
+from ..services import AstroService, SimilarityService
+from ..services.astro_service import HOROSCOPE_SERIES_MAX
+from ..services.live_horoscope_service import (
+    get_live_horoscope_hub, parse_chart_key, LIVE_MAX_CHARTS, LIVE_HEARTBEAT
+)
+from ..utils import HoroscopeDeltaEncoder, priority
 
 # 获取日志记录器
 logger = logging.getLogger("紫微斗数API")
@@ -21,6 +29,11 @@ def get_astro_service():
     """提供紫微斗数服务实例"""
     return AstroService()
 
+# 依赖注入：获取相似星盘检索服务
+def get_similarity_service():
+    """提供相似星盘检索服务实例"""
+    return SimilarityService()
+
 # 创建错误响应
 def create_error_response(error_message: str, error_detail: str = None):
     """创建标准错误响应"""
@@ -108,6 +121,60 @@ def calculate_by_solar(
         logger.error(f"处理请求时出错: {str(e)}")
         return create_error_response(str(e))
 
+# 通过农历获取星盘信息（GET方法）
+@router.get("/by_lunar")
+def calculate_by_lunar_get(
+    lunar_date: str = Query(..., description="农历日期，格式：YYYY-M-D"),
+    time_index: TimeIndexType = Query(..., description="出生时辰序号：0-12，0为早子时，1为丑时，依此类推"),
+    gender: GenderType = Query(..., description="性别：男/女"),
+    is_leap_month: bool = Query(False, description="是否闰月，该月不是当年闰月时忽略"),
+    fix_leap: bool = Query(True, description="是否调整闰月情况"),
+    language: LangueType = Query("zh-CN", description="输出语言"),
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """通过农历获取星盘信息"""
+    try:
+        logger.info(f"接收到农历GET请求: 日期={lunar_date}, 闰月={is_leap_month}, 时辰={time_index}, 性别={gender}")
+
+        natal_chart, error = astro_service.get_natal_chart_by_lunar(
+            lunar_date, time_index, gender, is_leap_month, fix_leap, language
+        )
+
+        if error:
+            return create_error_response(error)
+
+        return create_success_response(natal_chart)
+    except Exception as e:
+        logger.error(f"处理请求时出错: {str(e)}")
+        return create_error_response(str(e))
+
+# 通过农历获取星盘信息（POST方法）
+@router.post("/by_lunar")
+def calculate_by_lunar(
+    request: LunarRequest,
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """通过农历获取星盘信息"""
+    try:
+        logger.info(f"接收到农历POST请求: {request.model_dump()}")
+
+        natal_chart, error = astro_service.get_natal_chart_by_lunar(
+            request.lunar_date,
+            request.time_index,
+            request.gender,
+            request.is_leap_month,
+            request.fix_leap,
+            request.language
+        )
+
+        if error:
+            return create_error_response(error)
+
+        return create_success_response(natal_chart)
+    except Exception as e:
+        logger.error(f"处理请求时出错: {str(e)}")
+        return create_error_response(str(e))
+
 # 计算大限流年（GET方法）
 @router.get("/horoscope")
 def calculate_horoscope_get(
@@ -183,3 +250,322 @@ def calculate_horoscope_post(
     except Exception as e:
         logger.error(f"处理大限流年请求时出错: {str(e)}")
         return create_error_response(f"大限流年计算失败: {str(e)}")
+
+# 运限序列的公共处理逻辑
+def _horoscope_series(astro_service: AstroService, solar_date: str, time_index: int, gender: str,
+                      target_date: str, target_time_index: int, count: int, step: str, delta: bool,
+                      keyframe_every: int, fix_leap: bool, language: str):
+    """计算本命盘后以 NDJSON 流式返回运限序列，增量模式下只发送变化的字段；序列中的运限按 batch 优先级计算"""
+    if not 1 <= count <= HOROSCOPE_SERIES_MAX:
+        return create_error_response(f"count 必须在 1 到 {HOROSCOPE_SERIES_MAX} 之间")
+    try:
+        targets = astro_service.horoscope_series_targets(target_date, target_time_index, count, step)
+    except ValueError as e:
+        return create_error_response(f"目标日期格式错误: {target_date}", str(e))
+
+    # 先计算一次本命盘，出生信息有误时直接返回错误，而不是在流中逐条报错
+    _, error = astro_service.get_natal_chart(solar_date, time_index, gender, fix_leap, language)
+    if error:
+        return create_error_response(f"计算本命盘失败: {error}", error)
+
+    def lines():
+        encoder = HoroscopeDeltaEncoder(keyframe_every) if delta else None
+        series = astro_service.iter_horoscope_series(solar_date, time_index, gender, targets, fix_leap, language)
+        for index in range(len(targets)):
+            # 流式响应的每一步可能在不同线程中执行，优先级只在单步内设置
+            with priority("batch"):
+                date, hour, horoscope, horoscope_error = next(series)
+            item = {"index": index, "targetDate": date, "targetTimeIndex": hour}
+            if horoscope_error:
+                item["error"] = horoscope_error
+                if encoder is not None:
+                    encoder.reset()
+            elif encoder is not None:
+                item.update(encoder.encode(horoscope))
+            else:
+                item["horoscope"] = horoscope
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# 运限序列（GET方法）
+@router.get("/horoscope/series")
+def horoscope_series_get(
+    solar_date: str = Query(..., description="阳历日期，格式：YYYY-M-D"),
+    time_index: TimeIndexType = Query(..., description="出生时辰序号：0-12，0为早子时，1为丑时，依此类推"),
+    gender: GenderType = Query(..., description="性别：男/女"),
+    target_date: str = Query(..., description="起始目标日期，格式：YYYY-M-D"),
+    target_time_index: TimeIndexType = Query(0, description="起始目标时辰序号：0-12"),
+    count: int = Query(24, description="条数"),
+    step: HoroscopeStepType = Query("day", description="步长：day逐日，hour逐时辰"),
+    delta: bool = Query(True, description="是否增量编码，第一条之后只返回变化的字段"),
+    keyframe_every: int = Query(0, description="增量模式下每隔多少条返回一次完整运限，0表示只有第一条"),
+    fix_leap: bool = Query(True, description="是否调整闰月情况"),
+    language: LangueType = Query("zh-CN", description="输出语言"),
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """以 NDJSON 流式返回连续的运限序列"""
+    try:
+        logger.info(f"接收到运限序列GET请求: 日期={solar_date}, 时辰={time_index}, 性别={gender}, "
+                    f"起始日期={target_date}, 条数={count}, 步长={step}")
+        return _horoscope_series(astro_service, solar_date, time_index, gender, target_date, target_time_index,
+                                 count, step, delta, keyframe_every, fix_leap, language)
+    except Exception as e:
+        logger.error(f"处理运限序列请求时出错: {str(e)}")
+        return create_error_response(f"运限序列计算失败: {str(e)}")
+
+# 运限序列（POST方法）
+@router.post("/horoscope/series")
+def horoscope_series_post(
+    request: HoroscopeSeriesRequest,
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """以 NDJSON 流式返回连续的运限序列"""
+    try:
+        logger.info(f"接收到运限序列POST请求: {request.model_dump()}")
+        return _horoscope_series(astro_service, request.solar_date, request.time_index, request.gender,
+                                 request.target_date, request.target_time_index, request.count, request.step,
+                                 request.delta, request.keyframe_every, request.fix_leap, request.language)
+    except Exception as e:
+        logger.error(f"处理运限序列请求时出错: {str(e)}")
+        return create_error_response(f"运限序列计算失败: {str(e)}")
+
+# 实时运限推送（Server-Sent Events）
+@router.get("/horoscope/live")
+async def horoscope_live(
+    request: Request,
+    charts: List[str] = Query(..., description="出生信息，格式：阳历日期,时辰序号,性别，可重复传入订阅多个"),
+    delta: bool = Query(False, description="是否增量编码，每个出生信息第一条之后只返回变化的字段"),
+):
+    """以 SSE 推送运限：先返回当前时辰的运限，之后只在流日或流时变化时推送"""
+    try:
+        logger.info(f"接收到实时运限订阅: {charts}")
+        if not 1 <= len(charts) <= LIVE_MAX_CHARTS:
+            return create_error_response(f"订阅的出生信息数量必须在 1 到 {LIVE_MAX_CHARTS} 之间")
+        try:
+            keys = list(dict.fromkeys(parse_chart_key(chart) for chart in charts))
+        except ValueError as e:
+            return create_error_response(str(e))
+
+        hub = await asyncio.to_thread(get_live_horoscope_hub)
+        if hub is None:
+            return create_error_response("模拟数据引擎不支持实时运限推送")
+    except Exception as e:
+        logger.error(f"处理实时运限订阅时出错: {str(e)}")
+        return create_error_response(f"实时运限订阅失败: {str(e)}")
+
+    async def events():
+        subscription = hub.subscribe(keys, asyncio.get_running_loop())
+        encoders = {}
+        sent = {}
+        event_id = 0
+
+        def format_event(event: Dict[str, Any]) -> Optional[str]:
+            nonlocal event_id
+            slot = (event["targetDate"], event["targetTimeIndex"])
+            if sent.get(event["chart"]) == slot:
+                # 订阅与交界同时发生时可能收到同一时辰的运限两次
+                return None
+            sent[event["chart"]] = slot
+            data = {key: value for key, value in event.items() if key != "horoscope"}
+            if "horoscope" in event:
+                if delta:
+                    encoder = encoders.setdefault(event["chart"], HoroscopeDeltaEncoder())
+                    data.update(encoder.encode(event["horoscope"]))
+                else:
+                    data["horoscope"] = event["horoscope"]
+            elif event["chart"] in encoders:
+                encoders[event["chart"]].reset()
+            event_id += 1
+            return f"id: {event_id}\nevent: horoscope\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        try:
+            # 先发送当前时辰的运限
+            for key in keys:
+                text = format_event(await asyncio.to_thread(hub.current, key))
+                if text:
+                    yield text
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), LIVE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                text = format_event(event)
+                if text:
+                    yield text
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 以盘找盘的公共处理逻辑
+def _find_similar(astro_service: AstroService, similarity_service: SimilarityService,
+                  solar_date: str, time_index: int, gender: str, fix_leap: bool,
+                  top_k: int, metric: str):
+    """计算参考盘并在语料库中检索相似星盘"""
+    # 语料库按zh-CN编码，参考盘也使用zh-CN排盘
+    natal_chart, error = astro_service.get_natal_chart(
+        solar_date, time_index, gender, fix_leap, "zh-CN"
+    )
+
+    if error:
+        return create_error_response(error)
+
+    result, error = similarity_service.find_similar(natal_chart, top_k, metric)
+
+    if error:
+        return create_error_response(error)
+
+    return create_success_response(result, "相似星盘检索成功")
+
+# 相似星盘检索（GET方法）
+@router.get("/similar")
+def find_similar_get(
+    solar_date: str = Query(..., description="阳历日期，格式：YYYY-M-D"),
+    time_index: TimeIndexType = Query(..., description="出生时辰序号：0-12，0为早子时，1为丑时，依此类推"),
+    gender: GenderType = Query(..., description="性别：男/女"),
+    fix_leap: bool = Query(True, description="是否调整闰月情况"),
+    top_k: int = Query(10, ge=1, le=1000, description="返回数量"),
+    metric: SimilarityMetricType = Query("shared", description="相似度：shared为共同特征数，hamming为汉明距离"),
+    astro_service: AstroService = Depends(get_astro_service),
+    similarity_service: SimilarityService = Depends(get_similarity_service)
+):
+    """以盘找盘：检索主星落宫、四化与参考盘最相似的出生信息"""
+    try:
+        logger.info(f"接收到相似星盘GET请求: 日期={solar_date}, 时辰={time_index}, 性别={gender}, top_k={top_k}")
+        return _find_similar(astro_service, similarity_service,
+                             solar_date, time_index, gender, fix_leap, top_k, metric)
+    except Exception as e:
+        logger.error(f"处理相似星盘请求时出错: {str(e)}")
+        return create_error_response(f"相似星盘检索失败: {str(e)}")
+
+# 相似星盘检索（POST方法）
+@router.post("/similar")
+def find_similar_post(
+    request: SimilarRequest,
+    astro_service: AstroService = Depends(get_astro_service),
+    similarity_service: SimilarityService = Depends(get_similarity_service)
+):
+    """以盘找盘：检索主星落宫、四化与参考盘最相似的出生信息"""
+    try:
+        logger.info(f"接收到相似星盘POST请求: {request.model_dump()}")
+        return _find_similar(astro_service, similarity_service,
+                             request.solar_date, request.time_index, request.gender,
+                             request.fix_leap, request.top_k, request.metric)
+    except Exception as e:
+        logger.error(f"处理相似星盘请求时出错: {str(e)}")
+        return create_error_response(f"相似星盘检索失败: {str(e)}")
+
+# 合盘检索的公共处理逻辑
+def _find_compatible(astro_service: AstroService, similarity_service: SimilarityService,
+                     solar_date: str, time_index: int, gender: str, fix_leap: bool, top_k: int):
+    """计算参考盘并在语料库中检索合盘得分最高的星盘"""
+    # 语料库按zh-CN编码，参考盘也使用zh-CN排盘
+    natal_chart, error = astro_service.get_natal_chart(
+        solar_date, time_index, gender, fix_leap, "zh-CN"
+    )
+
+    if error:
+        return create_error_response(error)
+
+    result, error = similarity_service.find_compatible(natal_chart, top_k)
+
+    if error:
+        return create_error_response(error)
+
+    return create_success_response(result, "合盘检索成功")
+
+# 合盘检索（GET方法）
+@router.get("/compatible")
+def find_compatible_get(
+    solar_date: str = Query(..., description="阳历日期，格式：YYYY-M-D"),
+    time_index: TimeIndexType = Query(..., description="出生时辰序号：0-12，0为早子时，1为丑时，依此类推"),
+    gender: GenderType = Query(..., description="性别：男/女"),
+    fix_leap: bool = Query(True, description="是否调整闰月情况"),
+    top_k: int = Query(10, ge=1, le=1000, description="返回数量"),
+    astro_service: AstroService = Depends(get_astro_service),
+    similarity_service: SimilarityService = Depends(get_similarity_service)
+):
+    """合盘：检索与参考盘命宫、夫妻宫、四化互动得分最高的出生信息"""
+    try:
+        logger.info(f"接收到合盘GET请求: 日期={solar_date}, 时辰={time_index}, 性别={gender}, top_k={top_k}")
+        return _find_compatible(astro_service, similarity_service,
+                                solar_date, time_index, gender, fix_leap, top_k)
+    except Exception as e:
+        logger.error(f"处理合盘请求时出错: {str(e)}")
+        return create_error_response(f"合盘检索失败: {str(e)}")
+
+# 合盘检索（POST方法）
+@router.post("/compatible")
+def find_compatible_post(
+    request: CompatibleRequest,
+    astro_service: AstroService = Depends(get_astro_service),
+    similarity_service: SimilarityService = Depends(get_similarity_service)
+):
+    """合盘：检索与参考盘命宫、夫妻宫、四化互动得分最高的出生信息"""
+    try:
+        logger.info(f"接收到合盘POST请求: {request.model_dump()}")
+        return _find_compatible(astro_service, similarity_service,
+                                request.solar_date, request.time_index, request.gender,
+                                request.fix_leap, request.top_k)
+    except Exception as e:
+        logger.error(f"处理合盘请求时出错: {str(e)}")
+        return create_error_response(f"合盘检索失败: {str(e)}")
+
+# 三方四正（GET方法）
+@router.get("/surrounded_palaces")
+def calculate_surrounded_palaces_get(
+    solar_date: str = Query(..., description="阳历日期，格式：YYYY-M-D"),
+    time_index: TimeIndexType = Query(..., description="出生时辰序号：0-12，0为早子时，1为丑时，依此类推"),
+    gender: GenderType = Query(..., description="性别：男/女"),
+    palace: Optional[str] = Query(None, description="宫位索引(0-11)或宫位名称，不传则返回全部十二宫"),
+    fix_leap: bool = Query(True, description="是否调整闰月情况"),
+    language: LangueType = Query("zh-CN", description="输出语言"),
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """获取指定宫位（或全部十二宫）的三方四正"""
+    try:
+        logger.info(f"接收到三方四正GET请求: 日期={solar_date}, 时辰={time_index}, 性别={gender}, 宫位={palace}")
+
+        # 数字字符串按宫位索引处理
+        palace_key = int(palace) if palace is not None and palace.isdigit() else palace
+        result, error = astro_service.get_surrounded_palaces(
+            solar_date, time_index, gender, palace_key, fix_leap, language
+        )
+
+        if error:
+            return create_error_response(error)
+
+        return create_success_response(result)
+    except Exception as e:
+        logger.error(f"处理三方四正请求时出错: {str(e)}")
+        return create_error_response(str(e))
+
+# 三方四正（POST方法）
+@router.post("/surrounded_palaces")
+def calculate_surrounded_palaces_post(
+    request: SurroundedPalacesRequest,
+    astro_service: AstroService = Depends(get_astro_service)
+):
+    """获取指定宫位（或全部十二宫）的三方四正"""
+    try:
+        logger.info(f"接收到三方四正POST请求: {request.model_dump()}")
+
+        result, error = astro_service.get_surrounded_palaces(
+            request.solar_date,
+            request.time_index,
+            request.gender,
+            request.palace,
+            request.fix_leap,
+            request.language
+        )
+
+        if error:
+            return create_error_response(error)
+
+        return create_success_response(result)
+    except Exception as e:
+        logger.error(f"处理三方四正请求时出错: {str(e)}")
+        return create_error_response(str(e))
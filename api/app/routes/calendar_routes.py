@@ -7,7 +7,7 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 
 from ..services.calendar_service import CalendarService
-from ..models.calendar_models import MonthDaysResponse
+from ..models.calendar_models import MonthDaysResponse, MonthGridResponse
 
 # 日志记录器
 logger = logging.getLogger("紫微斗数API")
@@ -69,4 +69,52 @@ async def post_month_days(request: MonthDaysRequest):
         raise HTTPException(status_code=400, detail=error)
     
     logger.info(f"获取月份天数成功: 共{result['count']}天")
-    return result 
\ No newline at end of file
+    return result
+
+
+@router.get("/month_grid", response_model=MonthGridResponse)
+async def get_month_grid(date: str = Query(..., description="日期，格式为YYYY-MM或YYYY-M")):
+    """
+    获取指定月份的农历月历
+
+    参数:
+    - date: 日期，格式为YYYY-MM或YYYY-M，如2025-03或2025-3
+
+    返回:
+    - 该月每一天的农历日期、闰月标记、日干支和节气
+    """
+    logger.info(f"接收到获取农历月历GET请求: date={date}")
+
+    # 调用服务
+    result, error = calendar_service.get_month_grid(date)
+
+    if error:
+        logger.error(f"获取农历月历失败: {error}")
+        raise HTTPException(status_code=400, detail=error)
+
+    logger.info(f"获取农历月历成功: 共{result['count']}天")
+    return result
+
+
+@router.post("/month_grid", response_model=MonthGridResponse)
+async def post_month_grid(request: MonthDaysRequest):
+    """
+    获取指定月份的农历月历 (POST方法)
+
+    请求体:
+    - date: 日期，格式为YYYY-MM或YYYY-M，如2025-03或2025-3
+
+    返回:
+    - 该月每一天的农历日期、闰月标记、日干支和节气
+    """
+    logger.info(f"接收到获取农历月历POST请求: date={request.date}")
+
+    # 调用服务
+    result, error = calendar_service.get_month_grid(request.date)
+
+    if error:
+        logger.error(f"获取农历月历失败: {error}")
+        raise HTTPException(status_code=400, detail=error)
+
+    logger.info(f"获取农历月历成功: 共{result['count']}天")
+    return result
@@ -6,7 +6,9 @@ from datetime import datetime
 from fastapi import APIRouter, Depends
 from typing import Dict, Any
 
-from ..services import AstroService
+from ..services import (
+    AstroService, AstroProvider, get_warmup_status, get_prerender_status, get_result_cache_stats, get_live_status
+)
 
 # 获取日志记录器
 logger = logging.getLogger("紫微斗数API")
@@ -35,6 +37,11 @@ def test_endpoint(astro_service: AstroService = Depends(get_astro_service)):
             "astro_service_initialized": True,
             "engine_type": engine_type,
             "using_real_engine": astro_service.using_real_engine,
+            "engine_supervisor": AstroProvider.get_engine_stats(),
+            "engine_memory": AstroProvider.get_engine_memory_stats(),
+            "single_flight": astro_service.get_single_flight_stats(),
+            "result_cache": get_result_cache_stats(),
+            "live_horoscope": get_live_status(),
             "test_result": {
                 "sample_data": "测试成功"
             },
@@ -57,4 +64,28 @@ def test_endpoint(astro_service: AstroService = Depends(get_astro_service)):
             "test_error": str(e)
         }
         
-        return response 
\ No newline at end of file
+        return response
+
+# 缓存预热进度
+@router.get("/warmup")
+def warmup_status():
+    """查看启动缓存预热进度"""
+    return {
+        "status": "ok",
+        "message": "查询成功",
+        "timestamp": datetime.now().isoformat(),
+        "result": get_warmup_status(),
+        "error": None
+    }
+
+# 运限预渲染调度状态
+@router.get("/prerender")
+def prerender_status():
+    """查看流日/流时运限预渲染调度状态"""
+    return {
+        "status": "ok",
+        "message": "查询成功",
+        "timestamp": datetime.now().isoformat(),
+        "result": get_prerender_status(),
+        "error": None
+    }
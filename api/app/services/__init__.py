@@ -3,10 +3,44 @@
 """
 from .astro_service import AstroService
 from .astro_provider import AstroProvider
+from .engine_supervisor import SupervisedEngine, EngineError, EngineTimeoutError, EngineCrashedError
 from .calendar_service import CalendarService
+from .similarity_service import SimilarityService
+from .result_cache import get_result_cache, get_result_cache_stats, close_result_cache
+from .cache_backends import (
+    CacheBackend, MemoryCacheBackend, DiskCacheBackend, SharedMemoryCacheBackend, RedisCacheBackend, NearCacheBackend
+)
+from .warmup_service import WarmupService, start_warmup, get_warmup_status
+from .prerender_service import HoroscopePrerenderScheduler, start_prerender_scheduler, stop_prerender_scheduler, get_prerender_status
+from .live_horoscope_service import LiveHoroscopeHub, get_live_horoscope_hub, get_live_status, stop_live_horoscope_hub
 
 __all__ = [
     'AstroService',
     'AstroProvider',
-    'CalendarService'
+    'SupervisedEngine',
+    'EngineError',
+    'EngineTimeoutError',
+    'EngineCrashedError',
+    'CalendarService',
+    'SimilarityService',
+    'get_result_cache',
+    'get_result_cache_stats',
+    'close_result_cache',
+    'CacheBackend',
+    'MemoryCacheBackend',
+    'DiskCacheBackend',
+    'SharedMemoryCacheBackend',
+    'RedisCacheBackend',
+    'NearCacheBackend',
+    'WarmupService',
+    'start_warmup',
+    'get_warmup_status',
+    'HoroscopePrerenderScheduler',
+    'start_prerender_scheduler',
+    'stop_prerender_scheduler',
+    'get_prerender_status',
+    'LiveHoroscopeHub',
+    'get_live_horoscope_hub',
+    'get_live_status',
+    'stop_live_horoscope_hub'
 ] 
\ No newline at end of file
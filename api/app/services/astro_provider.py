@@ -9,6 +9,7 @@ import json
 import os
 import traceback
 
+from .engine_supervisor import SupervisedEngine, EngineError, ENGINE_ISOLATION
 # 日志记录器
 logger = logging.getLogger("紫微斗数API")
 
@@ -18,6 +19,9 @@ _astro_results_cache = {}
 _engine_instance = None
 _engine_is_real = None
 
+# 引擎星盘缓存容量，阳历与农历请求共享，通过环境变量配置，0表示不缓存
+CHART_CACHE_SIZE = int(os.environ.get("IZTRO_CHART_CACHE_SIZE", "1024"))
+
 # 模拟的紫微斗数计算引擎
 class MockAstroEngine:
     """模拟的紫微斗数计算引擎，当无法使用真实引擎时使用"""
@@ -58,6 +62,26 @@ class MockAstroEngine:
             "palaces": []
         }
 
+    def by_lunar(self, lunar_date: str, time_index: int, gender: str, is_leap_month: bool = False,
+                 fix_leap: bool = True, language: str = "zh-CN") -> Dict[str, Any]:
+        """
+        模拟通过农历获取星盘
+
+        Args:
+            lunar_date: 农历日期，格式为YYYY-M-D
+            time_index: 出生时辰序号，0-12
+            gender: 性别，"男"或"女"
+            is_leap_month: 是否闰月
+            fix_leap: 是否调整闰月情况,true、false
+            language: 输出语言
+
+        Returns:
+            模拟的星盘数据
+        """
+        data = self.by_solar(lunar_date, time_index, gender, fix_leap, language)
+        data["lunarDate"] = f"模拟农历日期-{lunar_date}"
+        return data
+
     def horoscope(self, natal_chart: Dict[str, Any], target_date: str) -> Dict[str, Any]:
         """
         模拟大限流年计算
@@ -92,8 +116,10 @@ class AstroProvider:
         self.use_real_engine = True
 
         try:
-            # 尝试导入紫微斗数库
-            from py_iztro import Astro
+            # 尝试导入紫微斗数库，导入 py_iztro 不会加载引擎，需要单独检查 pythonmonkey 是否安装
+            from py_iztro import engine_available
+            if not engine_available():
+                raise ImportError("未安装pythonmonkey")
             logger.info("成功导入py_iztro库")
             self.use_real_engine = True
         except ImportError:
@@ -118,18 +144,64 @@ class AstroProvider:
 
         # 否则创建新的引擎实例
         try:
-            from py_iztro import Astro
-            logger.info("成功导入py_iztro库，创建Astro实例")
-            _engine_instance = Astro()
+            from py_iztro import Astro, engine_available
+            if not engine_available():
+                raise ImportError("未安装pythonmonkey")
+            if ENGINE_ISOLATION == "process":
+                logger.info(f"成功导入py_iztro库，在子进程中运行引擎，星盘缓存容量: {CHART_CACHE_SIZE}")
+                _engine_instance = SupervisedEngine(cache_size=CHART_CACHE_SIZE)
+            else:
+                logger.info(f"成功导入py_iztro库，创建Astro实例，星盘缓存容量: {CHART_CACHE_SIZE}")
+                # py_iztro 在第一次排盘时才加载引擎，服务启动时立即加载，不让第一个请求承担
+                _engine_instance = Astro(cache_size=CHART_CACHE_SIZE).load()
             _engine_is_real = True
         except ImportError:
             logger.warning("无法导入py_iztro库，将使用模拟数据引擎")
             # 使用已存在的MockAstroEngine类
             _engine_instance = MockAstroEngine()
             _engine_is_real = False
+        except EngineError as e:
+            logger.error(f"启动引擎进程失败，将使用模拟数据引擎: {str(e)}")
+            _engine_instance = MockAstroEngine()
+            _engine_is_real = False
 
         return _engine_instance, _engine_is_real
 
+    @staticmethod
+    def get_engine_stats() -> Optional[Dict[str, Any]]:
+        """
+        获取引擎进程监管统计信息
+
+        Returns:
+            统计信息，引擎未在子进程中运行时返回None
+        """
+        if isinstance(_engine_instance, SupervisedEngine):
+            return _engine_instance.stats()
+        return None
+
+    @staticmethod
+    def get_engine_memory_stats() -> Optional[Dict[str, Any]]:
+        """
+        获取引擎内存统计（RSS、存活的星盘 JS 对象句柄、星盘缓存）
+
+        Returns:
+            统计信息，模拟数据引擎返回None
+        """
+        memory_stats = getattr(_engine_instance, "memory_stats", None)
+        if memory_stats is None:
+            return None
+        try:
+            return memory_stats()
+        except Exception as e:
+            logger.warning(f"获取引擎内存统计失败: {str(e)}")
+            return None
+
+    @staticmethod
+    def close_engine():
+        """停止引擎子进程"""
+        if isinstance(_engine_instance, SupervisedEngine):
+            _engine_instance.close()
+
     def _init_mock_engine(self):
         """初始化模拟紫微斗数计算引擎"""
         logger.info("初始化模拟紫微斗数计算引擎")
@@ -2,15 +2,25 @@
 紫微斗数计算服务
 """
 import logging
-from typing import Dict, Any, Tuple, Optional, Union
-from datetime import datetime
+import os
+from typing import Dict, Any, Iterator, List, Tuple, Optional, Union
+from datetime import datetime, timedelta
 
-from ..utils import safe_execute, handle_result, calculate_age
+from ..utils import handle_result, calculate_age, SingleFlight, normalize_date
+from ..utils.traffic_recorder import get_traffic_recorder
 from .astro_provider import AstroProvider
+from .result_cache import result_cache_key, load_result, store_result
 
 # 日志记录器
 logger = logging.getLogger("紫微斗数API")
 
+# 全局的相同请求合并执行器，服务实例按请求创建，需要跨实例共享进行中的计算
+_chart_flight = SingleFlight("本命盘")
+_horoscope_flight = SingleFlight("大限流年")
+
+# 运限序列单次请求的最大条数
+HOROSCOPE_SERIES_MAX = int(os.environ.get("IZTRO_HOROSCOPE_SERIES_MAX", "1000"))
+
 class AstroService:
     """紫微斗数计算服务"""
 
@@ -21,24 +31,70 @@ class AstroService:
         # 不再使用缓存和重试跟踪
 
     def get_natal_chart(self, solar_date: str, time_index: int, gender: str,
-                        fix_leap: bool = True, language: str = "zh-CN") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+                        fix_leap: bool = True, language: str = "zh-CN",
+                        record: bool = True) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
         获取本命盘
 
+        先查结果缓存（多个 worker 共用），未命中时再由引擎计算
+
         Args:
             solar_date: 阳历日期，格式为YYYY-MM-DD或YYYY-M-D
             time_index: 出生时辰序号，0-12
             gender: 性别，"男"或"女"
             fix_leap: 是否调整闰月情况
             language: 输出语言
+            record: 是否记录请求流量（缓存预热时不记录）
 
         Returns:
             (natal_chart, error): 本命盘数据和可能的错误信息
         """
         logger.info(f"计算本命盘: 日期={solar_date}, 时辰={time_index}, 性别={gender}")
 
-        # 直接执行本命盘计算，不使用缓存
-        natal_chart, error = safe_execute(
+        cache_key = result_cache_key("natal", normalize_date(solar_date), time_index, gender, fix_leap, language)
+        result = load_result(cache_key)
+        if result is not None:
+            if record:
+                self._record_request(solar_date, time_index, gender, fix_leap, language)
+            return result, None
+
+        natal_chart, error = self.prefetch_natal_chart(solar_date, time_index, gender, fix_leap, language)
+
+        if error:
+            logger.error(f"计算本命盘失败: {error}")
+            return None, error
+
+        if record:
+            self._record_request(solar_date, time_index, gender, fix_leap, language)
+
+        # 处理结果
+        try:
+            # 不再保存原始对象到缓存中
+            result = handle_result(natal_chart)
+            store_result(cache_key, result)
+            return result, None
+        except Exception as e:
+            logger.error(f"处理本命盘结果失败: {str(e)}")
+            return None, str(e)
+
+    def prefetch_natal_chart(self, solar_date: str, time_index: int, gender: str,
+                             fix_leap: bool = True, language: str = "zh-CN") -> Tuple[Any, Optional[str]]:
+        """
+        计算本命盘对象（写入引擎缓存），不记录请求流量，供本命盘接口和缓存预热使用
+
+        Args:
+            solar_date: 阳历日期，格式为YYYY-MM-DD或YYYY-M-D
+            time_index: 出生时辰序号，0-12
+            gender: 性别，"男"或"女"
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (astrolabe, error): 本命盘对象和可能的错误信息
+        """
+        # 相同的并发请求只计算一次
+        return _chart_flight.execute(
+            ("solar", normalize_date(solar_date), time_index, gender, fix_leap, language),
             self.engine.by_solar,
             solar_date,
             time_index,
@@ -47,19 +103,112 @@ class AstroService:
             language
         )
 
+    @staticmethod
+    def _record_request(solar_date: str, time_index: int, gender: str, fix_leap: bool, language: str):
+        """记录成功的本命盘请求，供下次启动时预热"""
+        recorder = get_traffic_recorder()
+        if recorder is not None:
+            recorder.record(solar_date, time_index, gender, fix_leap, language)
+
+    def get_natal_chart_by_lunar(self, lunar_date: str, time_index: int, gender: str,
+                                 is_leap_month: bool = False, fix_leap: bool = True,
+                                 language: str = "zh-CN") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        通过农历获取本命盘
+
+        引擎会先把农历换算为阳历，与阳历请求共用同一份星盘缓存
+
+        Args:
+            lunar_date: 农历日期，格式为YYYY-M-D
+            time_index: 出生时辰序号，0-12
+            gender: 性别，"男"或"女"
+            is_leap_month: 是否闰月，该月不是当年闰月时忽略
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (natal_chart, error): 本命盘数据和可能的错误信息
+        """
+        logger.info(f"计算本命盘: 农历日期={lunar_date}, 闰月={is_leap_month}, 时辰={time_index}, 性别={gender}")
+
+        # 内置农历表范围内先换算为阳历，与阳历请求共用结果缓存
+        if self.using_real_engine:
+            try:
+                from py_iztro.lunar import lunar_to_solar, LUNAR_MIN_YEAR, LUNAR_MAX_YEAR
+                year = normalize_date(lunar_date).split("-")[0]
+                if year.isdigit() and LUNAR_MIN_YEAR <= int(year) <= LUNAR_MAX_YEAR:
+                    solar_date = lunar_to_solar(lunar_date, is_leap_month)
+                    return self.get_natal_chart(solar_date, time_index, gender, fix_leap, language)
+            except ValueError as e:
+                logger.error(f"农历日期换算失败: {str(e)}")
+                return None, str(e)
+
+        natal_chart, error = _chart_flight.execute(
+            ("lunar", normalize_date(lunar_date), time_index, gender, is_leap_month, fix_leap, language),
+            self.engine.by_lunar,
+            lunar_date,
+            time_index,
+            gender,
+            is_leap_month,
+            fix_leap,
+            language
+        )
+
         if error:
             logger.error(f"计算本命盘失败: {error}")
             return None, error
 
-        # 处理结果
         try:
-            # 不再保存原始对象到缓存中
             result = handle_result(natal_chart)
+            # 按换算后的阳历日期记录，预热时与阳历请求共用缓存
+            self._record_request(result.get("solarDate", lunar_date), time_index, gender, fix_leap, language)
             return result, None
         except Exception as e:
             logger.error(f"处理本命盘结果失败: {str(e)}")
             return None, str(e)
 
+    def get_surrounded_palaces(self, solar_date: str, time_index: int, gender: str,
+                               palace: Optional[Union[int, str]] = None, fix_leap: bool = True,
+                               language: str = "zh-CN") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        获取三方四正宫位
+
+        在本命盘的十二宫上查表得到，不额外调用排盘引擎
+
+        Args:
+            solar_date: 阳历日期，格式为YYYY-MM-DD或YYYY-M-D
+            time_index: 出生时辰序号，0-12
+            gender: 性别，"男"或"女"
+            palace: 宫位索引(0-11)或宫位名称，为空时返回全部十二宫的三方四正
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (surrounded_palaces, error): 三方四正数据和可能的错误信息
+        """
+        logger.info(f"计算三方四正: 日期={solar_date}, 时辰={time_index}, 性别={gender}, 宫位={palace}")
+
+        if not self.using_real_engine:
+            return None, "模拟数据引擎不支持三方四正计算"
+
+        astrolabe, error = self.prefetch_natal_chart(solar_date, time_index, gender, fix_leap, language)
+
+        if error:
+            logger.error(f"计算本命盘失败: {error}")
+            return None, error
+
+        self._record_request(solar_date, time_index, gender, fix_leap, language)
+
+        try:
+            if palace is None:
+                result = {"palaces": [handle_result(item) for item in astrolabe.all_surrounded_palaces()]}
+            else:
+                result = handle_result(astrolabe.surrounded_palaces(palace))
+            return result, None
+        except Exception as e:
+            logger.error(f"计算三方四正失败: {str(e)}")
+            return None, str(e)
+
     def get_horoscope(self, natal_chart: Dict[str, Any], target_date: str,target_time_index: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
         获取大限流年
@@ -85,41 +234,173 @@ class AstroService:
             time_index = natal_chart.get("time")
             gender = natal_chart.get("gender")
 
-            if not all([solar_date, target_time_index,time_index is not None, gender]):
+            if not all([solar_date, target_time_index is not None, time_index is not None, gender]):
                 logger.error("本命盘数据缺少必要参数")
                 return None, "本命盘数据缺少必要参数"
 
-            # 完全模仿daxian.py的调用方式，不使用safe_execute
-            logger.info(f"使用直接方式计算大限流年: 完全按照daxian.py的方式调用")
-
-            try:
-                # 直接创建Astro对象
-                from py_iztro import Astro
-                astro = Astro()
-
-                # 将time_index从字符串转换为整数
-                if isinstance(time_index, str):
-                    time_map = {"子时": 0, "丑时": 1, "寅时": 2, "卯时": 3, "辰时": 4,
-                                "巳时": 5, "午时": 6, "未时": 7, "申时": 8, "酉时": 9,
-                                "戌时": 10, "亥时": 11, "夜子时": 12}
-                    time_index = time_map.get(time_index, 0)
+            # 将time_index从字符串转换为整数
+            if isinstance(time_index, str):
+                time_map = {"子时": 0, "丑时": 1, "寅时": 2, "卯时": 3, "辰时": 4,
+                            "巳时": 5, "午时": 6, "未时": 7, "申时": 8, "酉时": 9,
+                            "戌时": 10, "亥时": 11, "夜子时": 12}
+                time_index = time_map.get(time_index, 0)
 
-                # 直接调用，完全按照daxian.py的方式
-                natal_obj = astro.by_solar(solar_date, time_index, gender)
-                horoscope_data = natal_obj.horoscope(target_date, target_time_index)
+            result, error = self.render_horoscope(solar_date, time_index, gender, target_date, target_time_index)
 
-                # 处理结果
-                result = handle_result(horoscope_data)
-                return result, None
+            if error:
+                logger.error(f"直接调用方式失败: {error}")
+                return self._generate_mock_horoscope(natal_chart, target_date, f"直接调用方式失败: {error}")
 
-            except Exception as e:
-                logger.error(f"直接调用方式失败: {str(e)}")
-                return self._generate_mock_horoscope(natal_chart, target_date, f"直接调用方式失败: {str(e)}")
+            return result, None
 
         except Exception as e:
             logger.error(f"处理大限流年计算失败: {str(e)}")
             return self._generate_mock_horoscope(natal_chart, target_date, f"处理大限流年计算失败: {str(e)}")
 
+    @staticmethod
+    def horoscope_cache_key(solar_date: str, time_index: int, gender: str, target_date: str,
+                            target_time_index: int, fix_leap: bool = True, language: str = "zh-CN") -> str:
+        """大限流年数据的结果缓存键"""
+        return result_cache_key("horoscope", normalize_date(solar_date), time_index, gender,
+                                normalize_date(target_date), target_time_index, fix_leap, language)
+
+    def render_horoscope(self, solar_date: str, time_index: int, gender: str, target_date: str,
+                         target_time_index: int, store: bool = True, fix_leap: bool = True,
+                         language: str = "zh-CN") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        获取处理后的大限流年数据，先查结果缓存，未命中时由引擎计算并写入结果缓存
+
+        Args:
+            solar_date: 阳历日期
+            time_index: 出生时辰序号，0-12
+            gender: 性别
+            target_date: 目标日期，格式为YYYY-MM-DD或YYYY-M-D
+            target_time_index: 目标时间，0~12
+            store: 是否写入结果缓存，批量预渲染时由调用方合并写入
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (horoscope, error): 大限流年数据和可能的错误信息
+        """
+        cache_key = self.horoscope_cache_key(solar_date, time_index, gender, target_date, target_time_index,
+                                             fix_leap, language)
+        result = load_result(cache_key) if store else None
+        if result is not None:
+            return result, None
+
+        horoscope_data, error = self.prefetch_horoscope(
+            solar_date, time_index, gender, target_date, target_time_index, fix_leap, language
+        )
+        if error:
+            return None, error
+
+        result = handle_result(horoscope_data)
+        if store:
+            store_result(cache_key, result)
+        return result, None
+
+    def prefetch_horoscope(self, solar_date: str, time_index: int, gender: str, target_date: str,
+                           target_time_index: int, fix_leap: bool = True,
+                           language: str = "zh-CN") -> Tuple[Any, Optional[str]]:
+        """
+        计算大限流年对象（写入引擎缓存），供大限流年接口和定时预渲染使用
+
+        Args:
+            solar_date: 阳历日期
+            time_index: 出生时辰序号，0-12
+            gender: 性别
+            target_date: 目标日期，格式为YYYY-MM-DD或YYYY-M-D
+            target_time_index: 目标时间，0~12
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (horoscope, error): 大限流年对象和可能的错误信息
+        """
+        # 相同的并发请求只计算一次
+        return _horoscope_flight.execute(
+            (normalize_date(solar_date), time_index, gender, normalize_date(target_date), target_time_index,
+             fix_leap, language),
+            self.engine.horoscope_by_solar,
+            solar_date,
+            time_index,
+            gender,
+            target_date,
+            target_time_index,
+            fix_leap,
+            language
+        )
+
+    @staticmethod
+    def horoscope_series_targets(target_date: str, target_time_index: int, count: int,
+                                 step: str = "day") -> List[Tuple[str, int]]:
+        """
+        运限序列的目标日期与时辰
+
+        Args:
+            target_date: 起始目标日期，格式为YYYY-MM-DD或YYYY-M-D
+            target_time_index: 起始目标时辰，0~12
+            count: 条数
+            step: 步长，day 为逐日（时辰不变），hour 为逐时辰（0~12 依次，晚子时之后进入下一天的早子时）
+
+        Returns:
+            [(目标日期, 目标时辰), ...]
+        """
+        day = datetime.strptime(normalize_date(target_date), "%Y-%m-%d").date()
+        time_index = target_time_index
+        targets = []
+        for _ in range(count):
+            targets.append((f"{day.year}-{day.month}-{day.day}", time_index))
+            if step == "hour" and time_index < 12:
+                time_index += 1
+            else:
+                day += timedelta(days=1)
+                if step == "hour":
+                    time_index = 0
+        return targets
+
+    def iter_horoscope_series(self, solar_date: str, time_index: int, gender: str, targets: List[Tuple[str, int]],
+                              fix_leap: bool = True,
+                              language: str = "zh-CN") -> Iterator[Tuple[str, int, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        逐条计算运限序列，供流式接口边算边发送
+
+        直接使用请求中的出生时辰序号，不从本命盘的时辰名称反推（晚子时与非中文的时辰名称无法反推），
+        与运限预渲染、实时运限推送使用相同的结果缓存键
+
+        Args:
+            solar_date: 阳历日期
+            time_index: 出生时辰序号，0-12
+            gender: 性别
+            targets: 目标日期与时辰，见 horoscope_series_targets
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+
+        Returns:
+            (目标日期, 目标时辰, 大限流年数据, 错误信息) 的迭代器
+        """
+        for target_date, target_time_index in targets:
+            if self.using_real_engine:
+                horoscope, error = self.render_horoscope(solar_date, time_index, gender, target_date,
+                                                         target_time_index, fix_leap=fix_leap, language=language)
+            else:
+                horoscope, error = self._generate_mock_horoscope({"solarDate": solar_date}, target_date)
+            yield target_date, target_time_index, (None if error else horoscope), error
+
+    @staticmethod
+    def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+        """
+        获取相同请求合并执行的统计信息
+
+        Returns:
+            本命盘与大限流年各自的请求数、实际计算次数、被合并（节省）的计算次数
+        """
+        return {
+            "natal_chart": _chart_flight.stats(),
+            "horoscope": _horoscope_flight.stats(),
+        }
+
     def _generate_mock_horoscope(self, natal_chart: Dict[str, Any], target_date: str, error_message: str = None) -> Tuple[Dict[str, Any], Optional[str]]:
         """
         生成模拟的大限流年数据
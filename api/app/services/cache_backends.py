@@ -0,0 +1,366 @@
+"""
+结果缓存后端：内存、磁盘、共享内存、Redis 协议远程缓存以及本地近端缓存层
+"""
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.resp_client import RespConnectionPool, RespError
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+
+class CacheBackend(ABC):
+    """
+    缓存后端接口，键为字符串，值为字节串
+
+    子类必须实现 get、set、stats；get_many、set_many 默认逐个调用，支持批量的后端应重写。
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            字节串，未命中时返回None
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 字节串
+            ttl: 过期时间（秒）【可选】，不设置时不过期
+        """
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        批量读取缓存
+
+        Returns:
+            与键一一对应的字节串，未命中的位置为None
+        """
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: Sequence[Tuple[str, bytes]], ttl: Optional[int] = None):
+        """
+        批量写入缓存
+
+        Args:
+            items: [(缓存键, 字节串), ...]
+            ttl: 过期时间（秒）【可选】
+        """
+        for key, value in items:
+            self.set(key, value, ttl)
+
+    def delete(self, key: str):
+        """删除缓存（不支持删除的后端忽略）"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """当前进程的缓存统计信息"""
+
+    def close(self):
+        """释放连接、文件等资源"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """进程内 LRU 缓存，也用作 Redis 缓存的近端缓存层"""
+
+    name = "memory"
+
+    def __init__(self, max_size: int = 4096):
+        """
+        Args:
+            max_size: 最多缓存的条目数
+        """
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        return {"backend": self.name, "size": size, "max_size": self.max_size, "hits": self.hits,
+                "misses": self.misses}
+
+
+# 磁盘缓存文件头：过期时间戳（0表示不过期）
+_DISK_HEADER = struct.Struct("<d")
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    磁盘缓存，每个条目一个文件，按键哈希分目录存放
+
+    写入先写临时文件再原子替换，多个进程可以共用同一个目录；过期条目在读取时删除。
+    """
+
+    name = "disk"
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: 缓存目录
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        expires_at = _DISK_HEADER.unpack_from(data)[0]
+        if expires_at and expires_at <= time.time():
+            self.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data[_DISK_HEADER.size:]
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_DISK_HEADER.pack(time.time() + ttl if ttl else 0))
+                f.write(value)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "directory": self.directory, "hits": self.hits, "misses": self.misses}
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """共享内存缓存，同一台机器上的多个 worker 进程共用；容量固定，按 CLOCK 算法淘汰，不支持过期时间"""
+
+    name = "shared_memory"
+
+    def __init__(self, name: str, size: int = 64 * 1024 * 1024, slot_size: int = 4096):
+        """
+        Args:
+            name: 共享内存段名称
+            size: 共享内存总大小（字节）
+            slot_size: 每个槽位的大小（字节）
+        """
+        from ..utils.shm_cache import SharedMemoryCache
+        self._cache = SharedMemoryCache(name, size, slot_size)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self._cache.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    def close(self):
+        self._cache.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis 协议远程缓存，多台机器共用
+
+    批量读取使用 MGET，批量写入把多条 SET 以管道方式一次发送，都只产生一次网络往返。
+    远程服务不可用时视为未命中，并在 retry_interval 秒内不再尝试连接，避免每个请求都等待超时。
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "iztro:", max_connections: int = 16, timeout: float = 0.5,
+                 retry_interval: float = 5.0):
+        """
+        Args:
+            url: 连接地址，如 redis://127.0.0.1:6379/0
+            prefix: 键前缀，多个服务共用一个 Redis 时用于区分
+            max_connections: 连接池最大连接数
+            timeout: 连接与读写超时（秒）
+            retry_interval: 出错后暂停访问的时间（秒）
+        """
+        self.url = url
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self._pool = RespConnectionPool(url, max_connections, timeout)
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.round_trips = 0
+
+    def _pipeline(self, commands: List[Sequence[Any]]) -> Optional[List[Any]]:
+        """执行管道命令，远程服务不可用时返回None"""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            replies = self._pool.pipeline(commands)
+        except (OSError, ValueError, RespError) as e:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.retry_interval
+            logger.warning(f"远程缓存不可用，{self.retry_interval}秒内不再访问: {self.url}, {str(e)}")
+            return None
+        self.round_trips += 1
+        return replies
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        replies = self._pipeline([("MGET", *(self.prefix + key for key in keys))])
+        values = replies[0] if replies and isinstance(replies[0], list) else [None] * len(keys)
+        found = sum(value is not None for value in values)
+        self.hits += found
+        self.misses += len(keys) - found
+        return values
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.set_many([(key, value)], ttl)
+
+    def set_many(self, items: Sequence[Tuple[str, bytes]], ttl: Optional[int] = None):
+        if not items:
+            return
+        expire = ("EX", ttl) if ttl else ()
+        replies = self._pipeline([("SET", self.prefix + key, value, *expire) for key, value in items])
+        for reply in replies or ():
+            if isinstance(reply, RespError):
+                self.errors += 1
+                logger.warning(f"写入远程缓存失败: {str(reply)}")
+                break
+
+    def delete(self, key: str):
+        self._pipeline([("DEL", self.prefix + key)])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "url": f"{self._pool.host}:{self._pool.port}/{self._pool.db}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "round_trips": self.round_trips,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+    def close(self):
+        self._pool.close()
+
+
+class NearCacheBackend(CacheBackend):
+    """
+    两级缓存：进程内近端缓存 + 远程缓存
+
+    先查近端缓存，未命中再查远程并回填近端；写入同时写两级。近端条目只保留 local_ttl 秒，
+    其他机器对同一个键的更新最多延迟 local_ttl 秒可见（星盘结果不会变化，延迟不影响正确性）。
+    """
+
+    name = "near"
+
+    def __init__(self, remote: CacheBackend, local_size: int = 1024, local_ttl: int = 60):
+        """
+        Args:
+            remote: 远程缓存
+            local_size: 近端缓存最多缓存的条目数
+            local_ttl: 近端缓存条目的保留时间（秒）
+        """
+        self.remote = remote
+        self.local = MemoryCacheBackend(local_size)
+        self.local_ttl = local_ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        values = [self.local.get(key) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        if missing:
+            fetched = self.remote.get_many([keys[index] for index in missing])
+            for index, value in zip(missing, fetched):
+                if value is not None:
+                    values[index] = value
+                    self.local.set(keys[index], value, self.local_ttl)
+        return values
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.set_many([(key, value)], ttl)
+
+    def set_many(self, items: Sequence[Tuple[str, bytes]], ttl: Optional[int] = None):
+        local_ttl = min(ttl, self.local_ttl) if ttl else self.local_ttl
+        for key, value in items:
+            self.local.set(key, value, local_ttl)
+        self.remote.set_many(items, ttl)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self.remote.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.remote.stats(), near_cache=self.local.stats())
+
+    def close(self):
+        self.remote.close()
@@ -6,6 +6,8 @@ import calendar
 from datetime import datetime
 from typing import List, Tuple, Optional
 
+from ..utils import lunar_month_grid
+
 # 日志记录器
 logger = logging.getLogger("紫微斗数API")
 
@@ -16,6 +18,34 @@ class CalendarService:
         """初始化日历服务"""
         logger.info("日历服务初始化完成")
 
+    def _parse_year_month(self, date_str: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+        """
+        解析并校验年月字符串
+
+        Args:
+            date_str: 日期字符串，格式为YYYY-MM或YYYY-M
+
+        Returns:
+            (year, month, error): 年份、月份和可能的错误信息
+        """
+        parts = date_str.split("-")
+        if len(parts) != 2:
+            return None, None, "日期格式不正确，应为YYYY-MM或YYYY-M"
+
+        try:
+            year = int(parts[0])
+            month = int(parts[1])
+        except ValueError:
+            return None, None, "年份或月份不是有效数字"
+
+        # 验证年月
+        if not (1900 <= year <= 2100):
+            return None, None, "年份超出范围(1900-2100)"
+        if not (1 <= month <= 12):
+            return None, None, "月份超出范围(1-12)"
+
+        return year, month, None
+
     def get_month_days(self, date_str: str) -> Tuple[Optional[dict], Optional[str]]:
         """
         获取指定月份的所有天数
@@ -29,23 +59,10 @@ class CalendarService:
         logger.info(f"获取月份天数: 日期={date_str}")
 
         try:
-            # 解析输入日期
-            parts = date_str.split("-")
-            if len(parts) != 2:
-                return None, "日期格式不正确，应为YYYY-MM或YYYY-M"
-            
-            try:
-                year = int(parts[0])
-                month = int(parts[1])
-            except ValueError:
-                return None, "年份或月份不是有效数字"
-            
-            # 验证年月
-            if not (1900 <= year <= 2100):
-                return None, "年份超出范围(1900-2100)"
-            if not (1 <= month <= 12):
-                return None, "月份超出范围(1-12)"
-            
+            year, month, error = self._parse_year_month(date_str)
+            if error:
+                return None, error
+
             # 计算该月的天数
             _, days_in_month = calendar.monthrange(year, month)
             
@@ -68,4 +85,29 @@ class CalendarService:
             
         except Exception as e:
             logger.error(f"获取月份天数失败: {str(e)}")
-            return None, f"获取月份天数失败: {str(e)}" 
\ No newline at end of file
+            return None, f"获取月份天数失败: {str(e)}"
+
+    def get_month_grid(self, date_str: str) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        获取指定月份的农历月历，包含每一天的农历日期、闰月标记、日干支和节气
+
+        整个月份一次性批量计算，并按(年, 月)缓存结果
+
+        Args:
+            date_str: 日期字符串，格式为YYYY-MM或YYYY-M
+
+        Returns:
+            (grid_data, error): 月历数据和可能的错误信息
+        """
+        logger.info(f"获取农历月历: 日期={date_str}")
+
+        try:
+            year, month, error = self._parse_year_month(date_str)
+            if error:
+                return None, error
+
+            return lunar_month_grid(year, month), None
+
+        except Exception as e:
+            logger.error(f"获取农历月历失败: {str(e)}")
+            return None, f"获取农历月历失败: {str(e)}"
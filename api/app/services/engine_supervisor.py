@@ -0,0 +1,339 @@
+"""
+排盘引擎进程监管：在子进程中运行 py_iztro 引擎，每次调用有硬性截止时间，卡死或崩溃的引擎进程自动替换
+"""
+import faulthandler
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..utils.priority_scheduler import PriorityScheduler, current_priority, parse_class_values
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 引擎隔离方式：process 在子进程中运行引擎，none 在当前进程中直接运行（无法中断卡死的调用）
+ENGINE_ISOLATION = os.environ.get("IZTRO_ENGINE_ISOLATION", "process")
+# 引擎子进程数量，各子进程独立运行，调用可以并行
+ENGINE_PROCESSES = int(os.environ.get("IZTRO_ENGINE_PROCESSES", "1"))
+# 每次调用的截止时间（秒），包括等待空闲引擎进程的时间
+ENGINE_CALL_TIMEOUT = float(os.environ.get("IZTRO_ENGINE_CALL_TIMEOUT", "10"))
+# 引擎子进程启动（加载 iztro）的截止时间（秒）
+ENGINE_START_TIMEOUT = float(os.environ.get("IZTRO_ENGINE_START_TIMEOUT", "60"))
+# 各优先级类别的权重，两个类别都有排队时按权重比例分配空闲引擎进程
+ENGINE_PRIORITY_WEIGHTS = os.environ.get("IZTRO_PRIORITY_WEIGHTS", "interactive=100,batch=1")
+# 各优先级类别同时占用的引擎进程上限，0表示不限制；未配置 batch 时为 子进程数量-1（至少为1），
+# 有多个子进程时总有一个留给 interactive
+ENGINE_PRIORITY_CAPS = os.environ.get("IZTRO_PRIORITY_CAPS", "")
+
+
+class EngineError(Exception):
+    """引擎调用失败，消息为子进程中的原始异常消息"""
+
+
+class EngineTimeoutError(EngineError, TimeoutError):
+    """引擎调用超过截止时间"""
+
+
+class EngineCrashedError(EngineError):
+    """引擎进程在调用过程中退出"""
+
+
+def _create_astro():
+    """默认的引擎工厂：子进程内不缓存，缓存由监管方统一管理"""
+    from py_iztro import Astro
+    # 在就绪前加载引擎，启动截止时间包含引擎的启动耗时
+    return Astro().load()
+
+
+def _config_key(config: Any) -> tuple:
+    """引擎配置 py_iztro.EngineConfig 的缓存键，未传入时为默认配置"""
+    return config.key() if config is not None else ()
+
+
+def _detach(data: Any) -> Any:
+    """去掉星盘上的 JS 对象引用，使其可以跨进程传递（复制后再释放，不影响子进程中的星盘）"""
+    if hasattr(data, "detach"):
+        data = data.model_copy().detach()
+    return data
+
+
+def _engine_main(conn, factory: Callable[[], Any]):
+    """引擎子进程入口：创建引擎后循环执行父进程发来的调用"""
+    faulthandler.enable()
+    try:
+        engine = factory()
+    except Exception as e:
+        conn.send(("error", f"引擎初始化失败: {str(e)}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            method, args, kwargs = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", _detach(getattr(engine, method)(*args, **kwargs))))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _EngineProcess:
+    """一个引擎子进程及其通信管道"""
+
+    def __init__(self, context, factory: Callable[[], Any], start_timeout: float):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_engine_main, args=(child_conn, factory), name="iztro-engine",
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(start_timeout):
+            self.kill()
+            raise EngineTimeoutError(f"引擎进程启动超过{start_timeout}秒")
+        status, value = self.conn.recv()
+        if status != "ready":
+            self.kill()
+            raise EngineError(value)
+        self.pid = value
+
+    def call(self, method: str, args: tuple, kwargs: dict, timeout: float) -> Any:
+        try:
+            self.conn.send((method, args, kwargs))
+            if not self.conn.poll(max(timeout, 0)):
+                raise EngineTimeoutError(f"引擎调用 {method} 超过截止时间")
+            status, value = self.conn.recv()
+        except (EOFError, ConnectionError) as e:
+            self.process.join(timeout=1)
+            raise EngineCrashedError(f"引擎进程在调用 {method} 时退出，退出码: {self.process.exitcode}") from e
+        if status != "ok":
+            raise EngineError(value)
+        return value
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SupervisedEngine:
+    """
+    进程隔离的排盘引擎，接口与 py_iztro.Astro 相同
+
+    SpiderMonkey 的调用无法从其他线程中断，崩溃（SIGSEGV）也会带走整个进程，因此引擎运行在子进程中：
+    调用超过截止时间或子进程退出时，立即向调用方返回错误，杀掉该子进程并在后台启动新的子进程替换。
+    星盘缓存保存在当前进程，命中时不经过子进程，替换引擎进程也不会丢失缓存。
+    """
+
+    def __init__(self, cache_size: int = 0, processes: int = ENGINE_PROCESSES,
+                 call_timeout: float = ENGINE_CALL_TIMEOUT, start_timeout: float = ENGINE_START_TIMEOUT,
+                 factory: Callable[[], Any] = _create_astro, weights: Optional[Dict[str, float]] = None,
+                 caps: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            cache_size: 星盘缓存容量，0表示不缓存
+            processes: 引擎子进程数量
+            call_timeout: 每次调用的默认截止时间（秒）
+            start_timeout: 引擎子进程启动的截止时间（秒）
+            factory: 在子进程中创建引擎的函数，必须可以被 pickle（模块级函数）
+            weights: 优先级类别 -> 权重【可选】，默认读取 IZTRO_PRIORITY_WEIGHTS
+            caps: 优先级类别 -> 并发上限【可选】，默认读取 IZTRO_PRIORITY_CAPS
+        """
+        from py_iztro.cache import ChartCache
+        self.cache = ChartCache(cache_size) if cache_size > 0 else None
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.processes = max(processes, 1)
+        self._factory = factory
+        # 使用 spawn 启动子进程，避免 fork 继承 SpiderMonkey 运行时和其他线程持有的锁
+        self._context = multiprocessing.get_context("spawn")
+        if weights is None:
+            weights = parse_class_values(ENGINE_PRIORITY_WEIGHTS)
+        if caps is None:
+            caps = {"batch": max(self.processes - 1, 1), **parse_class_values(ENGINE_PRIORITY_CAPS)}
+        # 空闲引擎进程由调度器按调用的优先级类别分配
+        self._scheduler = PriorityScheduler(weights, caps)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"calls": 0, "failed": 0, "timeouts": 0, "crashes": 0, "restarts": 0, "start_failures": 0}
+
+        # 第一个子进程同步启动，启动失败时直接抛出异常，由调用方决定是否退回模拟引擎
+        self._scheduler.put(_EngineProcess(self._context, factory, start_timeout))
+        for _ in range(self.processes - 1):
+            self._replace()
+        logger.info(f"引擎进程监管已启动: {self.processes}个子进程, 调用截止时间{call_timeout}秒")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _replace(self):
+        """在后台线程中启动新的子进程，启动失败时稍后重试"""
+        def start():
+            delay = 1.0
+            while not self._closed:
+                try:
+                    engine_process = _EngineProcess(self._context, self._factory, self.start_timeout)
+                except Exception as e:
+                    self._count("start_failures")
+                    logger.error(f"启动引擎进程失败，{delay:.0f}秒后重试: {str(e)}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 60)
+                    continue
+                if self._closed:
+                    engine_process.kill()
+                else:
+                    self._scheduler.put(engine_process)
+                return
+
+        threading.Thread(target=start, name="iztro-engine-restart", daemon=True).start()
+
+    def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在引擎子进程中调用引擎方法，按当前上下文的优先级类别（见 app.utils.priority_scheduler.priority）排队
+
+        Args:
+            method: 方法名，如 by_solar
+            *args: 位置参数
+            timeout: 截止时间（秒）【可选】，默认为 call_timeout
+            **kwargs: 关键字参数
+
+        Returns:
+            方法返回值
+
+        Raises:
+            EngineTimeoutError: 等待空闲引擎进程或调用超过截止时间
+            EngineCrashedError: 引擎进程在调用过程中退出
+            EngineError: 引擎方法抛出异常
+        """
+        deadline = time.monotonic() + (self.call_timeout if timeout is None else timeout)
+        self._count("calls")
+        priority_class = current_priority()
+        engine_process = self._scheduler.acquire(priority_class, deadline - time.monotonic())
+        if engine_process is None:
+            self._count("timeouts")
+            raise EngineTimeoutError(f"等待空闲引擎进程超过截止时间: {method} ({priority_class})")
+
+        try:
+            result = engine_process.call(method, args, kwargs, deadline - time.monotonic())
+        except (EngineTimeoutError, EngineCrashedError) as e:
+            self._count("timeouts" if isinstance(e, EngineTimeoutError) else "crashes")
+            self._count("restarts")
+            logger.error(f"{str(e)}，替换引擎进程 (pid={engine_process.pid})")
+            engine_process.kill()
+            self._scheduler.release(priority_class)
+            self._replace()
+            raise
+        except EngineError:
+            self._count("failed")
+            self._scheduler.release(priority_class, engine_process)
+            raise
+        self._scheduler.release(priority_class, engine_process)
+        return result
+
+    def max_concurrency(self, priority_class: str) -> int:
+        """
+        某个优先级类别最多同时占用的引擎进程数量，批量任务按此决定并发数
+
+        Args:
+            priority_class: 优先级类别
+
+        Returns:
+            并发上限，未限制时为引擎进程数量
+        """
+        return min(self._scheduler.caps.get(priority_class) or self.processes, self.processes)
+
+    def by_solar(self, solar_date_str: str, time_index: int, gender: str, fix_leap: bool = True,
+                 language: str = "zh-CN", config=None):
+        """通过阳历获取星盘信息，参数同 py_iztro.Astro.by_solar"""
+        from py_iztro.cache import chart_cache_key
+        key = chart_cache_key(solar_date_str, time_index, gender, fix_leap, language, _config_key(config))
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        data = self.call("by_solar", key[0], time_index, gender, fix_leap, language, config)
+        if self.cache is not None:
+            self.cache.set(key, data)
+        return data
+
+    def by_lunar(self, lunar_date_str: str, time_index: int, gender: str, is_leap_month: bool = False,
+                 fix_leap: bool = True, language: str = "zh-CN", config=None):
+        """通过农历获取星盘信息，参数同 py_iztro.Astro.by_lunar，内置农历表范围内与阳历共用缓存"""
+        from py_iztro.cache import chart_cache_key, normalize_date_str
+        from py_iztro.lunar import LUNAR_MAX_YEAR, LUNAR_MIN_YEAR, lunar_to_solar
+        year = normalize_date_str(lunar_date_str).split("-")[0]
+        if year.lstrip("-").isdigit() and LUNAR_MIN_YEAR <= int(year) <= LUNAR_MAX_YEAR:
+            return self.by_solar(lunar_to_solar(lunar_date_str, is_leap_month), time_index, gender, fix_leap,
+                                 language, config)
+
+        data = self.call("by_lunar", lunar_date_str, time_index, gender, is_leap_month, fix_leap, language, config)
+        if self.cache is not None:
+            self.cache.set(chart_cache_key(data.solar_date, time_index, gender, fix_leap, language,
+                                           _config_key(config)), data)
+        return data
+
+    def horoscope_by_solar(self, solar_date_str: str, time_index: int, gender: str, target_date_str: str,
+                           target_time_index: int, fix_leap: bool = True, language: str = "zh-CN", config=None):
+        """通过阳历出生信息获取运限，参数同 py_iztro.Astro.horoscope_by_solar"""
+        from py_iztro.cache import chart_cache_key, normalize_date_str
+        key = (
+            "horoscope",
+            *chart_cache_key(solar_date_str, time_index, gender, fix_leap, language, _config_key(config)),
+            normalize_date_str(target_date_str),
+            target_time_index,
+        )
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        data = self.call("horoscope_by_solar", key[1], time_index, gender, key[-2], target_time_index, fix_leap,
+                         language, config)
+        if self.cache is not None:
+            self.cache.set(key, data)
+        return data
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        引擎内存统计：当前进程的 RSS 与星盘缓存，以及一个空闲引擎子进程的 RSS 与 JS 对象句柄
+
+        Returns:
+            统计信息，子进程统计获取失败时 engine 为None
+        """
+        from py_iztro.handles import rss_bytes
+        try:
+            engine_stats = self.call("memory_stats", timeout=min(self.call_timeout, 2))
+        except EngineError as e:
+            logger.warning(f"获取引擎子进程内存统计失败: {str(e)}")
+            engine_stats = None
+        return {
+            "rss_bytes": rss_bytes(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "engine": engine_stats,
+        }
+
+    def collect_garbage(self):
+        """在一个空闲引擎子进程中触发 JS 垃圾回收"""
+        self.call("collect_garbage")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        引擎进程监管统计信息
+
+        Returns:
+            调用次数、失败次数、超时次数、崩溃次数、替换次数、空闲进程数，以及按优先级类别的排队统计
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        return dict(stats, processes=self.processes, idle=self._scheduler.idle_count(),
+                    call_timeout=self.call_timeout, priority=self._scheduler.stats())
+
+    def close(self):
+        """停止所有空闲的引擎子进程"""
+        self._closed = True
+        for engine_process in self._scheduler.drain():
+            engine_process.kill()
@@ -0,0 +1,335 @@
+"""
+实时运限推送服务
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from ..utils import normalize_date
+from .prerender_service import next_boundary, TargetSlot
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 实时推送配置，通过环境变量配置
+# 单个连接最多订阅的出生信息数量
+LIVE_MAX_CHARTS = int(os.environ.get("IZTRO_LIVE_MAX_CHARTS", "20"))
+# 没有新运限时发送心跳的间隔（秒），避免代理断开空闲连接
+LIVE_HEARTBEAT = float(os.environ.get("IZTRO_LIVE_HEARTBEAT", "15"))
+# 每个连接待发送事件的上限，客户端读取过慢时丢弃最早的事件
+LIVE_QUEUE_SIZE = int(os.environ.get("IZTRO_LIVE_QUEUE_SIZE", "64"))
+
+# 订阅的出生信息：(规范化的阳历日期, 时辰序号, 性别)
+ChartKey = Tuple[str, int, str]
+
+# 全局推送中心
+_hub_instance = None
+_hub_lock = threading.Lock()
+
+
+def current_slot(now: datetime) -> TargetSlot:
+    """
+    当前所在的日期与时辰
+
+    Args:
+        now: 当前时间
+
+    Returns:
+        (日期, 时辰序号)，23点之后为当天的晚子时
+    """
+    hour = now.hour
+    time_index = 0 if hour == 0 else 12 if hour == 23 else (hour + 1) // 2
+    return f"{now.year}-{now.month}-{now.day}", time_index
+
+
+def parse_chart_key(text: str) -> ChartKey:
+    """
+    解析订阅的出生信息
+
+    Args:
+        text: 格式为 阳历日期,时辰序号,性别，如 2000-8-16,2,女
+
+    Returns:
+        (规范化的阳历日期, 时辰序号, 性别)
+    """
+    parts = [part.strip() for part in text.split(",")]
+    if len(parts) != 3 or not parts[1].isdigit():
+        raise ValueError(f"出生信息格式错误: {text}，应为 阳历日期,时辰序号,性别")
+    solar_date, time_index, gender = normalize_date(parts[0]), int(parts[1]), parts[2]
+    if not 0 <= time_index <= 12:
+        raise ValueError(f"时辰序号必须在 0 到 12 之间: {text}")
+    if gender not in ("男", "女"):
+        raise ValueError(f"性别必须为 男 或 女: {text}")
+    return solar_date, time_index, gender
+
+
+def format_chart_key(key: ChartKey) -> str:
+    """订阅的出生信息在事件中的写法"""
+    return f"{key[0]},{key[1]},{key[2]}"
+
+
+class LiveSubscription:
+    """
+    一个连接的订阅，推送中心在调度线程中把事件放入该连接所在事件循环的队列
+    """
+
+    def __init__(self, keys: List[ChartKey], loop: asyncio.AbstractEventLoop, queue_size: int = LIVE_QUEUE_SIZE):
+        self.keys = keys
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def _put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            # 客户端读取过慢，只保留较新的事件
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def offer(self, event: Dict[str, Any]):
+        """从任意线程投递事件"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # 连接所在的事件循环已关闭，等待取消订阅
+            pass
+
+
+class LiveHoroscopeHub:
+    """
+    实时运限推送中心
+
+    所有连接的订阅按出生信息合并，单个调度线程在每个时辰交界计算一次每个被订阅的出生信息的运限，
+    只有流日或流时发生变化时才分发给订阅该出生信息的全部连接；新连接先取得当前时辰的运限，
+    同一时辰内已计算过的直接复用。
+    """
+
+    def __init__(self, astro_service):
+        """
+        Args:
+            astro_service: 紫微斗数计算服务
+        """
+        self.astro_service = astro_service
+        self._subscribers: Dict[ChartKey, Set[LiveSubscription]] = {}
+        # 每个出生信息最近一次计算的 (目标日期与时辰, 事件)
+        self._latest: Dict[ChartKey, Tuple[TargetSlot, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Any] = {
+            "boundaries": 0,
+            "computed": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "pushed": 0,
+            "next_boundary": None,
+            "last_run": None,
+        }
+
+    def subscribe(self, keys: List[ChartKey], loop: asyncio.AbstractEventLoop) -> LiveSubscription:
+        """
+        订阅出生信息的运限变化
+
+        Args:
+            keys: 出生信息
+            loop: 连接所在的事件循环
+
+        Returns:
+            订阅，事件从其 queue 中读取
+        """
+        subscription = LiveSubscription(keys, loop)
+        with self._lock:
+            for key in keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription):
+        """取消订阅，没有连接订阅的出生信息不再计算"""
+        with self._lock:
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[key]
+                    self._latest.pop(key, None)
+
+    def _compute(self, key: ChartKey, slot: TargetSlot) -> Dict[str, Any]:
+        solar_date, time_index, gender = key
+        target_date, target_time_index = slot
+        event = {"chart": format_chart_key(key), "targetDate": target_date, "targetTimeIndex": target_time_index}
+        horoscope, error = self.astro_service.render_horoscope(
+            solar_date, time_index, gender, target_date, target_time_index
+        )
+        with self._lock:
+            self._stats["computed"] += 1
+            if error:
+                self._stats["failed"] += 1
+        if error:
+            event["error"] = error
+        else:
+            event["horoscope"] = horoscope
+        return event
+
+    def current(self, key: ChartKey) -> Dict[str, Any]:
+        """
+        出生信息当前时辰的运限事件，同一时辰内只计算一次
+
+        Args:
+            key: 出生信息
+
+        Returns:
+            事件：chart、targetDate、targetTimeIndex，以及 horoscope 或 error
+        """
+        slot = current_slot(datetime.now())
+        with self._lock:
+            latest = self._latest.get(key)
+        if latest is not None and latest[0] == slot:
+            return latest[1]
+        event = self._compute(key, slot)
+        with self._lock:
+            if key in self._subscribers and "error" not in event:
+                self._latest[key] = (slot, event)
+        return event
+
+    @staticmethod
+    def _changed(previous: Optional[Dict[str, Any]], event: Dict[str, Any]) -> bool:
+        if previous is None or "horoscope" not in previous or "horoscope" not in event:
+            return True
+        old, new = previous["horoscope"], event["horoscope"]
+        return old.get("daily") != new.get("daily") or old.get("hourly") != new.get("hourly")
+
+    def push(self, slot: TargetSlot) -> Dict[str, Any]:
+        """
+        为所有被订阅的出生信息计算指定时辰的运限，流日或流时变化时分发给订阅的连接
+
+        Args:
+            slot: (目标日期, 目标时辰序号)
+
+        Returns:
+            本次推送的统计信息
+        """
+        started = time.monotonic()
+        with self._lock:
+            keys = list(self._subscribers)
+        pushed = unchanged = 0
+        for key in keys:
+            if self._stop.is_set():
+                break
+            with self._lock:
+                latest = self._latest.get(key)
+            if latest is not None and latest[0] == slot:
+                # 新连接已经在本时辰内取得过
+                continue
+            event = self._compute(key, slot)
+            with self._lock:
+                subscribers = list(self._subscribers.get(key, ()))
+                if not subscribers:
+                    continue
+                if "error" not in event:
+                    self._latest[key] = (slot, event)
+            if not self._changed(latest[1] if latest else None, event):
+                unchanged += 1
+                continue
+            for subscription in subscribers:
+                subscription.offer(event)
+            pushed += len(subscribers)
+
+        run = {
+            "slot": list(slot),
+            "charts": len(keys),
+            "pushed": pushed,
+            "unchanged": unchanged,
+            "duration": round(time.monotonic() - started, 3),
+        }
+        with self._lock:
+            self._stats["boundaries"] += 1
+            self._stats["pushed"] += pushed
+            self._stats["unchanged"] += unchanged
+            self._stats["last_run"] = run
+        logger.info(f"实时运限推送完成: {run}")
+        return run
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = datetime.now()
+            boundary, slots = next_boundary(now, "shichen")
+            with self._lock:
+                self._stats["next_boundary"] = boundary.isoformat()
+            # 分段等待，避免系统时间调整后睡过头
+            wait_seconds = (boundary - now).total_seconds()
+            if wait_seconds > 0:
+                self._stop.wait(min(wait_seconds, 60))
+                if datetime.now() < boundary:
+                    continue
+            if not self._stop.is_set():
+                self.push(slots[0])
+
+    def start(self):
+        """在后台线程中启动调度"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="horoscope-live", daemon=True)
+        self._thread.start()
+        logger.info("实时运限推送调度已启动")
+
+    def stop(self):
+        """停止调度"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = set().union(*self._subscribers.values()) if self._subscribers else set()
+            return dict(
+                self._stats,
+                charts=len(self._subscribers),
+                connections=len(subscriptions),
+                dropped=sum(subscription.dropped for subscription in subscriptions),
+            )
+
+
+def get_live_horoscope_hub() -> Optional[LiveHoroscopeHub]:
+    """
+    获取实时运限推送中心（每个进程一个）
+
+    Returns:
+        推送中心，无法使用真实引擎时返回None
+    """
+    global _hub_instance
+
+    with _hub_lock:
+        if _hub_instance is None:
+            from .astro_service import AstroService
+            astro_service = AstroService()
+            if not astro_service.using_real_engine:
+                logger.warning("模拟数据引擎不支持实时运限推送")
+                return None
+            _hub_instance = LiveHoroscopeHub(astro_service)
+        return _hub_instance
+
+
+def get_live_status() -> Dict[str, Any]:
+    """
+    获取实时运限推送状态
+
+    Returns:
+        推送状态，尚未有连接订阅时 enabled 为 false
+    """
+    if _hub_instance is None:
+        return {"enabled": False}
+    return dict(_hub_instance.status(), enabled=True)
+
+
+def stop_live_horoscope_hub():
+    """停止实时运限推送调度"""
+    if _hub_instance is not None:
+        _hub_instance.stop()
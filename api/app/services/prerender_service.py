@@ -0,0 +1,301 @@
+"""
+流日/流时运限定时预渲染服务
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..utils.priority_scheduler import priority
+from .result_cache import get_result_cache, load_results, store_results
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 预渲染配置，通过环境变量配置
+# 已登记的出生信息文件，未配置时不启动预渲染
+REGISTRY_PATH_ENV = "IZTRO_HOROSCOPE_REGISTRY"
+# 在日/时辰交界前多少秒开始预渲染
+PRERENDER_LEAD = float(os.environ.get("IZTRO_PRERENDER_LEAD", "300"))
+# 预渲染粒度：shichen 为每个时辰交界前渲染下一个时辰，daily 为每天零点前一次渲染次日全部十三个时辰
+PRERENDER_SCOPE = os.environ.get("IZTRO_PRERENDER_SCOPE", "shichen")
+
+# 批量读写结果缓存时每批的条目数
+PRERENDER_BATCH_SIZE = int(os.environ.get("IZTRO_PRERENDER_BATCH_SIZE", "100"))
+
+# 时辰序号对应的起始小时：0为早子时(00:00)，1为丑时(01:00)，……，11为亥时(21:00)，12为晚子时(23:00)
+SHICHEN_START_HOURS = (0, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23)
+
+# 出生信息：(阳历日期, 时辰序号, 性别)
+NatalInput = Tuple[str, int, str]
+# 预渲染目标：(目标日期, 目标时辰序号)
+TargetSlot = Tuple[str, int]
+
+# 全局调度器
+_scheduler_instance = None
+
+
+def _format_date(day: date) -> str:
+    return f"{day.year}-{day.month}-{day.day}"
+
+
+def next_boundary(now: datetime, scope: str = "shichen") -> Tuple[datetime, List[TargetSlot]]:
+    """
+    计算下一个日/时辰交界以及交界后需要的运限目标
+
+    Args:
+        now: 当前时间
+        scope: shichen 为下一个时辰，daily 为次日全部时辰
+
+    Returns:
+        (交界时间, [(目标日期, 目标时辰序号), ...])
+    """
+    tomorrow = now.date() + timedelta(days=1)
+    midnight = datetime.combine(tomorrow, datetime.min.time())
+    if scope == "daily":
+        return midnight, [(_format_date(tomorrow), index) for index in range(len(SHICHEN_START_HOURS))]
+
+    for index, hour in enumerate(SHICHEN_START_HOURS[1:], start=1):
+        boundary = datetime.combine(now.date(), datetime.min.time()) + timedelta(hours=hour)
+        if boundary > now:
+            return boundary, [(_format_date(now.date()), index)]
+    return midnight, [(_format_date(tomorrow), 0)]
+
+
+def load_registry(path: str) -> List[NatalInput]:
+    """
+    读取已登记的出生信息
+
+    文件格式：{"charts": [{"solar_date": "2000-8-16", "time_index": 2, "gender": "女"}, ...]}
+
+    Args:
+        path: 登记文件路径
+
+    Returns:
+        出生信息列表
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [(item["solar_date"], int(item["time_index"]), item["gender"]) for item in data.get("charts", [])]
+
+
+class HoroscopePrerenderScheduler:
+    """
+    运限定时预渲染调度器
+
+    在每个日/时辰交界前 `lead` 秒，为所有已登记的出生信息批量计算交界之后的运限并写入引擎缓存和结果缓存，
+    交界之后的“今日运势”请求直接命中缓存。
+    """
+
+    def __init__(self, astro_service, registry: List[NatalInput], lead: float = PRERENDER_LEAD,
+                 scope: str = PRERENDER_SCOPE):
+        """
+        Args:
+            astro_service: 紫微斗数计算服务
+            registry: 已登记的出生信息
+            lead: 在交界前多少秒开始预渲染
+            scope: shichen 或 daily
+        """
+        if scope not in ("shichen", "daily"):
+            raise ValueError(f"不支持的预渲染粒度: {scope}")
+        self.astro_service = astro_service
+        self.registry = list(registry)
+        self.lead = lead
+        self.scope = scope
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._status: Dict[str, Any] = {
+            "registered": len(self.registry),
+            "scope": scope,
+            "lead": lead,
+            "runs": 0,
+            "rendered": 0,
+            "failed": 0,
+            "late_runs": 0,
+            "next_boundary": None,
+            "last_run": None,
+        }
+
+    def _workers(self) -> int:
+        """并发渲染的线程数：引擎进程监管时为 batch 类别可占用的引擎进程数，进程内引擎只能逐个计算"""
+        max_concurrency = getattr(self.astro_service.engine, "max_concurrency", None)
+        return max(max_concurrency("batch"), 1) if max_concurrency else 1
+
+    def _render_one(self, natal: NatalInput, target_date: str, target_time_index: int):
+        solar_date, time_index, gender = natal
+        # 线程池中的线程不继承调用方的上下文，在每个任务中重新设置优先级
+        with priority("batch"):
+            return self.astro_service.render_horoscope(
+                solar_date, time_index, gender, target_date, target_time_index, store=False
+            )
+
+    def render(self, slots: List[TargetSlot], boundary: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        为所有已登记的出生信息计算指定目标的运限，按 batch 优先级调用引擎，不挤占用户请求；
+        每批分发到 batch 类别可用的全部引擎进程并行计算
+
+        Args:
+            slots: [(目标日期, 目标时辰序号), ...]
+            boundary: 对应的交界时间【可选】，用于统计是否在交界前完成
+
+        Returns:
+            本次预渲染的统计信息
+        """
+        with priority("batch"):
+            return self._render(slots, boundary)
+
+    def _render(self, slots: List[TargetSlot], boundary: Optional[datetime]) -> Dict[str, Any]:
+        started = time.monotonic()
+        rendered = failed = cached = 0
+        workers = self._workers()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="horoscope-prerender")
+        for target_date, target_time_index in slots:
+            for offset in range(0, len(self.registry), PRERENDER_BATCH_SIZE):
+                if self._stop.is_set():
+                    break
+                batch = self.registry[offset:offset + PRERENDER_BATCH_SIZE]
+                keys = [self.astro_service.horoscope_cache_key(solar_date, time_index, gender, target_date,
+                                                               target_time_index)
+                        for solar_date, time_index, gender in batch]
+                # 一次批量读取跳过已有结果（例如其他机器已经渲染过），新结果合并后一次写入
+                existing = load_results(keys)
+                pending = []
+                for key, found, natal in zip(keys, existing, batch):
+                    if found is not None:
+                        cached += 1
+                        continue
+                    pending.append((key, pool.submit(self._render_one, natal, target_date, target_time_index)))
+                results = []
+                for key, future in pending:
+                    result, error = future.result()
+                    if error:
+                        failed += 1
+                    else:
+                        rendered += 1
+                        results.append((key, result))
+                store_results(results)
+        pool.shutdown()
+
+        late = boundary is not None and datetime.now() > boundary
+        run = {
+            "boundary": boundary.isoformat() if boundary else None,
+            "slots": [list(slot) for slot in slots],
+            "rendered": rendered,
+            "cached": cached,
+            "failed": failed,
+            "workers": workers,
+            "duration": round(time.monotonic() - started, 3),
+            "late": late,
+        }
+        with self._lock:
+            self._status["runs"] += 1
+            self._status["rendered"] += rendered
+            self._status["failed"] += failed
+            self._status["late_runs"] += int(late)
+            self._status["last_run"] = run
+        if late:
+            logger.warning(f"运限预渲染未能在交界前完成: {run}")
+        else:
+            logger.info(f"运限预渲染完成: {run}")
+        return run
+
+    def _loop(self):
+        rendered_boundary = None
+        while not self._stop.is_set():
+            now = datetime.now()
+            boundary, slots = next_boundary(now, self.scope)
+            with self._lock:
+                self._status["next_boundary"] = boundary.isoformat()
+
+            if boundary == rendered_boundary:
+                # 本次交界已渲染，等到交界之后再计算下一个
+                self._stop.wait((boundary - now).total_seconds() + 1)
+                continue
+
+            wait_seconds = (boundary - timedelta(seconds=self.lead) - now).total_seconds()
+            if wait_seconds > 0:
+                # 分段等待，避免系统时间调整后睡过头
+                self._stop.wait(min(wait_seconds, 60))
+                continue
+
+            self.render(slots, boundary)
+            rendered_boundary = boundary
+
+    def start(self):
+        """在后台线程中启动调度"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="horoscope-prerender", daemon=True)
+        self._thread.start()
+        logger.info(f"运限预渲染调度已启动: 登记{len(self.registry)}个出生信息, 粒度={self.scope}, 提前{self.lead}秒")
+
+    def stop(self):
+        """停止调度"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._status)
+
+
+def start_prerender_scheduler() -> Optional[HoroscopePrerenderScheduler]:
+    """
+    根据环境变量启动运限预渲染调度（每个进程只启动一次）
+
+    Returns:
+        调度器，未配置登记文件或无法使用真实引擎时返回None
+    """
+    global _scheduler_instance
+
+    if _scheduler_instance is not None:
+        return _scheduler_instance
+
+    registry_path = os.environ.get(REGISTRY_PATH_ENV)
+    if not registry_path:
+        return None
+
+    from .astro_service import AstroService
+    astro_service = AstroService()
+    if not astro_service.using_real_engine:
+        logger.warning("模拟数据引擎不支持运限预渲染")
+        return None
+
+    try:
+        registry = load_registry(registry_path)
+    except Exception as e:
+        logger.error(f"读取出生信息登记文件失败: {registry_path}, {str(e)}")
+        return None
+
+    cache = getattr(astro_service.engine, "cache", None)
+    per_boundary = len(registry) * (len(SHICHEN_START_HOURS) if PRERENDER_SCOPE == "daily" else 1)
+    if get_result_cache() is None and (cache is None or cache.max_size < per_boundary + len(registry)):
+        logger.warning("排盘引擎缓存容量不足以容纳全部预渲染结果，请调大 IZTRO_CHART_CACHE_SIZE")
+
+    _scheduler_instance = HoroscopePrerenderScheduler(astro_service, registry)
+    _scheduler_instance.start()
+    return _scheduler_instance
+
+
+def get_prerender_status() -> Dict[str, Any]:
+    """
+    获取运限预渲染调度状态
+
+    Returns:
+        调度状态，未启动时 enabled 为 false
+    """
+    if _scheduler_instance is None:
+        return {"enabled": False}
+    return dict(_scheduler_instance.status(), enabled=True)
+
+
+def stop_prerender_scheduler():
+    """停止运限预渲染调度"""
+    if _scheduler_instance is not None:
+        _scheduler_instance.stop()
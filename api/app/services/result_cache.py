@@ -0,0 +1,222 @@
+"""
+星盘结果缓存：缓存处理后的本命盘、大限流年数据，供多个 worker 进程或多台机器共用
+"""
+import json
+import logging
+import os
+import zlib
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .cache_backends import (
+    CacheBackend, MemoryCacheBackend, DiskCacheBackend, SharedMemoryCacheBackend, RedisCacheBackend,
+    NearCacheBackend
+)
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 结果缓存后端：memory、disk、shm、redis，未设置时若设置了共享内存名称则使用 shm，否则不启用
+CACHE_BACKEND_ENV = "IZTRO_CACHE_BACKEND"
+# 结果缓存条目的过期时间（秒），0 表示不过期（共享内存后端不支持过期时间）
+CACHE_TTL = int(os.environ.get("IZTRO_CACHE_TTL", "0"))
+# 内存后端最多缓存的条目数
+MEMORY_CACHE_SIZE = int(os.environ.get("IZTRO_MEMORY_CACHE_SIZE", "4096"))
+# 磁盘后端的缓存目录
+DISK_CACHE_DIR = os.environ.get("IZTRO_CACHE_DIR", "cache/results")
+# 共享内存后端配置
+SHM_CACHE_NAME_ENV = "IZTRO_SHM_CACHE_NAME"
+SHM_CACHE_SIZE_MB = int(os.environ.get("IZTRO_SHM_CACHE_SIZE_MB", "64"))
+SHM_CACHE_SLOT_SIZE = int(os.environ.get("IZTRO_SHM_CACHE_SLOT_SIZE", "4096"))
+# Redis 后端配置
+REDIS_URL = os.environ.get("IZTRO_REDIS_URL", "redis://127.0.0.1:6379/0")
+REDIS_KEY_PREFIX = os.environ.get("IZTRO_REDIS_KEY_PREFIX", "iztro:")
+REDIS_POOL_SIZE = int(os.environ.get("IZTRO_REDIS_POOL_SIZE", "16"))
+REDIS_TIMEOUT = float(os.environ.get("IZTRO_REDIS_TIMEOUT", "0.5"))
+# Redis 后端的近端缓存条目数与保留时间（秒），条目数为 0 时不使用近端缓存
+NEAR_CACHE_SIZE = int(os.environ.get("IZTRO_NEAR_CACHE_SIZE", "1024"))
+NEAR_CACHE_TTL = int(os.environ.get("IZTRO_NEAR_CACHE_TTL", "60"))
+
+# 缓存值格式版本，写在压缩数据之前，格式变化时旧条目按未命中处理
+_VALUE_VERSION = b"\x01"
+
+# 全局结果缓存实例
+_result_cache_instance: Optional[CacheBackend] = None
+_result_cache_initialized = False
+
+
+def create_cache_backend(backend: str) -> CacheBackend:
+    """
+    按名称创建缓存后端，参数从环境变量读取
+
+    Args:
+        backend: memory、disk、shm 或 redis
+
+    Returns:
+        缓存后端
+    """
+    if backend == "memory":
+        return MemoryCacheBackend(MEMORY_CACHE_SIZE)
+    if backend == "disk":
+        return DiskCacheBackend(DISK_CACHE_DIR)
+    if backend == "shm":
+        name = os.environ.get(SHM_CACHE_NAME_ENV) or "iztro_result_cache"
+        return SharedMemoryCacheBackend(name, SHM_CACHE_SIZE_MB * 1024 * 1024, SHM_CACHE_SLOT_SIZE)
+    if backend == "redis":
+        remote = RedisCacheBackend(REDIS_URL, REDIS_KEY_PREFIX, REDIS_POOL_SIZE, REDIS_TIMEOUT)
+        if NEAR_CACHE_SIZE > 0:
+            return NearCacheBackend(remote, NEAR_CACHE_SIZE, NEAR_CACHE_TTL)
+        return remote
+    raise ValueError(f"不支持的结果缓存后端: {backend}")
+
+
+def get_result_cache() -> Optional[CacheBackend]:
+    """
+    获取结果缓存（带缓存）
+
+    Returns:
+        结果缓存后端，未启用或初始化失败时返回None
+    """
+    global _result_cache_instance, _result_cache_initialized
+
+    if _result_cache_initialized:
+        return _result_cache_instance
+    _result_cache_initialized = True
+
+    backend = os.environ.get(CACHE_BACKEND_ENV) or ("shm" if os.environ.get(SHM_CACHE_NAME_ENV) else "")
+    if not backend:
+        return None
+
+    try:
+        _result_cache_instance = create_cache_backend(backend.lower())
+        logger.info(f"结果缓存已启用: {backend}")
+    except Exception as e:
+        logger.error(f"初始化结果缓存失败，将不使用结果缓存: {str(e)}")
+    return _result_cache_instance
+
+
+def result_cache_key(kind: str, *parts: Any) -> str:
+    """
+    结果缓存键
+
+    Args:
+        kind: 结果类型，如 natal、horoscope
+        *parts: 规范化后的请求参数
+
+    Returns:
+        缓存键
+    """
+    return "|".join([kind, *map(str, parts)])
+
+
+def encode_result(result: Dict[str, Any]) -> bytes:
+    """
+    把结果序列化为紧凑的字节串：版本字节 + 压缩后的JSON
+
+    Args:
+        result: 结果字典
+
+    Returns:
+        字节串
+    """
+    data = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _VALUE_VERSION + zlib.compress(data, 1)
+
+
+def decode_result(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    反序列化 encode_result 生成的字节串
+
+    Returns:
+        结果字典，版本不一致时返回None
+    """
+    if data[:1] != _VALUE_VERSION:
+        return None
+    return json.loads(zlib.decompress(data[1:]))
+
+
+def load_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    读取缓存的结果
+
+    Args:
+        key: 缓存键
+
+    Returns:
+        结果字典，未命中时返回None
+    """
+    return load_results([key])[0]
+
+
+def load_results(keys: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    批量读取缓存的结果，远程后端只产生一次网络往返
+
+    Args:
+        keys: 缓存键列表
+
+    Returns:
+        与键一一对应的结果字典，未命中的位置为None
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return [None] * len(keys)
+    try:
+        values = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"读取结果缓存失败: {str(e)}")
+        return [None] * len(keys)
+
+    results = []
+    for key, data in zip(keys, values):
+        try:
+            results.append(None if data is None else decode_result(data))
+        except Exception as e:
+            logger.warning(f"解析结果缓存失败: {key}, {str(e)}")
+            results.append(None)
+    return results
+
+
+def store_result(key: str, result: Dict[str, Any]):
+    """
+    写入结果缓存
+
+    Args:
+        key: 缓存键
+        result: 结果字典
+    """
+    store_results([(key, result)])
+
+
+def store_results(items: Sequence[Tuple[str, Dict[str, Any]]]):
+    """
+    批量写入结果缓存，远程后端以管道方式一次发送
+
+    Args:
+        items: [(缓存键, 结果字典), ...]
+    """
+    cache = get_result_cache()
+    if cache is None or not items:
+        return
+    try:
+        cache.set_many([(key, encode_result(result)) for key, result in items], CACHE_TTL or None)
+    except Exception as e:
+        logger.warning(f"写入结果缓存失败: {str(e)}")
+
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    """
+    获取结果缓存统计信息
+
+    Returns:
+        统计信息，未启用时 enabled 为 false
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return dict(cache.stats(), enabled=True)
+
+
+def close_result_cache():
+    """释放结果缓存的连接等资源"""
+    if _result_cache_instance is not None:
+        _result_cache_instance.close()
@@ -0,0 +1,126 @@
+"""
+相似星盘检索服务
+"""
+import logging
+import os
+from typing import Dict, Any, Tuple, Optional
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 语料库文件路径，通过环境变量配置
+CORPUS_PATH_ENV = "IZTRO_SIMILARITY_CORPUS"
+
+# 全局语料库缓存
+_corpus_instance = None
+
+
+def get_corpus():
+    """
+    获取相似检索语料库（带缓存）
+
+    Returns:
+        (corpus, error): 语料库实例和可能的错误信息
+    """
+    global _corpus_instance
+
+    if _corpus_instance is not None:
+        return _corpus_instance, None
+
+    corpus_path = os.environ.get(CORPUS_PATH_ENV)
+    if not corpus_path:
+        return None, f"未配置相似检索语料库，请设置环境变量 {CORPUS_PATH_ENV}"
+
+    try:
+        from py_iztro.similarity import ChartCorpus
+        _corpus_instance = ChartCorpus.load(corpus_path)
+        logger.info(f"加载相似检索语料库成功: {corpus_path}, 共{len(_corpus_instance)}张星盘")
+        return _corpus_instance, None
+    except ImportError as e:
+        logger.warning(f"无法导入相似检索模块: {str(e)}")
+        return None, f"相似检索功能不可用: {str(e)}"
+    except Exception as e:
+        logger.error(f"加载相似检索语料库失败: {str(e)}")
+        return None, f"加载相似检索语料库失败: {str(e)}"
+
+
+class SimilarityService:
+    """相似星盘检索服务"""
+
+    def find_similar(self, natal_chart: Dict[str, Any], top_k: int = 10,
+                     metric: str = "shared") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        以盘找盘：在语料库中检索与参考盘共同主星落宫、四化最多的出生信息
+
+        Args:
+            natal_chart: 参考本命盘数据（zh-CN）
+            top_k: 返回数量
+            metric: 相似度，shared为共同特征数，hamming为汉明距离
+
+        Returns:
+            (result, error): 检索结果和可能的错误信息
+        """
+        corpus, error = get_corpus()
+        if error:
+            return None, error
+
+        try:
+            from py_iztro.models import AstrolabeModel
+            reference = AstrolabeModel.model_validate(natal_chart)
+            matches = corpus.search(reference, top_k, metric)
+
+            return {
+                "metric": metric,
+                "corpus_size": len(corpus),
+                "matches": [
+                    {
+                        "input_id": match.input_id,
+                        "solar_date": match.natal_input.solar_date,
+                        "time_index": match.natal_input.time_index,
+                        "gender": match.natal_input.gender,
+                        "score": match.score,
+                    }
+                    for match in matches
+                ],
+            }, None
+        except Exception as e:
+            logger.error(f"相似星盘检索失败: {str(e)}")
+            return None, f"相似星盘检索失败: {str(e)}"
+
+    def find_compatible(self, natal_chart: Dict[str, Any],
+                        top_k: int = 10) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        合盘检索：在语料库中检索与参考盘合盘得分最高的出生信息，直接使用语料库中的编码，不重新排盘
+
+        Args:
+            natal_chart: 参考本命盘数据（zh-CN）
+            top_k: 返回数量
+
+        Returns:
+            (result, error): 检索结果和可能的错误信息
+        """
+        corpus, error = get_corpus()
+        if error:
+            return None, error
+
+        try:
+            from py_iztro.models import AstrolabeModel
+            reference = AstrolabeModel.model_validate(natal_chart)
+            matches = corpus.compatible(reference, top_k)
+
+            return {
+                "corpus_size": len(corpus),
+                "matches": [
+                    {
+                        "input_id": match.input_id,
+                        "solar_date": match.natal_input.solar_date,
+                        "time_index": match.natal_input.time_index,
+                        "gender": match.natal_input.gender,
+                        "score": round(match.score, 3),
+                    }
+                    for match in matches
+                ],
+            }, None
+        except Exception as e:
+            logger.error(f"合盘检索失败: {str(e)}")
+            return None, f"合盘检索失败: {str(e)}"
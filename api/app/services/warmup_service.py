@@ -0,0 +1,161 @@
+"""
+启动缓存预热服务
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from ..utils.priority_scheduler import priority
+from ..utils.traffic_recorder import get_traffic_recorder, ChartKey
+from .result_cache import get_result_cache
+
+# 日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 预热配置，通过环境变量配置
+WARMUP_TOP_K = int(os.environ.get("IZTRO_WARMUP_TOP_K", "500"))
+# 预热的时间预算（秒），超出后停止预热
+WARMUP_TIME_BUDGET = float(os.environ.get("IZTRO_WARMUP_TIME_BUDGET", "60"))
+# 预热最多占用排盘引擎的时间比例（按引擎调用耗时计算），0~1，预热期间与正常请求共用同一组排盘引擎
+WARMUP_CPU_SHARE = float(os.environ.get("IZTRO_WARMUP_CPU_SHARE", "0.5"))
+# 是否在预热完成后才开始接收请求
+WARMUP_BLOCKING = os.environ.get("IZTRO_WARMUP_BLOCKING", "false").lower() in ("1", "true", "yes")
+
+# 全局预热状态
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_status: Dict[str, Any] = {"state": "idle"}
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    """
+    获取预热进度
+
+    Returns:
+        预热状态（idle/running/done/skipped）、总数、已完成数、失败数、耗时等
+    """
+    with _warmup_lock:
+        status = dict(_warmup_status)
+    status["ready"] = status["state"] != "running"
+    return status
+
+
+def _update_status(**kwargs):
+    with _warmup_lock:
+        _warmup_status.update(kwargs)
+
+
+class WarmupService:
+    """启动缓存预热服务：按记录的请求频次，把最热的本命盘提前算入引擎缓存和结果缓存"""
+
+    def __init__(self, astro_service, top_k: int = WARMUP_TOP_K, time_budget: float = WARMUP_TIME_BUDGET,
+                 cpu_share: float = WARMUP_CPU_SHARE):
+        """
+        Args:
+            astro_service: 紫微斗数计算服务
+            top_k: 预热的请求键数量
+            time_budget: 时间预算（秒）
+            cpu_share: 预热最多占用排盘引擎的时间比例，0~1
+        """
+        self.astro_service = astro_service
+        self.top_k = top_k
+        self.time_budget = time_budget
+        self.cpu_share = min(max(cpu_share, 0.01), 1.0)
+
+    def run(self, keys: List[ChartKey]) -> Dict[str, Any]:
+        """
+        依次预热请求键，超出时间预算时停止；每次计算后按引擎占用比例让出时间，引擎调用使用 batch 优先级
+
+        Args:
+            keys: 按优先级排列的请求键
+
+        Returns:
+            预热结束时的状态
+        """
+        total = len(keys)
+        started = time.monotonic()
+        engine_time = 0.0
+        completed = failed = 0
+        next_report = 0.1
+        _update_status(state="running", total=total, completed=0, failed=0, elapsed=0.0,
+                       started_at=datetime.now().isoformat(), stop_reason=None)
+        logger.info(f"开始缓存预热: 共{total}个请求键, 时间预算={self.time_budget}秒, 引擎占用比例={self.cpu_share}")
+
+        stop_reason = None
+        for solar_date, time_index, gender, fix_leap, language in keys:
+            if time.monotonic() - started >= self.time_budget:
+                stop_reason = "time_budget"
+                break
+
+            call_started = time.monotonic()
+            with priority("batch"):
+                _, error = self.astro_service.get_natal_chart(solar_date, time_index, gender, fix_leap, language,
+                                                              record=False)
+            engine_time += time.monotonic() - call_started
+            if error:
+                failed += 1
+            else:
+                completed += 1
+
+            elapsed = time.monotonic() - started
+            _update_status(completed=completed, failed=failed, elapsed=round(elapsed, 3))
+            if total and (completed + failed) / total >= next_report:
+                logger.info(f"缓存预热进度: {completed + failed}/{total}, 失败{failed}, 耗时{elapsed:.1f}秒")
+                next_report += 0.1
+
+            # 按比例让出时间：占用引擎的时间不超过 已用时间 * cpu_share。进程隔离时排盘在引擎子进程中完成，
+            # 预热线程只在管道上等待，线程CPU时间几乎为0，因此按引擎调用的耗时计算
+            idle = engine_time / self.cpu_share - elapsed
+            if idle > 0:
+                time.sleep(min(idle, max(self.time_budget - elapsed, 0)))
+
+        elapsed = time.monotonic() - started
+        _update_status(state="done", elapsed=round(elapsed, 3), stop_reason=stop_reason,
+                       finished_at=datetime.now().isoformat())
+        logger.info(f"缓存预热结束: 成功{completed}, 失败{failed}, 共{total}, 耗时{elapsed:.1f}秒"
+                    + (", 已达到时间预算" if stop_reason else ""))
+        return get_warmup_status()
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    """
+    在后台线程中启动缓存预热（每个进程只启动一次）
+
+    Returns:
+        预热线程，无需预热时返回None
+    """
+    global _warmup_thread
+
+    from .astro_service import AstroService
+
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+
+    recorder = get_traffic_recorder()
+    astro_service = AstroService()
+    if recorder is None or WARMUP_TOP_K <= 0:
+        _update_status(state="skipped", stop_reason="disabled")
+        return None
+    has_cache = getattr(astro_service.engine, "cache", None) is not None or get_result_cache() is not None
+    if not astro_service.using_real_engine or not has_cache:
+        _update_status(state="skipped", stop_reason="no_cache")
+        logger.info("未启用引擎缓存或结果缓存，跳过缓存预热")
+        return None
+
+    keys = [key for key, _ in recorder.top(WARMUP_TOP_K)]
+    if not keys:
+        _update_status(state="skipped", stop_reason="no_records")
+        logger.info("没有请求记录，跳过缓存预热")
+        return None
+
+    service = WarmupService(astro_service)
+    with _warmup_lock:
+        _warmup_thread = threading.Thread(target=service.run, args=(keys,), name="cache-warmup", daemon=True)
+        # 启动前先标记为进行中，避免线程调度前被报告为就绪
+        _warmup_status.update(state="running", total=len(keys), completed=0, failed=0)
+    _warmup_thread.start()
+    return _warmup_thread
@@ -4,11 +4,23 @@
 from .logging_setup import setup_logging
 from .error_handlers import setup_signal_handlers, safe_execute
 from .result_handlers import handle_result, calculate_age
+from .lunar_calendar import lunar_month_grid
+from .single_flight import SingleFlight, normalize_date
+from .horoscope_delta import HoroscopeDeltaEncoder
+from .priority_scheduler import PriorityScheduler, PRIORITY_CLASSES, priority, current_priority
 
 __all__ = [
     'setup_logging',
     'setup_signal_handlers',
     'safe_execute',
     'handle_result',
-    'calculate_age'
+    'calculate_age',
+    'lunar_month_grid',
+    'SingleFlight',
+    'normalize_date',
+    'HoroscopeDeltaEncoder',
+    'PriorityScheduler',
+    'PRIORITY_CLASSES',
+    'priority',
+    'current_priority'
 ] 
\ No newline at end of file
@@ -1,6 +1,7 @@
 """
 错误处理工具
 """
+import faulthandler
 import logging
 import traceback
 import signal
@@ -11,24 +12,30 @@ from typing import Callable, Any, Tuple, Optional
 # 获取日志记录器
 logger = logging.getLogger("紫微斗数API")
 
-# SIGSEGV信号处理器
+# 执行时间超过该值（秒）时记录警告
+SLOW_CALL_THRESHOLD = 10
+
+# 信号处理器
 def setup_signal_handlers():
     """
-    设置信号处理器，捕获SIGSEGV等信号
+    设置信号处理器
+
+    SIGSEGV 发生后进程状态已不可信，Python 层的处理函数无法可靠执行，这里只通过 faulthandler
+    输出各线程的调用栈便于排查；引擎崩溃由引擎进程监管（SupervisedEngine）隔离在子进程中。
     """
-    def handle_segfault(signum, frame):
+    def handle_terminate(signum, frame):
         logger.error(f"检测到信号 {signum}! 程序即将优雅退出。")
         sys.exit(1)
     
     # 注册信号处理器
-    signal.signal(signal.SIGSEGV, handle_segfault)
-    signal.signal(signal.SIGTERM, handle_segfault)
+    faulthandler.enable()
+    signal.signal(signal.SIGTERM, handle_terminate)
     logger.info("已设置信号处理器")
 
 # 安全执行函数
 def safe_execute(func: Callable, *args, **kwargs) -> Tuple[Any, Optional[str]]:
     """
-    安全执行函数，防止SIGSEGV导致的崩溃
+    安全执行函数，把异常转换为错误信息；超过截止时间的调用（TimeoutError）单独记录
     
     Args:
         func: 要执行的函数
@@ -44,10 +51,14 @@ def safe_execute(func: Callable, *args, **kwargs) -> Tuple[Any, Optional[str]]:
         result = func(*args, **kwargs)
         execution_time = time.time() - start_time
         
-        if execution_time > 10:  # 如果执行时间超过10秒，记录警告
+        if execution_time > SLOW_CALL_THRESHOLD:
             logger.warning(f"函数 {func.__name__} 执行时间较长: {execution_time:.2f}秒")
             
         return result, None
+    except TimeoutError as e:
+        # 超过截止时间的调用已被取消，不需要输出调用栈
+        logger.error(f"函数 {func.__name__} 执行超时: {str(e)}")
+        return None, str(e)
     except Exception as e:
         logger.error(f"函数 {func.__name__} 执行出错: {str(e)}")
         logger.error(traceback.format_exc())
@@ -0,0 +1,45 @@
+"""
+运限序列的增量编码工具
+
+与 py_iztro.delta 的条目格式一致，客户端可以用 py_iztro.delta.decode_horoscope_deltas 还原完整运限
+"""
+from typing import Any, Dict, Optional
+
+
+class HoroscopeDeltaEncoder:
+    """
+    逐条编码运限：第一条（以及每隔 keyframe_every 条）携带完整运限 horoscope，
+    其余只在 delta 中携带与上一条相比发生变化的字段（通常只有流日、流时）
+    """
+
+    def __init__(self, keyframe_every: int = 0):
+        """
+        Args:
+            keyframe_every: 每隔多少条重新发送一次完整运限，0 表示只有第一条
+        """
+        self.keyframe_every = keyframe_every
+        self._previous: Optional[Dict[str, Any]] = None
+        self._count = 0
+
+    def encode(self, horoscope: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        编码一条运限
+
+        Args:
+            horoscope: 运限数据
+
+        Returns:
+            {"horoscope": 完整运限} 或 {"delta": 变化的字段}
+        """
+        keyframe = self._previous is None or (self.keyframe_every > 0 and self._count % self.keyframe_every == 0)
+        if keyframe:
+            item = {"horoscope": horoscope}
+        else:
+            item = {"delta": {key: value for key, value in horoscope.items() if self._previous.get(key) != value}}
+        self._previous = horoscope
+        self._count += 1
+        return item
+
+    def reset(self):
+        """计算失败后调用，下一条重新发送完整运限"""
+        self._previous = None
@@ -0,0 +1,126 @@
+"""
+农历月历工具
+
+基于查表的方式批量计算一个公历月份内每一天的农历日期、日干支和节气，
+整个月份通过NumPy一次性向量化计算，不需要调用紫微斗数计算引擎。
+"""
+import calendar
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Any
+
+import numpy as np
+
+from .lunar_data import (
+    SOLAR_TERMS,
+    SOLAR_TERM_BASE_YEAR,
+    SOLAR_TERM_INFO,
+)
+
+HEAVENLY_STEMS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
+EARTHLY_BRANCHES = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
+LUNAR_MONTH_NAMES = ("正", "二", "三", "四", "五", "六", "七", "八", "九", "十", "冬", "腊")
+LUNAR_DAY_NAMES = (
+    "初一", "初二", "初三", "初四", "初五", "初六", "初七", "初八", "初九", "初十",
+    "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十",
+    "廿一", "廿二", "廿三", "廿四", "廿五", "廿六", "廿七", "廿八", "廿九", "三十",
+)
+
+# 公历序数日与日干支的偏移：date(2000, 8, 16) 为丙午日
+_DAY_GANZHI_OFFSET = (42 - date(2000, 8, 16).toordinal()) % 60
+
+
+@lru_cache(maxsize=1)
+def _lunar_month_table():
+    """
+    根据 py_iztro.lunar 中的 LUNAR_INFO 展开所有农历月份（首次调用时导入，未安装 py_iztro 时不影响应用启动）
+
+    Returns:
+        (starts, years, months, leaps): 每个农历月初一的公历序数日、农历年、月份、是否闰月
+    """
+    from py_iztro.lunar import LUNAR_BASE_DATE, LUNAR_INFO, LUNAR_MIN_YEAR
+
+    years, months, leaps, lengths = [], [], [], []
+    for offset, info in enumerate(LUNAR_INFO):
+        year = LUNAR_MIN_YEAR + offset
+        leap_month = info & 0xF
+        for month in range(1, 13):
+            years.append(year)
+            months.append(month)
+            leaps.append(False)
+            lengths.append(30 if info & (0x10000 >> month) else 29)
+            if month == leap_month:
+                years.append(year)
+                months.append(month)
+                leaps.append(True)
+                lengths.append(30 if info & 0x10000 else 29)
+
+    base = LUNAR_BASE_DATE.toordinal()
+    lengths = np.asarray(lengths, dtype=np.int32)
+    starts = base + np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int32)
+    return starts, np.asarray(years, dtype=np.int32), np.asarray(months, dtype=np.int8), np.asarray(leaps)
+
+
+def _to_chinese_year(year: int) -> str:
+    """将年份转换为中文数字写法，如2000 -> 二〇〇〇"""
+    return "".join("〇一二三四五六七八九"[int(digit)] for digit in str(year))
+
+
+@lru_cache(maxsize=512)
+def lunar_month_grid(year: int, month: int) -> Dict[str, Any]:
+    """
+    计算指定公历月份每一天的农历信息（结果按年月缓存）
+
+    Args:
+        year: 公历年份（1900-2100）
+        month: 公历月份（1-12）
+
+    Returns:
+        包含该月每一天农历日期、闰月标记、日干支和节气的字典
+    """
+    _, days_in_month = calendar.monthrange(year, month)
+    ordinals = date(year, month, 1).toordinal() + np.arange(days_in_month, dtype=np.int32)
+
+    # 一次性定位每天所在的农历月
+    month_starts, month_years, month_numbers, month_leaps = _lunar_month_table()
+    month_idx = np.searchsorted(month_starts, ordinals, side="right") - 1
+    lunar_years = month_years[month_idx]
+    lunar_months = month_numbers[month_idx]
+    lunar_leaps = month_leaps[month_idx]
+    lunar_days = ordinals - month_starts[month_idx] + 1
+
+    ganzhi = (ordinals + _DAY_GANZHI_OFFSET) % 60
+    stems = ganzhi % 10
+    branches = ganzhi % 12
+
+    # 每个公历月包含两个节气
+    term_info = SOLAR_TERM_INFO[year - SOLAR_TERM_BASE_YEAR]
+    term_index = (month - 1) * 2
+    solar_terms = [None] * days_in_month
+    solar_terms[int(term_info[term_index]) + 3 - 1] = SOLAR_TERMS[term_index]
+    solar_terms[int(term_info[term_index + 1]) + 18 - 1] = SOLAR_TERMS[term_index + 1]
+
+    days = []
+    for i, (l_year, l_month, l_day, is_leap, stem, branch) in enumerate(
+        zip(lunar_years.tolist(), lunar_months.tolist(), lunar_days.tolist(),
+            lunar_leaps.tolist(), stems.tolist(), branches.tolist())
+    ):
+        month_name = f"{'闰' if is_leap else ''}{LUNAR_MONTH_NAMES[l_month - 1]}月"
+        days.append({
+            "solar_date": f"{year}-{month:02d}-{i + 1:02d}",
+            "lunar_year": l_year,
+            "lunar_month": l_month,
+            "lunar_day": l_day,
+            "is_leap_month": is_leap,
+            "lunar_date": f"{_to_chinese_year(l_year)}年{month_name}{LUNAR_DAY_NAMES[l_day - 1]}",
+            "heavenly_stem": HEAVENLY_STEMS[stem],
+            "earthly_branch": EARTHLY_BRANCHES[branch],
+            "solar_term": solar_terms[i],
+        })
+
+    return {
+        "year": year,
+        "month": month,
+        "days": days,
+        "count": days_in_month,
+    }
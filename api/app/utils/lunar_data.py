@@ -0,0 +1,69 @@
+"""
+农历与节气基础数据（1899-2100）
+"""
+
+# 农历月份信息（LUNAR_INFO）与农历1899年正月初一对应的公历日期只在 py_iztro.lunar 中保存一份，
+# 月历与排盘引擎的农历换算共用同一张表，避免两份数据各自修改后不一致（由 lunar_calendar 在首次使用时导入）
+
+# 二十四节气名称，按公历月份顺序（从小寒开始）
+SOLAR_TERMS = (
+    "小寒", "大寒", "立春", "雨水", "惊蛰", "春分", "清明", "谷雨", "立夏", "小满", "芒种", "夏至",
+    "小暑", "大暑", "立秋", "处暑", "白露", "秋分", "寒露", "霜降", "立冬", "小雪", "大雪", "冬至",
+)
+
+# 每个公历年的节气日期，第1900年起逐年排列
+# 每个字符对应一个节气：月内第一个节气为 日期-3，第二个节气为 日期-18
+SOLAR_TERM_BASE_YEAR = 1900
+SOLAR_TERM_INFO = (
+    "321133223334455555665544", "331133233434555656665554", "332133333444565656665555", "332244334444566666665555",
+    "432233223334455555665544", "331133233434555656665554", "332133333434565656665555", "332244334444566666665555",
+    "432233223334455555665544", "331133233434555656665554", "332133333434565656665555", "332244334444566666665555",
+    "432233223334455555665444", "321133233434555655665554", "331133233434565656665555", "332234333444565666665555",
+    "332233223334455555565444", "321133233334555655665554", "331133233434565656665554", "332234333444565666665555",
+    "332233223334455555565444", "321133223334555655665544", "331133233434565656665554", "332133333444565666665555",
+    "332233223334455555565444", "321133223334555655665544", "331133233434555656665554", "332133333444565666665555",
+    "332233223334455555554444", "321133223334455555665544", "331133233434555656665554", "332133333444565656665555",
+    "332233223333455555554444", "321133223334455555665544", "331133233434555656665554", "332133333434565656665555",
+    "332233223333455555554444", "321133223334455555665544", "331133233434555656665554", "332133333434565656665555",
+    "332233223333455555554444", "321133223334455555665544", "331133233434555656665554", "332133333434565656665555",
+    "332233222333455555554444", "321133223334455555565444", "321133233434555655665554", "331133233434565656665555",
+    "332223222333454555554444", "221133223334455555565444", "321133223334555655665554", "331133233434565656665555",
+    "332223222333454555554444", "221133223334455555565444", "321133223334555655665544", "331133233434555656665554",
+    "332222222333454555554444", "221133223334455555565444", "321133223334455555665544", "331133233434555656665554",
+    "332122222333454545554444", "221133223333455555554444", "321133223334455555665544", "331133233434555656665554",
+    "332122222333454545554444", "221133223333455555554444", "321133223334455555665544", "331133233434555656665554",
+    "332122222323454545554444", "221133223333455555554444", "321133223334455555665544", "331133233434555656665554",
+    "332122222323454545554444", "221133222333455555554444", "321133223334455555665544", "331133233434555655665554",
+    "332122122323454545554444", "221133222333454555554444", "321133223334455555565544", "321133233334555655665554",
+    "332122122323454545554444", "221133222333454555554444", "321133223334455555565444", "321133223334555655665554",
+    "331122122323444545554444", "221123222333454555554444", "221133223334455555565444", "321133223334455655665544",
+    "331122122323444545554443", "221122222333454545554444", "221133223333455555565444", "321133223334455555665544",
+    "331122122323444545554443", "221022222333454545554444", "221133223333455555554444", "321133223334455555665544",
+    "331122122323444545554443", "221022222323454545554444", "221133223333455555554444", "321133223334455555665544",
+    "331122122323444545554443", "221022222323454545554444", "221133223333455555554444", "321133223334455555665544",
+    "331122122323444545554443", "221022222323454545554444", "221133222333454555554444", "321133223334455555665544",
+    "331122122323444544554443", "221022122323454545554444", "221133222333454555554444", "321133223334455555565544",
+    "331122122223444544554443", "221022122323444545554444", "221133222333454555554444", "321133223334455555565444",
+    "321122112223444544554443", "220022122323444545554444", "221123222333454555554444", "221133223333455555565444",
+    "321122112223344444554443", "220022122323444545554443", "221122222333454545554444", "221133223333455555565444",
+    "321122112223344444554433", "220022122323444545554443", "221022222323454545554444", "221133223333455555554444",
+    "321122112223344444554433", "220022122323444545554443", "221022222323454545554444", "221133223333455555554444",
+    "321122112223344444554433", "220022122323444545554443", "221022222323454545554444", "221133222333454555554444",
+    "321122112223344444554433", "220022122323444545554443", "221022222323454545554444", "221133222333454555554444",
+    "321122112223344444554433", "220022122223444544554443", "221022122323454545554444", "221133222333454555554444",
+    "321122112223344444454433", "220022112223444544554443", "221022122323444545554444", "221133222333454555554444",
+    "321122112222344444454333", "210022112223344444554443", "220022122323444545554444", "221122222333454545554444",
+    "221122112222344444454333", "210022112223344444554443", "220022122323444545554444", "221122222323454545554444",
+    "221122112222344444454333", "210022112223344444554433", "220022122323444545554443", "221122222323454545554444",
+    "221122112222344444443333", "210022112223344444554433", "220022122323444545554443", "221022222323454545554444",
+    "221122112222344444443333", "210022112223344444554433", "220022122323444545554443", "221022222323454545554444",
+    "221122111222343444443333", "210022112223344444554433", "220022122223444544554443", "221022222323454545554444",
+    "221122111222343444443333", "210022112223344444454433", "220022122223444544554443", "221022122323444545554444",
+    "221122111222343444443333", "210022112223344444454433", "220022112223344544554443", "221022122323444545554444",
+    "221122111222343444443333", "210022112222344444454333", "220022112223344444554443", "220022122323444545554444",
+    "221111111222343434443333", "110022112222344444454333", "210022112223344444554443", "220022122323444545554444",
+    "221111111212343434443333", "110022112222344444454333", "210022112223344444554433", "220022122323444545554443",
+    "221111111212343434443333", "110022112222344444443333", "210022112223344444554433", "220022122323444545554443",
+    "221011111212343434443333", "110022112222343444443333", "210022112223344444554433", "220022122323444545554443",
+    "221022222323454545554444",
+)
@@ -0,0 +1,236 @@
+"""
+按优先级类别分配引擎进程的调度工具（加权公平排队）
+"""
+import contextvars
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+# 优先级类别：interactive 为面向用户的请求，batch 为批量计算（预渲染、预热、导出等）
+PRIORITY_CLASSES = ("interactive", "batch")
+DEFAULT_PRIORITY = "interactive"
+
+# 当前调用的优先级类别，随线程/协程上下文传递，未设置时为 interactive
+_priority_var: contextvars.ContextVar[str] = contextvars.ContextVar("iztro_priority", default=DEFAULT_PRIORITY)
+
+# 每个类别保留的最近等待时间个数，用于计算分位数
+WAIT_SAMPLES = 1024
+
+
+def current_priority() -> str:
+    """
+    当前上下文的优先级类别
+
+    Returns:
+        优先级类别
+    """
+    return _priority_var.get()
+
+
+@contextmanager
+def priority(name: str):
+    """
+    在代码块内以指定优先级类别调用引擎，例如 `with priority("batch"): ...`
+
+    Args:
+        name: 优先级类别，interactive 或 batch
+    """
+    if name not in PRIORITY_CLASSES:
+        raise ValueError(f"未知的优先级类别: {name}，可选: {', '.join(PRIORITY_CLASSES)}")
+    token = _priority_var.set(name)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def parse_class_values(value: str) -> Dict[str, float]:
+    """
+    解析 `interactive=100,batch=1` 格式的按类别配置，忽略未知类别和无法解析的项
+
+    Args:
+        value: 配置字符串
+
+    Returns:
+        类别 -> 数值
+    """
+    values = {}
+    for item in value.split(","):
+        name, _, number = item.partition("=")
+        name = name.strip()
+        if name in PRIORITY_CLASSES:
+            try:
+                values[name] = float(number)
+            except ValueError:
+                continue
+    return values
+
+
+class _Waiter:
+    """一个等待分配资源的调用"""
+
+    __slots__ = ("name", "tag", "seq", "enqueued", "granted", "resource")
+
+    def __init__(self, name: str, tag: float, seq: int):
+        self.name = name
+        self.tag = tag
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.granted = threading.Event()
+        self.resource = None
+
+
+class PriorityScheduler:
+    """
+    按优先级类别分配空闲资源（引擎进程）
+
+    使用自计时加权公平排队（SCFQ）：每个等待者的虚拟完成时间为
+    max(系统虚拟时间, 本类别上一个等待者的虚拟完成时间) + 1 / 权重，有空闲资源时分配给虚拟完成时间最小的等待者，
+    系统虚拟时间推进到该等待者的虚拟完成时间。权重为 100:1 时两个类别都有积压的情况下，
+    interactive 每获得 100 次分配 batch 才获得一次，batch 不会饿死。
+    类别的并发上限限制同时占用资源的数量，达到上限时该类别的等待者不参与分配，把资源留给其他类别。
+    """
+
+    def __init__(self, weights: Dict[str, float], caps: Dict[str, int]):
+        """
+        Args:
+            weights: 类别 -> 权重，未配置的类别权重为 1
+            caps: 类别 -> 并发上限，0 或未配置表示不限制
+        """
+        self.weights = {name: max(float(weights.get(name, 1)), 1e-6) for name in PRIORITY_CLASSES}
+        self.caps = {name: max(int(caps.get(name, 0)), 0) for name in PRIORITY_CLASSES}
+        self._lock = threading.Lock()
+        self._idle: Deque[Any] = deque()
+        self._queues: Dict[str, Deque[_Waiter]] = {name: deque() for name in PRIORITY_CLASSES}
+        self._last_tag = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._virtual_time = 0.0
+        self._seq = 0
+        self._active = {name: 0 for name in PRIORITY_CLASSES}
+        self._stats = {name: {"requests": 0, "dispatched": 0, "timeouts": 0, "max_wait": 0.0}
+                       for name in PRIORITY_CLASSES}
+        self._waits = {name: deque(maxlen=WAIT_SAMPLES) for name in PRIORITY_CLASSES}
+
+    def _dispatch(self):
+        """把空闲资源分配给可以运行的等待者中虚拟完成时间最小的，调用方持有锁"""
+        while self._idle:
+            chosen = None
+            for name, waiters in self._queues.items():
+                cap = self.caps[name]
+                if not waiters or (cap and self._active[name] >= cap):
+                    continue
+                head = waiters[0]
+                if chosen is None or (head.tag, head.seq) < (chosen.tag, chosen.seq):
+                    chosen = head
+            if chosen is None:
+                return
+
+            self._queues[chosen.name].popleft()
+            self._virtual_time = max(self._virtual_time, chosen.tag)
+            self._active[chosen.name] += 1
+            wait = time.monotonic() - chosen.enqueued
+            stats = self._stats[chosen.name]
+            stats["dispatched"] += 1
+            stats["max_wait"] = max(stats["max_wait"], wait)
+            self._waits[chosen.name].append(wait)
+            chosen.resource = self._idle.popleft()
+            chosen.granted.set()
+
+    def put(self, resource: Any):
+        """
+        加入一个空闲资源
+
+        Args:
+            resource: 资源，例如新启动的引擎进程
+        """
+        with self._lock:
+            self._idle.append(resource)
+            self._dispatch()
+
+    def acquire(self, name: str, timeout: float) -> Optional[Any]:
+        """
+        按类别排队等待空闲资源
+
+        Args:
+            name: 优先级类别
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            分配到的资源，超时返回None；使用完后必须调用 `release`
+        """
+        with self._lock:
+            tag = max(self._virtual_time, self._last_tag[name]) + 1 / self.weights[name]
+            self._last_tag[name] = tag
+            self._seq += 1
+            waiter = _Waiter(name, tag, self._seq)
+            self._queues[name].append(waiter)
+            self._stats[name]["requests"] += 1
+            self._dispatch()
+
+        if not waiter.granted.wait(max(timeout, 0)):
+            with self._lock:
+                # 超时与分配同时发生时以分配为准
+                if waiter.resource is None:
+                    self._queues[name].remove(waiter)
+                    self._stats[name]["timeouts"] += 1
+                    return None
+        return waiter.resource
+
+    def release(self, name: str, resource: Any = None):
+        """
+        归还资源并分配给下一个等待者
+
+        Args:
+            name: 获取资源时的优先级类别
+            resource: 归还的资源，资源已销毁（例如被杀掉的引擎进程）时为None
+        """
+        with self._lock:
+            self._active[name] -= 1
+            if resource is not None:
+                self._idle.append(resource)
+            self._dispatch()
+
+    def drain(self) -> List[Any]:
+        """
+        取出所有空闲资源
+
+        Returns:
+            空闲资源列表
+        """
+        with self._lock:
+            resources = list(self._idle)
+            self._idle.clear()
+        return resources
+
+    def idle_count(self) -> int:
+        """空闲资源数量"""
+        with self._lock:
+            return len(self._idle)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按类别的排队统计，用于确认优先级是否生效
+
+        Returns:
+            类别 -> 权重、并发上限、排队数、占用数、请求数、分配数、超时数，以及最近等待时间的平均值、p95 和历史最大值（毫秒）
+        """
+        with self._lock:
+            result = {}
+            for name in PRIORITY_CLASSES:
+                waits = sorted(self._waits[name])
+                stats = self._stats[name]
+                result[name] = {
+                    "weight": self.weights[name],
+                    "cap": self.caps[name],
+                    "queued": len(self._queues[name]),
+                    "active": self._active[name],
+                    "requests": stats["requests"],
+                    "dispatched": stats["dispatched"],
+                    "timeouts": stats["timeouts"],
+                    "wait_avg_ms": round(statistics.fmean(waits) * 1000, 3) if waits else 0.0,
+                    "wait_p95_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 3) if waits else 0.0,
+                    "wait_max_ms": round(stats["max_wait"] * 1000, 3),
+                }
+            return result
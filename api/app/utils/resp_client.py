@@ -0,0 +1,205 @@
+"""
+Redis 协议（RESP）客户端，支持连接池和管道批量请求
+"""
+import queue
+import socket
+import threading
+from typing import Any, List, Optional, Sequence
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """服务端返回的错误回复"""
+
+
+def encode_command(*args: Any) -> bytes:
+    """
+    将命令编码为 RESP 数组
+
+    Args:
+        *args: 命令及参数，str 按 utf-8 编码，int 转为十进制字符串
+
+    Returns:
+        编码后的字节串
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class RespConnection:
+    """单个 RESP 连接"""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 2.0):
+        """
+        Args:
+            host: 主机
+            port: 端口
+            db: 数据库编号
+            password: 密码【可选】
+            timeout: 连接与读写超时（秒）
+        """
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("连接已被服务端关闭")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            return RespError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"无法解析的回复: {line!r}")
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        一次发送多条命令再依次读取回复，只产生一次网络往返
+
+        Args:
+            commands: 命令列表，每条命令为 (命令, 参数...)
+
+        Returns:
+            与命令一一对应的回复，错误回复以 RespError 实例返回
+        """
+        self._sock.sendall(b"".join(encode_command(*command) for command in commands))
+        return [self._read_reply() for _ in commands]
+
+    def execute(self, *args: Any) -> Any:
+        """
+        执行单条命令
+
+        Returns:
+            回复内容
+
+        Raises:
+            RespError: 服务端返回错误
+        """
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def close(self):
+        try:
+            self._file.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RespConnectionPool:
+    """
+    RESP 连接池
+
+    连接按需创建，最多 max_connections 个；连接出错时丢弃，不放回池中。
+    """
+
+    def __init__(self, url: str, max_connections: int = 16, timeout: float = 2.0):
+        """
+        Args:
+            url: 连接地址，如 redis://:password@127.0.0.1:6379/0
+            max_connections: 最大连接数
+            timeout: 连接与读写超时（秒），也是等待空闲连接的最长时间
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle: "queue.LifoQueue[RespConnection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> RespConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_connections:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if not create:
+            try:
+                return self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise ConnectionError("等待空闲连接超时") from None
+        try:
+            return RespConnection(self.host, self.port, self.db, self.password, self.timeout)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, connection: RespConnection):
+        connection.close()
+        with self._lock:
+            self._created -= 1
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        从连接池取一个连接，以管道方式执行多条命令
+
+        Args:
+            commands: 命令列表
+
+        Returns:
+            与命令一一对应的回复，错误回复以 RespError 实例返回
+        """
+        connection = self._acquire()
+        try:
+            replies = connection.pipeline(commands)
+        except Exception:
+            self._discard(connection)
+            raise
+        self._idle.put(connection)
+        return replies
+
+    def execute(self, *args: Any) -> Any:
+        """
+        执行单条命令
+
+        Raises:
+            RespError: 服务端返回错误
+        """
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def close(self):
+        """关闭所有空闲连接"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
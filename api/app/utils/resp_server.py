@@ -0,0 +1,164 @@
+"""
+本地 Redis 协议替身服务，只实现结果缓存用到的命令，用于在没有 Redis 的环境中测试远程缓存
+
+用法：python -m app.utils.resp_server --port 6390
+"""
+import argparse
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _Store:
+    """带过期时间的内存键值存储"""
+
+    def __init__(self):
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, command: str, args: list) -> Any:
+        with self._lock:
+            if command == "PING":
+                return "PONG"
+            if command in ("SELECT", "AUTH"):
+                return "OK"
+            if command == "GET":
+                return self._get(args[0])
+            if command == "MGET":
+                return [self._get(key) for key in args]
+            if command == "SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[2:]]
+                if b"EX" in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+                self._data[args[0]] = (args[1], expires_at)
+                return "OK"
+            if command == "DEL":
+                return sum(self._data.pop(key, None) is not None for key in args)
+            if command == "DBSIZE":
+                return len(self._data)
+            if command == "FLUSHDB":
+                self._data.clear()
+                return "OK"
+        return ValueError(f"unknown command '{command}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> Optional[list]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections.add(self.request)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.connections.discard(self.request)
+        super().finish()
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if not args:
+                return
+            self.server.commands += 1
+            reply = store.execute(args[0].decode().upper(), args[1:])
+            self.wfile.write(_encode_reply(reply))
+
+
+class RespStandInServer(socketserver.ThreadingTCPServer):
+    """
+    本地 Redis 协议替身服务
+
+    支持 PING、SELECT、AUTH、GET、MGET、SET（含 EX）、DEL、DBSIZE、FLUSHDB
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self.commands = 0
+        self.lock = threading.Lock()
+        self.connections = set()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RespStandInServer":
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.serve_forever, name="resp-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务并断开所有客户端连接，与真实 Redis 停机时的表现一致"""
+        self.shutdown()
+        self.server_close()
+        with self.lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 Redis 协议替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    options = parser.parse_args()
+    server = RespStandInServer(options.host, options.port)
+    print(f"Redis 协议替身服务已启动: {server.url}")
+    server.serve_forever()
@@ -0,0 +1,256 @@
+"""
+基于共享内存的星盘结果缓存，同一台机器上的多个 uvicorn worker 进程共用一份缓存
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+# 获取日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 共享内存布局：
+#   头部 (64字节)：魔数、组数、每组路数、槽位大小
+#   每组：时钟指针 (8字节) + 路数 个槽位
+#   每个槽位：槽位头 (32字节：序列号、键哈希、键长度、值长度、访问位) + 键 + 值
+_MAGIC = b"IZSHMC01"
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 64
+_SET_HEADER_SIZE = 8
+_SLOT_HEADER = struct.Struct("<QQIIB")
+_SLOT_HEADER_SIZE = 32
+_SEQ = struct.Struct("<Q")
+_REF_OFFSET = 24
+# 读取时遇到并发写入的重试次数
+_READ_RETRIES = 3
+# 进程内写锁的分段数，组按序号分配到各段
+_THREAD_LOCK_STRIPES = 64
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _attach(name: str, size: int) -> "tuple[shared_memory.SharedMemory, bool]":
+    """
+    创建或连接共享内存段，并让它的生命周期不受单个 worker 退出的影响
+
+    Returns:
+        (共享内存段, 是否为本进程创建)
+    """
+    try:
+        shm, created = shared_memory.SharedMemory(name=name, create=True, size=size), True
+    except FileExistsError:
+        shm, created = shared_memory.SharedMemory(name=name), False
+    try:
+        # Python 3.13 之前，任何一个进程退出都会让 resource_tracker 删除共享内存段
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm, created
+
+
+class SharedMemoryCache:
+    """
+    共享内存星盘结果缓存
+
+    固定大小的 slab 按组相联方式组织：键的哈希决定所在组，组内按 CLOCK 算法淘汰（近似LRU）。
+    读取不加锁，通过槽位序列号（seqlock）发现并发写入后重试；写入只对所在组加 fcntl 字节范围锁，
+    不同组的写入互不阻塞，进程崩溃时锁由内核自动释放。fcntl 锁属于整个进程，不能互斥同一进程内的线程，
+    因此写入时先持有该组对应的进程内线程锁。
+    """
+
+    def __init__(self, name: str, size: int = 64 * 1024 * 1024, slot_size: int = 4096, ways: int = 8):
+        """
+        Args:
+            name: 共享内存段名称，同一台机器上名称相同的实例共用一份缓存
+            size: 共享内存总大小（字节）
+            slot_size: 每个槽位的大小（字节），键与值的总长度超过 槽位大小-32 的条目不缓存
+            ways: 每组的槽位数量
+        """
+        if slot_size <= _SLOT_HEADER_SIZE:
+            raise ValueError(f"slot_size 必须大于 {_SLOT_HEADER_SIZE}")
+        self.name = name
+        self.slot_size = slot_size
+        self.ways = ways
+        set_size = _SET_HEADER_SIZE + ways * slot_size
+        self.n_sets = max((size - _HEADER_SIZE) // set_size, 1)
+        self._set_size = set_size
+        total = _HEADER_SIZE + self.n_sets * set_size
+
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        # 初始化期间对整个文件加锁，避免多个 worker 同时初始化
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            self._shm, created = _attach(name, total)
+            self._buf = self._shm.buf
+            magic, n_sets, ways, slot_size = _HEADER.unpack_from(self._buf, 0)
+            if magic != _MAGIC:
+                self._buf[:total] = bytes(total)
+                _HEADER.pack_into(self._buf, 0, _MAGIC, self.n_sets, self.ways, self.slot_size)
+            else:
+                # 以已存在的共享内存段的布局为准
+                self.n_sets, self.ways, self.slot_size = n_sets, ways, slot_size
+                self._set_size = _SET_HEADER_SIZE + ways * slot_size
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN)
+
+        self._thread_locks = [threading.Lock() for _ in range(min(self.n_sets, _THREAD_LOCK_STRIPES))]
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        logger.info(f"共享内存缓存已{'创建' if created else '连接'}: {name}, "
+                    f"{self.n_sets}组 x {self.ways}路, 槽位{self.slot_size}字节")
+
+    def _set_offset(self, set_index: int) -> int:
+        return _HEADER_SIZE + set_index * self._set_size
+
+    def _slot_offset(self, set_index: int, way: int) -> int:
+        return self._set_offset(set_index) + _SET_HEADER_SIZE + way * self.slot_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的字节串，未命中时返回None
+        """
+        key_bytes = key.encode("utf-8")
+        key_hash = _key_hash(key_bytes)
+        set_index = key_hash % self.n_sets
+        buf = self._buf
+
+        for way in range(self.ways):
+            offset = self._slot_offset(set_index, way)
+            for _ in range(_READ_RETRIES):
+                seq, slot_hash, key_len, value_len, _ = _SLOT_HEADER.unpack_from(buf, offset)
+                if seq & 1:
+                    # 正在写入，稍后重试
+                    time.sleep(0)
+                    continue
+                if slot_hash != key_hash or key_len != len(key_bytes):
+                    break
+                start = offset + _SLOT_HEADER_SIZE
+                slot_key = bytes(buf[start:start + key_len])
+                value = bytes(buf[start + key_len:start + key_len + value_len])
+                if _SEQ.unpack_from(buf, offset)[0] != seq:
+                    continue
+                if slot_key != key_bytes:
+                    break
+                buf[offset + _REF_OFFSET] = 1
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: bytes) -> bool:
+        """
+        写入缓存，组内已满时按 CLOCK 算法淘汰
+
+        Args:
+            key: 缓存键
+            value: 字节串
+
+        Returns:
+            是否写入成功（条目超过槽位大小时不写入）
+        """
+        key_bytes = key.encode("utf-8")
+        if _SLOT_HEADER_SIZE + len(key_bytes) + len(value) > self.slot_size:
+            self.rejected += 1
+            return False
+        key_hash = _key_hash(key_bytes)
+        set_index = key_hash % self.n_sets
+
+        # 先互斥本进程内的线程，再只锁住这一组对应的字节范围互斥其他进程
+        with self._thread_locks[set_index % len(self._thread_locks)]:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, set_index)
+            try:
+                self._write(set_index, key_hash, key_bytes, value)
+            finally:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, set_index)
+        return True
+
+    def _write(self, set_index: int, key_hash: int, key_bytes: bytes, value: bytes):
+        """写入组内的一个槽位（调用方需持有组锁）"""
+        buf = self._buf
+        way = self._find_way(set_index, key_hash, key_bytes)
+        offset = self._slot_offset(set_index, way)
+        seq = _SEQ.unpack_from(buf, offset)[0]
+        # 奇数序列号是写入中途中断（如进程崩溃）留下的，取下一个偶数，否则该槽位会一直被当作正在写入
+        seq += seq & 1
+        _SEQ.pack_into(buf, offset, seq + 1)
+        start = offset + _SLOT_HEADER_SIZE
+        buf[start:start + len(key_bytes)] = key_bytes
+        buf[start + len(key_bytes):start + len(key_bytes) + len(value)] = value
+        _SLOT_HEADER.pack_into(buf, offset, seq + 1, key_hash, len(key_bytes), len(value), 1)
+        _SEQ.pack_into(buf, offset, seq + 2)
+
+    def _find_way(self, set_index: int, key_hash: int, key_bytes: bytes) -> int:
+        """在组内找到可写入的槽位：已有的相同键 > 空槽位 > CLOCK 淘汰的槽位（调用方需持有组锁）"""
+        buf = self._buf
+        empty = None
+        for way in range(self.ways):
+            offset = self._slot_offset(set_index, way)
+            _, slot_hash, key_len, _, _ = _SLOT_HEADER.unpack_from(buf, offset)
+            if key_len == 0:
+                if empty is None:
+                    empty = way
+                continue
+            start = offset + _SLOT_HEADER_SIZE
+            if slot_hash == key_hash and bytes(buf[start:start + key_len]) == key_bytes:
+                return way
+        if empty is not None:
+            return empty
+
+        set_offset = self._set_offset(set_index)
+        hand = _SEQ.unpack_from(buf, set_offset)[0]
+        while True:
+            way = hand % self.ways
+            hand += 1
+            ref_offset = self._slot_offset(set_index, way) + _REF_OFFSET
+            if buf[ref_offset]:
+                buf[ref_offset] = 0
+                continue
+            _SEQ.pack_into(buf, set_offset, hand)
+            return way
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        当前进程的缓存统计信息
+        """
+        return {
+            "backend": "shared_memory",
+            "name": self.name,
+            "capacity": self.n_sets * self.ways,
+            "slot_size": self.slot_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+        }
+
+    def close(self):
+        """断开与共享内存段的连接（不删除共享内存段）"""
+        self._buf = None
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self):
+        """删除共享内存段，所有进程退出后调用"""
+        try:
+            # 连接时已取消 resource_tracker 的登记，删除前重新登记以保持其记录一致
+            from multiprocessing import resource_tracker
+            resource_tracker.register(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+        self._shm.unlink()
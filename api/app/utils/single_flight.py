@@ -0,0 +1,111 @@
+"""
+相同请求合并执行工具（single-flight）
+"""
+import logging
+import threading
+from typing import Callable, Any, Dict, Hashable, Tuple, Optional
+
+from .error_handlers import safe_execute
+
+# 获取日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+
+try:
+    # 结果缓存、合并请求与引擎星盘缓存使用同一个日期规范函数，三者的键不会不一致
+    from py_iztro.cache import normalize_date_str as normalize_date
+except ImportError:
+    # 未安装 py_iztro 时以模拟数据运行，没有引擎缓存的键需要对齐，日期原样作为键
+    def normalize_date(date_str: str) -> str:
+        return date_str
+
+
+class _Call:
+    """一次进行中的计算"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    相同请求合并执行
+
+    同一个键同时只执行一次计算，计算期间到达的相同请求等待并共享这次的结果或错误，
+    计算结束后不保留结果（结果缓存由引擎负责）。
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 名称，用于日志和统计
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def execute(self, key: Hashable, func: Callable, *args, **kwargs) -> Tuple[Any, Optional[str]]:
+        """
+        执行计算，相同键的并发请求只计算一次
+
+        Args:
+            key: 规范化后的请求键
+            func: 计算函数
+            *args: 函数的位置参数
+            **kwargs: 函数的关键字参数
+
+        Returns:
+            (result, error): 计算结果和可能的错误信息，所有等待者得到相同的结果
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"[{self.name}] 合并相同请求，等待进行中的计算: {key}")
+            call.done.wait()
+            return call.result, call.error
+
+        try:
+            call.result, call.error = safe_execute(func, *args, **kwargs)
+        except BaseException as e:
+            # safe_execute 不捕获的异常（如线程被中断）也要通知等待者
+            call.error = f"计算被中断: {type(e).__name__}"
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"[{self.name}] 本次计算被 {call.waiters} 个相同请求共享: {key}")
+
+        return call.result, call.error
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取合并执行的统计信息
+
+        Returns:
+            请求数、实际计算次数、被合并（节省）的计算次数和进行中的计算数
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
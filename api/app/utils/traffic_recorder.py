@@ -0,0 +1,147 @@
+"""
+请求流量记录工具，为启动预热提供高频请求键
+"""
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .single_flight import normalize_date
+
+# 获取日志记录器
+logger = logging.getLogger("紫微斗数API")
+
+# 本命盘请求键：(阳历日期, 时辰序号, 性别, 是否调整闰月, 语言)
+ChartKey = Tuple[str, int, str, bool, str]
+
+
+class TrafficRecorder:
+    """
+    记录规范化后的本命盘请求键及其出现次数，并定期写入本地文件
+
+    重启后会先读取已有文件，因此频次在多次部署之间累积。
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, max_keys: int = 10000):
+        """
+        Args:
+            path: 记录文件路径
+            flush_every: 每记录多少次请求写一次文件
+            max_keys: 文件中最多保存的键数量，超出时只保留频次最高的部分
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.max_keys = max_keys
+        self._counts: Counter = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counts.update(self._read(path))
+
+    @staticmethod
+    def _read(path: str) -> Dict[ChartKey, int]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return {
+                (item["solar_date"], item["time_index"], item["gender"], item["fix_leap"], item["language"]):
+                    item["count"]
+                for item in data.get("keys", [])
+            }
+        except Exception as e:
+            logger.warning(f"读取请求记录文件失败，将重新记录: {path}, {str(e)}")
+            return {}
+
+    def record(self, solar_date: str, time_index: int, gender: str, fix_leap: bool = True,
+               language: str = "zh-CN"):
+        """
+        记录一次本命盘请求
+
+        Args:
+            solar_date: 阳历日期，格式为YYYY-MM-DD或YYYY-M-D
+            time_index: 出生时辰序号，0-12
+            gender: 性别
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+        """
+        key = (normalize_date(solar_date), int(time_index), gender, bool(fix_leap), language)
+        with self._lock:
+            self._counts[key] += 1
+            self._pending += 1
+            should_flush = self._pending >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def top(self, k: int) -> List[Tuple[ChartKey, int]]:
+        """
+        获取频次最高的 k 个请求键
+
+        Returns:
+            [(请求键, 次数), ...]，按次数从高到低排列
+        """
+        with self._lock:
+            return self._counts.most_common(k)
+
+    def flush(self):
+        """
+        将记录写入文件（先写临时文件再替换，避免写到一半的文件被读取）
+        """
+        with self._lock:
+            items = self._counts.most_common(self.max_keys)
+            self._pending = 0
+        data = {
+            "keys": [
+                {"solar_date": key[0], "time_index": key[1], "gender": key[2], "fix_leap": key[3],
+                 "language": key[4], "count": count}
+                for key, count in items
+            ]
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"写入请求记录文件失败: {self.path}, {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, "keys": len(self._counts), "requests": sum(self._counts.values())}
+
+
+# 全局请求记录器
+_recorder_instance: Optional[TrafficRecorder] = None
+_recorder_lock = threading.Lock()
+
+# 请求记录文件路径，通过环境变量配置，设置为空字符串时不记录
+# 默认放在用户的状态目录（$XDG_STATE_HOME，未设置时为 ~/.local/state）下，不写入源码目录
+RECORD_PATH_ENV = "IZTRO_WARMUP_FILE"
+DEFAULT_RECORD_PATH = os.path.join(
+    os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+    "iztro", "warmup_keys.json",
+)
+
+
+def get_traffic_recorder() -> Optional[TrafficRecorder]:
+    """
+    获取全局请求记录器（带缓存）
+
+    Returns:
+        请求记录器，未启用时返回None
+    """
+    global _recorder_instance
+
+    path = os.environ.get(RECORD_PATH_ENV, DEFAULT_RECORD_PATH)
+    if not path:
+        return None
+
+    with _recorder_lock:
+        if _recorder_instance is None:
+            _recorder_instance = TrafficRecorder(path)
+        return _recorder_instance
@@ -7,7 +7,8 @@ import sys
 try:
     from py_iztro import Astro
     
-    astro = Astro()
+    # 导入 py_iztro 不会加载引擎，这里立即加载以检查 pythonmonkey 与 iztro 是否可用
+    astro = Astro().load()
     print("Astro类初始化成功")
     
     # 列出非私有方法
@@ -0,0 +1,404 @@
+#!/usr/bin/env python
+"""
+紫微斗数API压测工具
+
+按场景生成请求，以开环方式（按到达速率发出请求，不等待前一个请求完成）压测本地启动的服务或进程内的 ASGI 应用，
+输出吞吐量与 p50/p95/p99 延迟。延迟从请求的计划到达时间开始计算，服务变慢时排队时间也计入延迟。
+
+示例：
+    python loadtest.py --scenario horoscope-heavy --rate 200 --duration 60 --url http://127.0.0.1:8000
+    python loadtest.py --scenario repeat-key-heavy --rate 100 --duration 30 --in-process
+"""
+import argparse
+import asyncio
+import bisect
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+# 场景配置：
+#   horoscope_ratio: 大限流年请求所占比例
+#   keys: 出生信息键空间大小，0 表示每个请求都使用从未出现过的出生信息（冷键）
+#   zipf_s: Zipf 分布的指数，越大热点越集中
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "natal-only": {"horoscope_ratio": 0.0, "keys": 10000, "zipf_s": 1.0},
+    "horoscope-heavy": {"horoscope_ratio": 0.8, "keys": 10000, "zipf_s": 1.0},
+    "repeat-key-heavy": {"horoscope_ratio": 0.2, "keys": 200, "zipf_s": 1.3},
+    "cold-key": {"horoscope_ratio": 0.2, "keys": 0, "zipf_s": 0.0},
+}
+
+# 出生信息枚举空间：1950-01-01 起的日期 × 13个时辰 × 2个性别
+_BASE_DATE = date(1950, 1, 1)
+_KEY_SPACE = 365 * 60 * 26
+# 与键空间互质的步长，把相邻的热点排名分散到不同日期
+_KEY_STRIDE = 7919
+
+# 时辰序号对应的起始小时
+_SHICHEN_START_HOURS = (0, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23)
+
+
+def birth_for_index(index: int) -> Tuple[str, int, str]:
+    """
+    把键序号映射为出生信息，不同序号（键空间内）对应不同的出生信息
+
+    Returns:
+        (阳历日期, 时辰序号, 性别)
+    """
+    index = (index * _KEY_STRIDE) % _KEY_SPACE
+    day = _BASE_DATE + timedelta(days=index // 26)
+    return f"{day.year}-{day.month}-{day.day}", index % 13, "男" if (index // 13) % 2 else "女"
+
+
+def current_shichen(now: datetime) -> int:
+    """当前时间对应的时辰序号"""
+    return bisect.bisect_right(_SHICHEN_START_HOURS, now.hour) - 1
+
+
+class ZipfSampler:
+    """按 Zipf 分布抽取 0 ~ n-1 的排名，排名 k 的概率与 1/(k+1)^s 成正比"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        total = 0.0
+        self.cumulative: List[float] = []
+        for rank in range(n):
+            total += 1.0 / (rank + 1) ** s
+            self.cumulative.append(total)
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+class RequestGenerator:
+    """按场景生成请求"""
+
+    def __init__(self, horoscope_ratio: float, keys: int, zipf_s: float, seed: int = 0):
+        """
+        Args:
+            horoscope_ratio: 大限流年请求所占比例
+            keys: 出生信息键空间大小，0 表示冷键
+            zipf_s: Zipf 分布的指数
+            seed: 随机种子
+        """
+        self.rng = random.Random(seed)
+        self.horoscope_ratio = horoscope_ratio
+        self.sampler = ZipfSampler(keys, zipf_s, self.rng) if keys > 0 else None
+        self._cold_index = 0
+        now = datetime.now()
+        # 与真实的“今日运势”流量一致，运限目标为当天当前时辰
+        self.target_date = f"{now.year}-{now.month}-{now.day}"
+        self.target_time_index = current_shichen(now)
+
+    def next(self) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        生成下一个请求
+
+        Returns:
+            (请求类型, 路径, 查询参数)
+        """
+        if self.sampler is not None:
+            index = self.sampler.sample()
+        else:
+            index = self._cold_index
+            self._cold_index += 1
+        solar_date, time_index, gender = birth_for_index(index)
+        params = {"solar_date": solar_date, "time_index": time_index, "gender": gender}
+        if self.rng.random() < self.horoscope_ratio:
+            params.update(target_date=self.target_date, target_time_index=self.target_time_index)
+            return "horoscope", "/api/astro/horoscope", params
+        return "natal", "/api/astro/by_solar", params
+
+
+class HttpTransport:
+    """通过 HTTP 请求本地启动的服务，每个线程复用一个 keep-alive 连接"""
+
+    def __init__(self, url: str, connections: int = 64, timeout: float = 30):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=connections, thread_name_prefix="loadtest")
+        self._local = threading.local()
+
+    def _request(self, path: str) -> Tuple[int, bytes]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+
+    async def request(self, path: str, params: Dict[str, Any]) -> Tuple[int, bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._request, f"{path}?{urlencode(params)}")
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class AsgiTransport:
+    """在当前进程中直接调用 ASGI 应用，不经过网络"""
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan_task: Optional[asyncio.Task] = None
+        self._lifespan_receive: Optional[asyncio.Queue] = None
+        self._lifespan_send: Optional[asyncio.Queue] = None
+
+    async def _lifespan(self, event: str):
+        if self._lifespan_task is None:
+            self._lifespan_receive, self._lifespan_send = asyncio.Queue(), asyncio.Queue()
+            scope = {"type": "lifespan", "asgi": {"version": "3.0"}}
+            self._lifespan_task = asyncio.create_task(
+                self.app(scope, self._lifespan_receive.get, self._lifespan_send.put)
+            )
+        await self._lifespan_receive.put({"type": f"lifespan.{event}"})
+        message = await self._lifespan_send.get()
+        if message["type"].endswith("failed"):
+            raise RuntimeError(f"应用 {event} 失败: {message.get('message')}")
+
+    async def start(self):
+        """执行应用的启动事件（缓存预热、预渲染调度等）"""
+        await self._lifespan("startup")
+
+    async def request(self, path: str, params: Dict[str, Any]) -> Tuple[int, bytes]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params).encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        status = 500
+        body = []
+        request_sent = False
+        response_done = asyncio.Event()
+
+        async def receive():
+            # 请求体只发送一次，之后按 ASGI 约定阻塞到响应结束，再报告连接断开
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_done.set()
+        return status, b"".join(body)
+
+    async def close(self):
+        if self._lifespan_task is not None:
+            await self._lifespan("shutdown")
+
+
+def response_error(status: int, body: bytes) -> Optional[str]:
+    """
+    判断响应是否失败：除 HTTP 状态码外，接口在引擎超时、计算失败时返回 HTTP 200 与 status 为 error/partial 的 JSON
+
+    Returns:
+        错误描述，成功时为None
+    """
+    if not 200 <= status < 300:
+        return f"HTTP {status}"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "响应不是合法的JSON"
+    api_status = data.get("status") if isinstance(data, dict) else None
+    if api_status in ("error", "partial"):
+        return f"{api_status}: {data.get('message')}"[:120]
+    return None
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """最近秩法百分位数"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    """
+    汇总延迟（秒）与错误数
+
+    Returns:
+        完成数、错误数、吞吐量与延迟百分位（毫秒）
+    """
+    values = sorted(latencies)
+    ms = lambda value: None if value is None else round(value * 1000, 2)  # noqa: E731
+    return {
+        "completed": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / duration, 2) if duration > 0 else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1] if values else None),
+    }
+
+
+async def run_load(transport, generator: RequestGenerator, rate: float, duration: float, warmup: float = 0,
+                   arrival: str = "poisson", max_in_flight: int = 1000) -> Dict[str, Any]:
+    """
+    开环压测：按到达速率发出请求，不等待前一个请求完成
+
+    Args:
+        transport: HttpTransport 或 AsgiTransport
+        generator: 请求生成器
+        rate: 每秒到达的请求数
+        duration: 统计时长（秒），不含预热
+        warmup: 预热时长（秒），预热期间的请求不计入统计
+        arrival: poisson 为泊松到达（指数分布间隔），uniform 为均匀间隔
+        max_in_flight: 最多同时进行的请求数，超出时丢弃新到达的请求并计数
+
+    Returns:
+        压测报告
+    """
+    loop = asyncio.get_running_loop()
+    rng = random.Random(generator.rng.random())
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    error_samples: Dict[str, int] = {}
+    in_flight = set()
+    sent = dropped = 0
+
+    started = loop.time()
+    measure_from = started + warmup
+    end = measure_from + duration
+
+    async def fire(kind: str, path: str, params: Dict[str, Any], scheduled: float):
+        try:
+            status, body = await transport.request(path, params)
+            error = response_error(status, body)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"[:120]
+        if scheduled < measure_from:
+            return
+        if error is None:
+            latencies.setdefault(kind, []).append(loop.time() - scheduled)
+        else:
+            errors[kind] = errors.get(kind, 0) + 1
+            error_samples[error] = error_samples.get(error, 0) + 1
+
+    scheduled = started
+    while True:
+        scheduled += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+        if scheduled >= end:
+            break
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind, path, params = generator.next()
+        if len(in_flight) >= max_in_flight:
+            if scheduled >= measure_from:
+                dropped += 1
+            continue
+        if scheduled >= measure_from:
+            sent += 1
+        task = asyncio.create_task(fire(kind, path, params, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.wait(in_flight)
+    elapsed = loop.time() - measure_from
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    report = summarize(all_latencies, sum(errors.values()), duration)
+    report.update(
+        offered_rate=rate,
+        sent=sent,
+        dropped=dropped,
+        # 包括等待最后一批请求完成的时间
+        elapsed=round(elapsed, 3),
+        by_kind={kind: summarize(latencies.get(kind, []), errors.get(kind, 0), duration)
+                 for kind in sorted(set(latencies) | set(errors))},
+        error_samples=error_samples,
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="紫微斗数API压测工具")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="natal-only", help="场景")
+    parser.add_argument("--rate", type=float, default=50, help="每秒到达的请求数")
+    parser.add_argument("--duration", type=float, default=30, help="统计时长（秒）")
+    parser.add_argument("--warmup", type=float, default=5, help="预热时长（秒），不计入统计")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson", help="到达间隔分布")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="最多同时进行的请求数")
+    parser.add_argument("--keys", type=int, help="覆盖场景的出生信息键空间大小，0 表示冷键")
+    parser.add_argument("--zipf-s", type=float, help="覆盖场景的 Zipf 指数")
+    parser.add_argument("--horoscope-ratio", type=float, help="覆盖场景的大限流年请求比例")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://127.0.0.1:8000", help="服务地址")
+    target.add_argument("--in-process", action="store_true", help="在当前进程中压测 main:app")
+    parser.add_argument("--connections", type=int, default=64, help="HTTP 模式的最大连接数")
+    parser.add_argument("--output", help="把报告以 JSON 写入该文件【可选】")
+    args = parser.parse_args()
+
+    config = dict(SCENARIOS[args.scenario])
+    for name in ("keys", "zipf_s", "horoscope_ratio"):
+        if getattr(args, name) is not None:
+            config[name] = getattr(args, name)
+    generator = RequestGenerator(config["horoscope_ratio"], config["keys"], config["zipf_s"], args.seed)
+
+    async def run():
+        if args.in_process:
+            from main import app
+            # 每个请求的 INFO 日志会明显影响进程内压测的结果
+            logging.getLogger("紫微斗数API").setLevel(logging.WARNING)
+            transport = AsgiTransport(app)
+            await transport.start()
+        else:
+            transport = HttpTransport(args.url, args.connections)
+        try:
+            return await run_load(transport, generator, args.rate, args.duration, args.warmup, args.arrival,
+                                  args.max_in_flight)
+        finally:
+            await transport.close()
+
+    report = asyncio.run(run())
+    report = dict(scenario=args.scenario, config=config, arrival=args.arrival,
+                  target="in-process" if args.in_process else args.url, **report)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 """
 紫微斗数API服务主入口文件
 """
+import asyncio
 import logging
 import os
 import sys
@@ -39,6 +40,9 @@ def check_dependencies():
         try:
             import py_iztro
             logger.info(f"检测到py_iztro库，版本: {getattr(py_iztro, '__version__', '未知')}")
+            # 导入 py_iztro 不会加载引擎，只检查 pythonmonkey 是否安装
+            if not py_iztro.engine_available():
+                logger.warning("未检测到pythonmonkey，将使用模拟数据模式运行")
         except ImportError:
             logger.warning("未检测到py_iztro库，将使用模拟数据模式运行")
             
@@ -65,12 +69,18 @@ def install_requirements():
         return False
 
 # 导入应用程序组件 - 在检查依赖后再导入
-from app.utils import setup_logging
+from app.utils import setup_logging, priority, PRIORITY_CLASSES
 # 使用我们自己的日志配置
 logger = setup_logging()
 
 # 导入路由组件
 from app.routes import astro_routes, test_routes, root_routes, calendar_routes
+from app.services.warmup_service import start_warmup, WARMUP_BLOCKING
+from app.services.prerender_service import start_prerender_scheduler, stop_prerender_scheduler
+from app.services.result_cache import close_result_cache
+from app.services.live_horoscope_service import stop_live_horoscope_hub
+from app.services.astro_provider import AstroProvider
+from app.utils.traffic_recorder import get_traffic_recorder
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -88,6 +98,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 优先级请求头：批量任务的客户端设置 X-Iztro-Priority: batch，排盘引擎优先处理其他（interactive）请求
+class PriorityMiddleware:
+    """
+    按请求头设置本次请求调用引擎的优先级类别
+
+    使用原始 ASGI 中间件而不是 @app.middleware("http")：后者基于 BaseHTTPMiddleware，会在另一个任务中运行应用，
+    并改变 receive 的语义；这里只在调用应用期间设置上下文变量，同步接口在线程池中执行时会复制当前上下文。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope.get("headers") or [])
+            priority_class = headers.get(b"x-iztro-priority", b"").decode("latin-1").strip().lower()
+            if priority_class in PRIORITY_CLASSES:
+                with priority(priority_class):
+                    await self.app(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(PriorityMiddleware)
+
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -118,12 +153,34 @@ async def startup_event():
     """应用启动时的事件处理"""
     logger.info("紫微斗数API服务启动")
 
+    # 按记录的请求频次预热星盘缓存，可配置为预热完成后再开始接收请求
+    warmup_thread = start_warmup()
+    if warmup_thread is not None and WARMUP_BLOCKING:
+        logger.info("等待缓存预热完成后再开始接收请求")
+        await asyncio.to_thread(warmup_thread.join)
+
+    # 为已登记的出生信息定时预渲染流日/流时运限
+    start_prerender_scheduler()
+
 # 应用关闭事件
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时的事件处理"""
     logger.info("紫微斗数API服务关闭")
 
+    stop_prerender_scheduler()
+    stop_live_horoscope_hub()
+
+    # 保存请求记录，供下次启动预热
+    recorder = get_traffic_recorder()
+    if recorder is not None:
+        recorder.flush()
+
+    close_result_cache()
+
+    # 停止引擎子进程
+    AstroProvider.close_engine()
+
 def main():
     """
     API服务主入口函数
@@ -1,3 +1,4 @@
-from py_iztro.astro import Astro
+from py_iztro.astro import Astro, engine_available, engine_loaded, load_engine
+from py_iztro.config import EngineConfig
 
 __version__ = "0.1.2"
@@ -0,0 +1,5 @@
+import sys
+
+from py_iztro.cli import main
+
+sys.exit(main())
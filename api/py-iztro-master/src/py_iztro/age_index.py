@@ -0,0 +1,178 @@
+from collections.abc import Iterable
+from datetime import date
+
+import numpy as np
+
+from py_iztro.horoscope_tables import CHILDHOOD_PALACES
+from py_iztro.lunar import iter_lunar_months, solar_to_lunar
+from py_iztro.models import AstrolabeModel
+
+DateLike = str | date | np.datetime64
+
+# 农历表范围内每一天的农历年、月、日，按与农历表第一天相差的天数索引，首次使用时构建
+_day_table: np.ndarray | None = None
+_first_day: np.datetime64 | None = None
+
+
+def _lunar_day_table() -> np.ndarray:
+    """
+    (天数, 3) 的农历年月日表，闰月与其所闰月份同号，与 iztro 计算虚岁时的用法一致
+    """
+    global _day_table, _first_day
+
+    if _day_table is None:
+        months = list(iter_lunar_months())
+        table = np.zeros((sum(days for *_, days in months), 3), dtype=np.int16)
+        offset = 0
+        for _, year, month, _, days in months:
+            table[offset : offset + days] = (year, month, 0)
+            table[offset : offset + days, 2] = np.arange(1, days + 1)
+            offset += days
+        _first_day = np.datetime64(months[0][0], "D")
+        _day_table = table
+    return _day_table
+
+
+def _day_offsets(dates: Iterable[DateLike] | np.ndarray) -> np.ndarray:
+    """
+    日期相对农历表第一天的天数
+    """
+    table = _lunar_day_table()
+    values = np.asarray(dates)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = np.array([_to_datetime64(value) for value in values.ravel()]).reshape(values.shape)
+    offsets = (values.astype("datetime64[D]") - _first_day).astype(np.int64)
+    if offsets.size and (offsets.min() < 0 or offsets.max() >= len(table)):
+        raise ValueError("日期超出农历表范围")
+    return offsets
+
+
+def _to_datetime64(value: DateLike) -> np.datetime64:
+    if isinstance(value, str):
+        year, month, day = (int(part) for part in value.strip().split(" ")[0].split("-")[:3])
+        value = date(year, month, day)
+    return np.datetime64(value, "D")
+
+
+class AgeIndex:
+    """
+    不经过引擎的大限、小限查询
+
+    本命盘每个宫位的 `decadal.range` 和 `ages` 已经决定了任意虚岁所在的大限宫和小限宫，
+    据此建立 虚岁 -> 宫位索引 的数组；日期先查农历表换算为虚岁，单个日期与 NumPy 日期数组都是 O(1) 查表，
+    结果与 `AstrolabeModel.horoscope()` 的 `decadal.index`、`age.index`、`age.nominal_age` 一致。
+    """
+
+    def __init__(
+        self,
+        decadal: np.ndarray,
+        small: np.ndarray,
+        birth_lunar: tuple[int, int, int],
+        childhood: np.ndarray | None = None,
+    ):
+        """
+        Args:
+            decadal: 虚岁 -> 大限宫位索引，没有对应大限为 -1
+            small: 虚岁 -> 小限宫位索引，没有对应小限为 -1
+            birth_lunar: 出生的农历 (年, 月, 日)
+            childhood: 虚岁 -> 是否童限【可选】
+        """
+        self.decadal = decadal
+        self.small = small
+        self.birth_lunar = birth_lunar
+        self.childhood = childhood if childhood is not None else np.zeros(len(decadal), dtype=bool)
+
+    @classmethod
+    def from_chart(cls, astrolabe: AstrolabeModel) -> "AgeIndex":
+        """
+        从 zh-CN 星盘构建
+
+        Args:
+            astrolabe: 本命盘
+
+        Returns:
+            大限、小限索引
+        """
+        max_age = max(max(palace.decadal.range[1], *palace.ages) for palace in astrolabe.palaces)
+        decadal = np.full(max_age + 1, -1, dtype=np.int8)
+        small = np.full(max_age + 1, -1, dtype=np.int8)
+        # 与 iztro 相同，范围重叠时以靠前的宫位为准，因此倒序写入
+        for palace in reversed(astrolabe.palaces):
+            start, end = palace.decadal.range
+            decadal[start : end + 1] = palace.index
+            for age in palace.ages:
+                small[age] = palace.index
+
+        childhood = np.zeros(max_age + 1, dtype=bool)
+        names = {palace.name: palace.index for palace in astrolabe.palaces}
+        for age, name in enumerate(CHILDHOOD_PALACES, 1):
+            if age <= max_age and decadal[age] < 0 and name in names:
+                decadal[age] = names[name]
+                childhood[age] = True
+
+        year, month, day, _ = solar_to_lunar(astrolabe.solar_date)
+        return cls(decadal, small, (year, month, day), childhood)
+
+    def nominal_age(self, dates: DateLike | Iterable[DateLike]) -> int | np.ndarray:
+        """
+        目标日期的虚岁，与 iztro 2.4.4 的算法一致：农历年份差，目标农历月份大于出生月份，
+        或者同年同月且日期在出生日之后时再加 1
+
+        Args:
+            dates: 单个日期，或日期序列、`datetime64` 数组
+
+        Returns:
+            单个日期返回 int，否则返回与输入形状相同的数组
+        """
+        scalar = isinstance(dates, str | date | np.datetime64)
+        lunar = _lunar_day_table()[_day_offsets([dates] if scalar else dates)]
+        year, month, day = lunar[..., 0], lunar[..., 1], lunar[..., 2]
+        birth_year, birth_month, birth_day = self.birth_lunar
+        ages = year.astype(np.int32) - birth_year
+        ages += ((year == birth_year) & (month == birth_month) & (day > birth_day)) | (month > birth_month)
+        return int(ages[0]) if scalar else ages
+
+    def _lookup(self, table: np.ndarray, ages: int | np.ndarray) -> int | np.ndarray:
+        if isinstance(ages, int):
+            return int(table[ages]) if 0 <= ages < len(table) else -1
+        inside = (ages >= 0) & (ages < len(table))
+        return np.where(inside, table[np.clip(ages, 0, len(table) - 1)], -1)
+
+    def active_decadal(self, dates: DateLike | Iterable[DateLike]) -> int | np.ndarray:
+        """
+        目标日期所在大限的宫位索引，没有对应大限时为 -1
+
+        Args:
+            dates: 单个日期，或日期序列、`datetime64` 数组
+
+        Returns:
+            单个日期返回 int，否则返回数组
+        """
+        return self._lookup(self.decadal, self.nominal_age(dates))
+
+    def active_age(self, dates: DateLike | Iterable[DateLike]) -> int | np.ndarray:
+        """
+        目标日期所在小限的宫位索引，没有对应小限时为 -1
+
+        Args:
+            dates: 单个日期，或日期序列、`datetime64` 数组
+
+        Returns:
+            单个日期返回 int，否则返回数组
+        """
+        return self._lookup(self.small, self.nominal_age(dates))
+
+    def lifetime(self) -> dict[str, np.ndarray]:
+        """
+        一生的大限与小限，按虚岁排列
+
+        Returns:
+            `nominal_age` 虚岁、`decadal` 大限宫位索引、`childhood` 是否童限、`age` 小限宫位索引
+        """
+        ages = np.arange(1, len(self.decadal))
+        return {
+            "nominal_age": ages,
+            "decadal": self.decadal[1:],
+            "childhood": self.childhood[1:],
+            "age": self.small[1:],
+        }
@@ -0,0 +1,345 @@
+import json
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import numpy as np
+
+from py_iztro.encoding import MUTAGENS, PALACE_NAMES
+from py_iztro.models import AstrolabeModel
+from py_iztro.space import NatalInputSpace
+
+# 星盘级别的分类列
+CHART_COLUMNS = (
+    "gender",
+    "year_ganzhi",
+    "time",
+    "sign",
+    "zodiac",
+    "soul",
+    "body",
+    "five_elements_class",
+    "earthly_branch_of_soul_palace",
+    "earthly_branch_of_body_palace",
+)
+# 宫位级别的分类列，每列为 (星盘数量, 12) 的矩阵，列顺序同 PALACE_NAMES
+PALACE_COLUMNS = ("heavenly_stem", "earthly_branch", "changsheng12", "boshi12", "jiangqian12", "suiqian12")
+
+# zh-CN 的星曜亮度取值，未出现在数据表中的取值查询结果为空
+BRIGHTNESS = ("庙", "旺", "得", "利", "平", "不", "陷")
+
+# 星曜矩阵的最大列数（星曜种类数）
+_MAX_STARS = 256
+_CHUNK_ROWS = 4096
+_PALACE_COLS = {name: i for i, name in enumerate(PALACE_NAMES)}
+_MUTAGEN_CODES = {mutagen: i for i, mutagen in enumerate(MUTAGENS)}
+
+
+class _Categories:
+    """
+    分类取值与整数编码的双向映射
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ChartTable:
+    """
+    星盘列式数据表
+
+    把一批星盘展开为 NumPy 列：星盘级别的分类列、每个宫位属性一列 (N, 12) 的矩阵，
+    以及 (N, 星曜种类数) 的星曜落宫、四化、亮度矩阵。分类值以整数编码保存，
+    统计时全部在数组上向量化完成，不再逐个遍历 pydantic 模型。
+    """
+
+    def __init__(
+        self,
+        charts: dict[str, np.ndarray],
+        palaces: dict[str, np.ndarray],
+        stars: dict[str, np.ndarray],
+        categories: dict[str, list[str]],
+    ):
+        """
+        Args:
+            charts: 星盘级别的列，键为列名，值为长度 N 的数组
+            palaces: 宫位级别的列，键为属性名，值为 (N, 12) 的数组
+            stars: 星曜矩阵，`palace` 为落宫索引，`mutagen` 为四化编码，`brightness` 为亮度编码，缺失为 -1
+            categories: 各分类列的取值表，`star` 为星曜列的名称
+        """
+        self.charts = charts
+        self.palaces = palaces
+        self.stars = stars
+        self.categories = categories
+        self._star_cols = {name: i for i, name in enumerate(categories["star"])}
+
+    def __len__(self) -> int:
+        return len(self.charts["birth_year"])
+
+    @classmethod
+    def from_charts(cls, astrolabes: Iterable[AstrolabeModel]) -> "ChartTable":
+        """
+        从 zh-CN 星盘序列构建列式数据表
+
+        Args:
+            astrolabes: 星盘序列，可以是生成器，逐块写入数组以控制内存
+
+        Returns:
+            列式数据表
+        """
+        categories = {name: _Categories() for name in (*CHART_COLUMNS, *PALACE_COLUMNS)}
+        categories["star"] = _Categories()
+        categories["brightness"] = _Categories()
+
+        chart_chunks, palace_chunks, star_chunks, years = [], [], [], []
+
+        def new_buffers():
+            return (
+                np.full((_CHUNK_ROWS, len(CHART_COLUMNS)), -1, dtype=np.int16),
+                np.full((_CHUNK_ROWS, len(PALACE_COLUMNS), 12), -1, dtype=np.int16),
+                np.full((_CHUNK_ROWS, 3, _MAX_STARS), -1, dtype=np.int8),
+            )
+
+        chart_buf, palace_buf, star_buf = new_buffers()
+        row = 0
+        for astrolabe in astrolabes:
+            values = {
+                "gender": astrolabe.gender,
+                "year_ganzhi": astrolabe.chinese_date.split(" ")[0],
+                "time": astrolabe.time,
+                "sign": astrolabe.sign,
+                "zodiac": astrolabe.zodiac,
+                "soul": astrolabe.soul,
+                "body": astrolabe.body,
+                "five_elements_class": astrolabe.five_elements_class,
+                "earthly_branch_of_soul_palace": astrolabe.earthly_branch_of_soul_palace,
+                "earthly_branch_of_body_palace": astrolabe.earthly_branch_of_body_palace,
+            }
+            for col, name in enumerate(CHART_COLUMNS):
+                chart_buf[row, col] = categories[name].code(values[name])
+            years.append(int(astrolabe.solar_date.split("-")[0]))
+
+            for palace in astrolabe.palaces:
+                palace_col = _PALACE_COLS.get(palace.name)
+                if palace_col is None:
+                    continue
+                for col, name in enumerate(PALACE_COLUMNS):
+                    palace_buf[row, col, palace_col] = categories[name].code(getattr(palace, name))
+                for star in (*palace.major_stars, *palace.minor_stars, *palace.adjective_stars):
+                    star_col = categories["star"].code(star.name)
+                    if star_col >= _MAX_STARS:
+                        raise ValueError(f"星曜种类超过上限 {_MAX_STARS}")
+                    star_buf[row, 0, star_col] = palace_col
+                    star_buf[row, 1, star_col] = _MUTAGEN_CODES.get(star.mutagen or "", -1)
+                    if star.brightness:
+                        star_buf[row, 2, star_col] = categories["brightness"].code(star.brightness)
+
+            row += 1
+            if row == _CHUNK_ROWS:
+                chart_chunks.append(chart_buf)
+                palace_chunks.append(palace_buf)
+                star_chunks.append(star_buf)
+                chart_buf, palace_buf, star_buf = new_buffers()
+                row = 0
+
+        chart_matrix = np.concatenate([*chart_chunks, chart_buf[:row]])
+        palace_matrix = np.concatenate([*palace_chunks, palace_buf[:row]])
+        star_matrix = np.concatenate([*star_chunks, star_buf[:row]])
+        n_stars = len(categories["star"].values)
+
+        charts = {name: chart_matrix[:, col].copy() for col, name in enumerate(CHART_COLUMNS)}
+        charts["birth_year"] = np.asarray(years, dtype=np.int16)
+        palaces = {name: palace_matrix[:, col].copy() for col, name in enumerate(PALACE_COLUMNS)}
+        stars = {name: star_matrix[:, i, :n_stars].copy() for i, name in enumerate(("palace", "mutagen", "brightness"))}
+        return cls(charts, palaces, stars, {name: cat.values for name, cat in categories.items()})
+
+    @classmethod
+    def build(
+        cls,
+        astro: Any,
+        space: NatalInputSpace,
+        ids: Iterable[int] | None = None,
+        fix_leap: bool = True,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> "ChartTable":
+        """
+        对出生信息空间排盘并构建列式数据表
+
+        Args:
+            astro: 排盘引擎，通常为 `Astro` 实例
+            space: 出生信息输入空间
+            ids: 只处理这部分输入ID【可选】，默认整个空间
+            fix_leap: 是否调整闰月情况
+            progress: 进度回调【可选】，参数为 (已完成数量, 总数量)
+
+        Returns:
+            列式数据表
+        """
+        ids = list(range(len(space)) if ids is None else ids)
+
+        def _charts():
+            for done, input_id in enumerate(ids, 1):
+                solar_date, time_index, gender = space[input_id]
+                yield astro.by_solar(solar_date, time_index, gender, fix_leap, "zh-CN")
+                if progress:
+                    progress(done, len(ids))
+
+        return cls.from_charts(_charts())
+
+    def _code(self, name: str, value: str) -> int:
+        # -1 表示缺失（如没有亮度的星曜），不能用作未知取值的编码，否则会匹配所有缺失项
+        if value in self.categories[name]:
+            return self.categories[name].index(value)
+        if name == "brightness" and value in BRIGHTNESS:
+            return len(self.categories[name])
+        raise ValueError(f"{name} 的取值未知: {value}，可选: {', '.join(self.categories[name])}")
+
+    def labels(self, name: str) -> np.ndarray | list[str]:
+        """
+        列的取值表：分类列返回取值名称，整数列返回出现过的取值
+        """
+        if name in self.categories:
+            return self.categories[name]
+        return np.unique(self.charts[name])
+
+    def _group_codes(self, name: str) -> tuple[list, np.ndarray]:
+        if name in self.categories:
+            return self.categories[name], self.charts[name]
+        labels, codes = np.unique(self.charts[name], return_inverse=True)
+        return labels.tolist(), codes
+
+    def palace_column(self, attribute: str, palace: str) -> np.ndarray:
+        """
+        某个宫位某个属性的编码列，如 `palace_column("heavenly_stem", "命宫")`
+        """
+        return self.palaces[attribute][:, PALACE_NAMES.index(palace)]
+
+    def star_mask(
+        self,
+        star: str,
+        palace: str | None = None,
+        mutagen: str | None = None,
+        brightness: str | None = None,
+    ) -> np.ndarray:
+        """
+        某颗星曜满足落宫、四化、亮度条件的星盘掩码，未指定的条件不参与过滤，宫位、四化或亮度取值未知时抛出 ValueError
+
+        Returns:
+            长度 N 的布尔数组
+        """
+        col = self._star_cols.get(star)
+        if col is None:
+            return np.zeros(len(self), dtype=bool)
+        mask = self.stars["palace"][:, col] >= 0
+        if palace is not None:
+            mask &= self.stars["palace"][:, col] == PALACE_NAMES.index(palace)
+        if mutagen is not None:
+            mask &= self.stars["mutagen"][:, col] == MUTAGENS.index(mutagen.removeprefix("化"))
+        if brightness is not None:
+            mask &= self.stars["brightness"][:, col] == self._code("brightness", brightness)
+        return mask
+
+    def mutagen_mask(self, mutagen: str, palace: str) -> np.ndarray:
+        """
+        四化落在某宫的星盘掩码，如 `mutagen_mask("忌", "疾厄")`
+
+        Returns:
+            长度 N 的布尔数组
+        """
+        hit = (self.stars["mutagen"] == MUTAGENS.index(mutagen.removeprefix("化"))) & (
+            self.stars["palace"] == PALACE_NAMES.index(palace)
+        )
+        return hit.any(axis=1)
+
+    def where(self, name: str, value: str | int) -> np.ndarray:
+        """
+        星盘级别列等于某个取值的掩码，如 `where("five_elements_class", "木三局")`，
+        分类列的取值未出现在数据表中时抛出 ValueError
+        """
+        if name in self.categories:
+            return self.charts[name] == self._code(name, value)
+        return self.charts[name] == value
+
+    def value_counts(self, name: str, mask: np.ndarray | None = None) -> dict:
+        """
+        统计星盘级别列每个取值的数量
+
+        Args:
+            name: 列名
+            mask: 只统计掩码为真的星盘【可选】
+
+        Returns:
+            取值 -> 数量
+        """
+        labels, codes = self._group_codes(name)
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes, minlength=len(labels))
+        return {label: int(count) for label, count in zip(labels, counts, strict=False) if count}
+
+    def crosstab(self, row: str, col: str, mask: np.ndarray | None = None) -> tuple[list, list, np.ndarray]:
+        """
+        两个星盘级别列的交叉计数，如 `crosstab("birth_year", "five_elements_class")`
+
+        Returns:
+            (行取值, 列取值, 计数矩阵)
+        """
+        row_labels, row_codes = self._group_codes(row)
+        col_labels, col_codes = self._group_codes(col)
+        if mask is not None:
+            row_codes, col_codes = row_codes[mask], col_codes[mask]
+        flat = row_codes.astype(np.int64) * len(col_labels) + col_codes
+        counts = np.bincount(flat, minlength=len(row_labels) * len(col_labels))
+        return row_labels, col_labels, counts.reshape(len(row_labels), len(col_labels))
+
+    def share(self, mask: np.ndarray, by: str | None = None) -> float | dict:
+        """
+        掩码为真的星盘占比，可按星盘级别列分组
+
+        Args:
+            mask: 条件掩码
+            by: 分组列名【可选】
+
+        Returns:
+            不分组时返回总体占比，分组时返回 分组取值 -> 占比
+        """
+        if by is None:
+            return float(mask.mean()) if len(self) else 0.0
+        labels, codes = self._group_codes(by)
+        totals = np.bincount(codes, minlength=len(labels))
+        hits = np.bincount(codes, weights=mask.astype(np.float64), minlength=len(labels))
+        return {label: float(hit / total) for label, hit, total in zip(labels, hits, totals, strict=False) if total}
+
+    def save(self, path: str):
+        """
+        将数据表保存为压缩文件
+        """
+        arrays = {f"chart.{name}": value for name, value in self.charts.items()}
+        arrays.update({f"palace.{name}": value for name, value in self.palaces.items()})
+        arrays.update({f"star.{name}": value for name, value in self.stars.items()})
+        meta = json.dumps({"categories": self.categories}, ensure_ascii=False)
+        np.savez_compressed(path, meta=np.array(meta), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ChartTable":
+        """
+        从文件加载数据表
+        """
+        charts, palaces, stars = {}, {}, {}
+        groups = {"chart": charts, "palace": palaces, "star": stars}
+        with np.load(path) as data:
+            categories = json.loads(str(data["meta"]))["categories"]
+            for key in data.files:
+                if key != "meta":
+                    group, name = key.split(".", 1)
+                    groups[group][name] = data[key]
+        return cls(charts, palaces, stars, categories)
@@ -1,15 +1,199 @@
+import importlib.util
+import threading
+from collections import OrderedDict
+from functools import cache, partial
 from importlib import resources
 
-import pythonmonkey as pm
+from py_iztro.cache import ChartCache, chart_cache_key, normalize_date_str
+from py_iztro.config import DEFAULT_CONFIG, EngineConfig
+from py_iztro.handles import JsHandlePool, rss_bytes
+from py_iztro.lunar import LUNAR_MAX_YEAR, LUNAR_MIN_YEAR, lunar_to_solar
+from py_iztro.models import AstrolabeModel, GenderType, HoroscopeModel, LangueType, TimeIndexType
 
-from py_iztro.models import AstrolabeModel, GenderType, LangueType, TimeIndexType
+# iztro 的 JS 模块，进程内的 Astro 实例共用。导入 pythonmonkey 就会启动 SpiderMonkey，
+# 因此推迟到第一次排盘（或调用 `load_engine`）时才导入，`import py_iztro` 本身不加载引擎
+_iztro_js = None
+_iztro_lock = threading.Lock()
+
+
+def engine_available() -> bool:
+    """
+    是否安装了 pythonmonkey，只查找模块，不导入也不启动引擎
+    """
+    return importlib.util.find_spec("pythonmonkey") is not None
+
+
+def engine_loaded() -> bool:
+    """
+    引擎是否已经加载
+    """
+    return _iztro_js is not None
+
+
+def load_engine():
+    """
+    导入 pythonmonkey 并加载 iztro，只在第一次调用时加载
+
+    Returns:
+        iztro 的 JS 模块
+    """
+    global _iztro_js
+
+    if _iztro_js is None:
+        with _iztro_lock:
+            if _iztro_js is None:
+                import pythonmonkey as pm
+
+                _iztro_js = pm.require(str(resources.files("py_iztro.res") / "iztro-2.4.4.min.js"))
+    return _iztro_js
+
+
+@cache
+def _iztro_source() -> str:
+    return (resources.files("py_iztro.res") / "iztro-2.4.4.min.js").read_text(encoding="utf-8")
+
+
+def create_engine_context(config: EngineConfig):
+    """
+    为配置创建独立的引擎上下文：单独执行一遍 iztro 脚本，得到与其他配置互不影响的模块实例，
+    再设置配置、加载插件
+
+    Args:
+        config: 引擎配置
+
+    Returns:
+        该上下文中 iztro 的 astro 对象
+    """
+    import pythonmonkey as pm
+
+    factory = pm.eval(
+        "(function () { var module = { exports: {} }, exports = module.exports;\n"
+        + _iztro_source()
+        + "\nreturn module.exports; })"
+    )
+    astro = factory().get("astro")
+    options = config.to_js()
+    if options:
+        astro.config(options)
+    if config.plugins:
+        astro.loadPlugins([pm.eval(f"({source})") for source in config.plugins])
+    return astro
+
+
+def _collect_js_garbage():
+    import pythonmonkey as pm
+
+    if hasattr(pm, "collect"):
+        pm.collect()
 
 
 class Astro:
-    def __init__(self):
-        _js_path = resources.files("py_iztro.res") / "iztro-2.4.4.min.js"
-        _js_obj = pm.require(str(_js_path))
-        self._astro = _js_obj.get("astro")
+    def __init__(
+        self,
+        cache_size: int = 0,
+        js_handle_limit: int = 128,
+        gc_every: int = 1000,
+        config: EngineConfig | None = None,
+        max_contexts: int = 8,
+    ):
+        """
+        Args:
+            cache_size: 星盘缓存容量【默认 0，不缓存】，阳历与农历入口共享同一份缓存
+            js_handle_limit: 最多保留的星盘 JS 对象数量【默认 128】，超出后释放最久未使用的，
+            被释放的星盘计算运限时按出生信息重新创建；为 0 时星盘直接持有各自的 JS 对象
+            gc_every: 每释放多少个 JS 对象触发一次 JS 垃圾回收【默认 1000】，0 表示不主动回收
+            config: 默认的引擎配置【可选】，各排盘方法也可以单独传入
+            max_contexts: 最多保留的非默认配置引擎上下文数量【默认 8】，超出后释放最久未使用的，
+            其星盘计算运限时在重新创建的上下文中重新排盘
+        """
+        self._astro_js = None
+        self.config = DEFAULT_CONFIG if config is None else config
+        self.max_contexts = max_contexts
+        self._contexts: OrderedDict[tuple, object] = OrderedDict()
+        self._contexts_lock = threading.Lock()
+        self.cache = ChartCache(cache_size) if cache_size > 0 else None
+        self.handles = JsHandlePool(js_handle_limit, gc_every, _collect_js_garbage) if js_handle_limit > 0 else None
+
+    @property
+    def _astro(self):
+        """
+        iztro 的 astro 对象，第一次使用时加载引擎
+        """
+        if self._astro_js is None:
+            self._astro_js = load_engine().get("astro")
+        return self._astro_js
+
+    def load(self) -> "Astro":
+        """
+        立即加载引擎，服务启动时调用，避免第一个请求承担引擎启动的耗时
+
+        Returns:
+            自身
+        """
+        self._engine(self.config)
+        return self
+
+    def _engine(self, config: EngineConfig):
+        """
+        配置对应的 iztro astro 对象，默认配置使用进程内共用的模块，其他配置各自使用一个引擎上下文
+        """
+        key = config.key()
+        if not key:
+            return self._astro
+        with self._contexts_lock:
+            engine = self._contexts.get(key)
+            if engine is None:
+                engine = self._contexts[key] = create_engine_context(config)
+                while len(self._contexts) > self.max_contexts:
+                    self._contexts.popitem(last=False)
+            else:
+                self._contexts.move_to_end(key)
+            return engine
+
+    def _js_by_solar(self, config: EngineConfig, args: tuple):
+        return self._engine(config).bySolar(*args)
+
+    def _bind_handle(self, data: AstrolabeModel, key: tuple, config: EngineConfig) -> AstrolabeModel:
+        """
+        让星盘从句柄池借用 JS 对象，句柄键即星盘缓存键，前五项正是重新排盘所需的 bySolar 参数
+        """
+        if self.handles is not None:
+            data.bind_handle(self.handles, key, partial(self._js_by_solar, config, key[:5]))
+        return data
+
+    def engine_contexts(self) -> list[tuple]:
+        """
+        当前保留的非默认配置引擎上下文
+
+        Returns:
+            配置键列表，按最近使用排序
+        """
+        with self._contexts_lock:
+            return list(self._contexts)
+
+    def collect_garbage(self):
+        """
+        触发 JS 垃圾回收
+        """
+        if self.handles is not None:
+            self.handles.collect()
+        elif engine_loaded():
+            _collect_js_garbage()
+
+    def memory_stats(self) -> dict:
+        """
+        引擎内存统计：进程 RSS、存活的星盘 JS 对象句柄、星盘缓存
+
+        pythonmonkey 没有提供 SpiderMonkey 堆大小的接口，JS 堆的增长通过存活句柄数和 RSS 观察。
+
+        Returns:
+            统计信息
+        """
+        return {
+            "rss_bytes": rss_bytes(),
+            "js_handles": self.handles.stats() if self.handles is not None else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
 
     def by_solar(
         self,
@@ -18,6 +202,7 @@ class Astro:
         gender: GenderType,
         fix_leap: bool = True,
         language: LangueType = "zh-CN",
+        config: EngineConfig | None = None,
     ) -> AstrolabeModel:
         """
         通过阳历获取星盘信息
@@ -28,11 +213,111 @@ class Astro:
             gender: 性别【男|女】
             fix_leap: 是否调整闰月情况【默认 true】，假如调整闰月，则闰月的前半个月算上个月，后半个月算下个月
             language: 输出语言【默认 zh-CN】，支持的语言有：en-US, ja-JP, ko-KR, zh-CN, zh-TW, vi-VN
+            config: 引擎配置【可选】，默认为创建 Astro 时的配置，不同配置的星盘分别缓存
+
+        Returns:
+            星盘信息
+        """
+
+        config = self.config if config is None else config
+        key = chart_cache_key(solar_date_str, time_index, gender, fix_leap, language, config.key())
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self._engine(config).bySolar(*key[:5])
+        data = self._bind_handle(AstrolabeModel.from_js_astro_obj(result), key, config)
+        if self.cache is not None:
+            self.cache.set(key, data)
+        return data
+
+    def by_lunar(
+        self,
+        lunar_date_str: str,
+        time_index: TimeIndexType,
+        gender: GenderType,
+        is_leap_month: bool = False,
+        fix_leap: bool = True,
+        language: LangueType = "zh-CN",
+        config: EngineConfig | None = None,
+    ) -> AstrolabeModel:
+        """
+        通过农历获取星盘信息
+
+        农历日期先换算为阳历再走 `by_solar`，因此同一出生时间无论从哪个入口排盘都命中同一条缓存。
+        Args:
+            lunar_date_str: 农历日期【YYYY-M-D】，例如2000年七月十七则传入 2000-7-17
+            time_index: 出生时辰序号【0~12】
+            gender: 性别【男|女】
+            is_leap_month: 是否闰月【默认 false】，当实际月份没有闰月时该参数不生效
+            fix_leap: 是否调整闰月情况【默认 true】，假如调整闰月，则闰月的前半个月算上个月，后半个月算下个月
+            language: 输出语言【默认 zh-CN】，支持的语言有：en-US, ja-JP, ko-KR, zh-CN, zh-TW, vi-VN
+            config: 引擎配置【可选】，默认为创建 Astro 时的配置，不同配置的星盘分别缓存
 
         Returns:
             星盘信息
         """
 
-        result = self._astro.bySolar(solar_date_str, time_index, gender, fix_leap, language)
+        config = self.config if config is None else config
+        year = normalize_date_str(lunar_date_str).split("-")[0]
+        if year.lstrip("-").isdigit() and LUNAR_MIN_YEAR <= int(year) <= LUNAR_MAX_YEAR:
+            solar_date_str = lunar_to_solar(lunar_date_str, is_leap_month)
+            return self.by_solar(solar_date_str, time_index, gender, fix_leap, language, config)
+
+        # 超出内置农历表的年份交给 iztro 换算，结果按阳历日期写入缓存
+        result = self._engine(config).byLunar(lunar_date_str, time_index, gender, is_leap_month, fix_leap, language)
         data = AstrolabeModel.from_js_astro_obj(result)
+        key = chart_cache_key(data.solar_date, time_index, gender, fix_leap, language, config.key())
+        data = self._bind_handle(data, key, config)
+        if self.cache is not None:
+            self.cache.set(key, data)
+        return data
+
+    def horoscope_by_solar(
+        self,
+        solar_date_str: str,
+        time_index: TimeIndexType,
+        gender: GenderType,
+        target_date_str: str,
+        target_time_index: TimeIndexType,
+        fix_leap: bool = True,
+        language: LangueType = "zh-CN",
+        config: EngineConfig | None = None,
+    ) -> HoroscopeModel:
+        """
+        通过阳历出生信息获取指定日期、时辰的运限
+
+        与星盘共用缓存，缓存键为星盘缓存键加上规范化后的目标日期与目标时辰。
+        Args:
+            solar_date_str: 阳历日期【YYYY-M-D】
+            time_index: 出生时辰序号【0~12】
+            gender: 性别【男|女】
+            target_date_str: 目标阳历日期【YYYY-M-D】
+            target_time_index: 目标时辰序号【0~12】
+            fix_leap: 是否调整闰月情况【默认 true】
+            language: 输出语言【默认 zh-CN】
+            config: 引擎配置【可选】，默认为创建 Astro 时的配置
+
+        Returns:
+            运限信息
+        """
+
+        config = self.config if config is None else config
+        key = (
+            "horoscope",
+            *chart_cache_key(solar_date_str, time_index, gender, fix_leap, language, config.key()),
+            normalize_date_str(target_date_str),
+            target_time_index,
+        )
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        data = self.by_solar(solar_date_str, time_index, gender, fix_leap, language, config).horoscope(
+            key[-2], target_time_index
+        )
+        if self.cache is not None:
+            self.cache.set(key, data)
         return data
@@ -0,0 +1,273 @@
+"""
+批量排盘
+
+从 CSV 或 JSONL 流式读取出生信息，分发给多个工作进程（每个进程各自加载一次 iztro），按输入顺序把星盘写成 JSONL，
+支持中断后从检查点继续：
+
+    py-iztro batch births.csv -o charts.jsonl --workers 8
+    py-iztro batch births.csv -o charts.jsonl --workers 8 --resume
+
+失败的记录超过 `--max-failures`（默认 0）条时以非零状态退出。
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
+from itertools import islice
+
+# 工作进程中的引擎，由 _init_worker 创建
+_worker_astro = None
+
+_TRUE_VALUES = ("1", "true", "yes", "y", "是")
+
+
+def _to_bool(value, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+def read_records(path: str, fmt: str | None = None) -> Iterator[dict]:
+    """
+    流式读取出生信息
+
+    CSV 需要表头，JSONL 每行一个对象；字段为 solar_date 或 lunar_date、time_index、gender，
+    可选 is_leap_month、fix_leap、language，其余字段原样保留在输出的 input 中。
+
+    Args:
+        path: 输入文件路径，`-` 表示标准输入
+        fmt: csv 或 jsonl【可选】，默认按扩展名判断
+
+    Returns:
+        出生信息迭代器
+    """
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv")
+    with nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _init_worker():
+    global _worker_astro
+
+    from py_iztro import Astro
+
+    # 批量排盘的出生信息很少重复，不开启缓存；只计算本命盘，不需要保留 JS 对象
+    _worker_astro = Astro(js_handle_limit=1)
+
+
+def _compute(record: dict):
+    time_index = int(record["time_index"])
+    gender = record["gender"]
+    fix_leap = _to_bool(record.get("fix_leap"), True)
+    language = record.get("language") or "zh-CN"
+    if record.get("solar_date"):
+        return _worker_astro.by_solar(record["solar_date"], time_index, gender, fix_leap, language)
+    return _worker_astro.by_lunar(
+        record["lunar_date"], time_index, gender, _to_bool(record.get("is_leap_month"), False), fix_leap, language
+    )
+
+
+def _compute_chunk(chunk: list[tuple[int, dict]]) -> tuple[str, int]:
+    """
+    在工作进程中计算一批出生信息，直接序列化为 JSONL，父进程只负责按顺序写入
+
+    Returns:
+        (JSONL 文本, 失败数)
+    """
+    lines = []
+    failed = 0
+    for index, record in chunk:
+        try:
+            chart = _compute(record).model_dump(by_alias=True)
+            item = {"index": index, "input": record, "chart": chart}
+        except Exception as e:
+            failed += 1
+            item = {"index": index, "input": record, "error": str(e)}
+        lines.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n", failed
+
+
+def _chunks(records: Iterable[dict], size: int, start: int) -> Iterator[list[tuple[int, dict]]]:
+    iterator = enumerate(records)
+    if start:
+        # 跳过检查点之前已完成的记录
+        next(islice(iterator, start - 1, start), None)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _read_checkpoint(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(path: str, checkpoint: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    fmt: str | None = None,
+    resume: bool = False,
+    checkpoint_path: str | None = None,
+    checkpoint_every: float = 5.0,
+    report_every: float = 5.0,
+) -> dict:
+    """
+    批量排盘
+
+    同时在途的批次数量有上限，内存占用与输入规模无关；每隔 `checkpoint_every` 秒把已按顺序写入的记录数
+    和输出文件长度写入检查点。续跑时把输出文件截断到检查点记录的长度，再跳过已完成的记录。
+
+    Args:
+        input_path: 输入文件路径（CSV 或 JSONL）
+        output_path: 输出 JSONL 文件路径
+        workers: 工作进程数量【默认 CPU 核数】
+        chunk_size: 每批发送给工作进程的记录数
+        fmt: 输入格式 csv 或 jsonl【可选】
+        resume: 是否从检查点继续
+        checkpoint_path: 检查点文件路径【默认 输出文件路径 + .ckpt】
+        checkpoint_every: 写检查点的间隔（秒）
+        report_every: 输出进度的间隔（秒）
+
+    Returns:
+        统计信息：记录数、失败数、耗时、吞吐量
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = checkpoint_path or f"{output_path}.ckpt"
+    checkpoint = _read_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and checkpoint.get("input") != os.path.abspath(input_path):
+        raise ValueError(f"检查点属于另一个输入文件: {checkpoint.get('input')}")
+    completed = checkpoint["completed"] if checkpoint else 0
+    failed = checkpoint.get("failed", 0) if checkpoint else 0
+
+    output = open(output_path, "r+b" if checkpoint else "wb")  # noqa: SIM115
+    if checkpoint:
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(checkpoint["output_bytes"])
+
+    # spawn 启动的工作进程各自加载 iztro，不继承父进程状态
+    context = multiprocessing.get_context("spawn")
+    started = last_report = last_checkpoint = time.monotonic()
+    resumed_from = completed
+    pending = deque()
+
+    def save_checkpoint():
+        output.flush()
+        os.fsync(output.fileno())
+        _write_checkpoint(
+            checkpoint_path,
+            {
+                "input": os.path.abspath(input_path),
+                "completed": completed,
+                "failed": failed,
+                "output_bytes": output.tell(),
+            },
+        )
+
+    try:
+        with context.Pool(workers, initializer=_init_worker) as pool:
+            chunks = _chunks(read_records(input_path, fmt), chunk_size, completed)
+            exhausted = False
+            while pending or not exhausted:
+                # 保持固定数量的在途批次，输入再大也不会一次性读入内存
+                while not exhausted and len(pending) < workers * 4:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending.append((len(chunk), pool.apply_async(_compute_chunk, (chunk,))))
+                if not pending:
+                    break
+
+                count, result = pending.popleft()
+                text, chunk_failed = result.get()
+                output.write(text.encode("utf-8"))
+                completed += count
+                failed += chunk_failed
+
+                now = time.monotonic()
+                if now - last_checkpoint >= checkpoint_every:
+                    save_checkpoint()
+                    last_checkpoint = now
+                if now - last_report >= report_every:
+                    rate = (completed - resumed_from) / (now - started)
+                    print(f"已完成 {completed} 条，失败 {failed} 条，{rate:.1f} 条/秒", file=sys.stderr)
+                    last_report = now
+    finally:
+        save_checkpoint()
+        output.close()
+
+    elapsed = time.monotonic() - started
+    return {
+        "completed": completed,
+        "failed": failed,
+        "resumed_from": resumed_from,
+        "elapsed": round(elapsed, 3),
+        "throughput": round((completed - resumed_from) / elapsed, 1) if elapsed > 0 else None,
+        "checkpoint": checkpoint_path,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="py-iztro batch", description="从 CSV/JSONL 批量排盘，输出 JSONL")
+    parser.add_argument("input", help="输入文件（CSV 或 JSONL），- 表示标准输入")
+    parser.add_argument("-o", "--output", required=True, help="输出 JSONL 文件")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("-w", "--workers", type=int, help="工作进程数量，默认为 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=64, help="每批发送给工作进程的记录数")
+    parser.add_argument("--resume", action="store_true", help="从检查点继续")
+    parser.add_argument("--checkpoint", help="检查点文件，默认为 输出文件.ckpt")
+    parser.add_argument("--checkpoint-every", type=float, default=5.0, help="写检查点的间隔（秒）")
+    parser.add_argument("--report-every", type=float, default=5.0, help="输出进度的间隔（秒）")
+    parser.add_argument("--max-failures", type=int, default=0, help="允许的排盘失败条数，超过时以非零状态退出")
+    args = parser.parse_args(argv)
+
+    if args.resume and args.input == "-":
+        parser.error("标准输入不支持 --resume")
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        fmt=args.format,
+        resume=args.resume,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        report_every=args.report_every,
+    )
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    if summary["failed"] > args.max_failures:
+        print(f"排盘失败 {summary['failed']} 条，超过上限 {args.max_failures} 条", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
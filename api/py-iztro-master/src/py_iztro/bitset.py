@@ -0,0 +1,64 @@
+import numpy as np
+
+WORD_BITS = 64
+
+
+def word_count(size: int) -> int:
+    """
+    容纳 `size` 个比特所需的 uint64 字数
+    """
+    return (size + WORD_BITS - 1) // WORD_BITS
+
+
+def pack_ids(ids, size: int) -> np.ndarray:
+    """
+    将一组整数ID打包为位图
+
+    Args:
+        ids: 整数ID序列，取值范围 [0, size)
+        size: 位图容量
+
+    Returns:
+        uint64 位图，第 i 位为 1 表示包含 ID i
+    """
+    words = np.zeros(word_count(size), dtype=np.uint64)
+    ids = np.asarray(ids, dtype=np.uint64)
+    if ids.size:
+        np.bitwise_or.at(words, (ids >> np.uint64(6)).astype(np.intp), np.uint64(1) << (ids & np.uint64(63)))
+    return words
+
+
+def unpack_ids(words: np.ndarray, size: int) -> np.ndarray:
+    """
+    将位图解包为有序的整数ID数组
+
+    Args:
+        words: uint64 位图
+        size: 位图容量
+
+    Returns:
+        int64 ID数组
+    """
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits[:size])
+
+
+def popcount(words: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    统计位图中 1 的个数，支持二维数组按行统计
+
+    Args:
+        words: uint64 位图或位图矩阵
+        axis: 统计的维度，默认最后一维
+
+    Returns:
+        每个位图中 1 的个数
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=axis, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(*words.shape, 8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=(axis % words.ndim, -1), dtype=np.int64)
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+def normalize_date_str(date_str: str) -> str:
+    """
+    将日期字符串规范为【YYYY-M-D】，如 `2000-08-16` -> `2000-8-16`，无法解析时原样返回
+
+    Args:
+        date_str: 日期字符串
+
+    Returns:
+        规范后的日期字符串
+    """
+    try:
+        year, month, day = (int(part) for part in date_str.strip().split(" ")[0].split("-")[:3])
+    except ValueError:
+        return date_str
+    return f"{year}-{month}-{day}"
+
+
+def chart_cache_key(
+    solar_date_str: str,
+    time_index: int,
+    gender: str,
+    fix_leap: bool = True,
+    language: str = "zh-CN",
+    config: tuple = (),
+) -> tuple:
+    """
+    星盘缓存键，阳历与农历入口换算到同一阳历日期后得到相同的键
+
+    Args:
+        solar_date_str: 阳历日期【YYYY-M-D】
+        time_index: 出生时辰序号【0~12】
+        gender: 性别【男|女】
+        fix_leap: 是否调整闰月情况
+        language: 输出语言
+        config: 引擎配置键 `EngineConfig.key()`【可选】，默认配置不出现在键中
+
+    Returns:
+        缓存键，前五项为 bySolar 的参数
+    """
+    key = (normalize_date_str(solar_date_str), time_index, gender, bool(fix_leap), language)
+    return (*key, config) if config else key
+
+
+class ChartCache:
+    """
+    线程安全的星盘 LRU 缓存
+
+    缓存的星盘对象会被多次返回，调用方不应修改其内容。
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Args:
+            max_size: 最多缓存的星盘数量
+        """
+        if max_size <= 0:
+            raise ValueError("max_size 必须大于 0")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: tuple) -> Any | None:
+        """
+        读取缓存，命中时将其标记为最近使用
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: tuple, value: Any):
+        """
+        写入缓存，超出容量时淘汰最久未使用的星盘
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+        """
+        with self._lock:
+            return {"size": len(self._data), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,37 @@
+"""
+命令行入口
+
+    py-iztro batch births.csv -o charts.jsonl
+    py-iztro soak --iterations 200000
+    py-iztro startup --import-budget 0.5
+"""
+
+import sys
+
+COMMANDS = {
+    "batch": "从 CSV/JSONL 批量排盘，输出 JSONL",
+    "soak": "内存泄漏浸泡测试",
+    "startup": "冷启动基准",
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print("用法: py-iztro <命令> [参数]\n\n命令:", file=sys.stderr)
+        for name, description in COMMANDS.items():
+            print(f"  {name:<8}{description}", file=sys.stderr)
+        return 0 if argv and argv[0] in ("-h", "--help") else 2
+
+    # 子命令按需导入，避免加载用不到的模块
+    if argv[0] == "batch":
+        from py_iztro.batch import main as command
+    elif argv[0] == "soak":
+        from py_iztro.soak import main as command
+    else:
+        from py_iztro.startup import main as command
+    return command(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
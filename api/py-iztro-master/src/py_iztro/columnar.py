@@ -0,0 +1,382 @@
+import os
+from collections.abc import Iterable
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from py_iztro.encoding import PALACE_NAMES
+from py_iztro.models import AstrolabeModel, HoroscopeModel
+
+# 各表的列定义：(列名, 类型)，dict 为字典编码的字符串列
+TABLES: dict[str, tuple[tuple[str, str], ...]] = {
+    # 每个星盘的每个宫位一行，星盘级别的属性冗余在每一行中，字典编码后几乎不占空间
+    "palaces": (
+        ("chart_id", "int64"),
+        ("solar_date", "string"),
+        ("lunar_date", "string"),
+        ("gender", "dict"),
+        ("time", "dict"),
+        ("five_elements_class", "dict"),
+        ("soul", "dict"),
+        ("body", "dict"),
+        ("palace_index", "int8"),
+        ("palace_name", "dict"),
+        ("heavenly_stem", "dict"),
+        ("earthly_branch", "dict"),
+        ("is_body_palace", "bool"),
+        ("is_original_palace", "bool"),
+        ("changsheng12", "dict"),
+        ("boshi12", "dict"),
+        ("jiangqian12", "dict"),
+        ("suiqian12", "dict"),
+        ("decadal_start", "int16"),
+        ("decadal_end", "int16"),
+    ),
+    # 每颗星曜的落宫一行
+    "stars": (
+        ("chart_id", "int64"),
+        ("palace_index", "int8"),
+        ("palace_name", "dict"),
+        ("earthly_branch", "dict"),
+        ("star", "dict"),
+        ("star_type", "dict"),
+        ("brightness", "dict"),
+        ("mutagen", "dict"),
+    ),
+    # 每个运限的每一层（大限、小限、流年、流月、流日、流时）的每个宫位一行
+    "horoscope_palaces": (
+        ("chart_id", "int64"),
+        ("target_date", "string"),
+        ("target_time_index", "int8"),
+        ("layer", "dict"),
+        ("layer_index", "int8"),
+        ("layer_heavenly_stem", "dict"),
+        ("layer_earthly_branch", "dict"),
+        ("nominal_age", "int16"),
+        ("lu", "dict"),
+        ("quan", "dict"),
+        ("ke", "dict"),
+        ("ji", "dict"),
+        ("palace_index", "int8"),
+        ("palace_name", "dict"),
+    ),
+    # 每颗流耀的落宫一行
+    "horoscope_stars": (
+        ("chart_id", "int64"),
+        ("target_date", "string"),
+        ("target_time_index", "int8"),
+        ("layer", "dict"),
+        ("palace_index", "int8"),
+        ("star", "dict"),
+        ("star_type", "dict"),
+        ("scope", "dict"),
+    ),
+}
+HOROSCOPE_LAYERS = ("decadal", "age", "yearly", "monthly", "daily", "hourly")
+
+_TYPES = {
+    "dict": pa.dictionary(pa.int32(), pa.string()),
+    "string": pa.string(),
+    "int8": pa.int8(),
+    "int16": pa.int16(),
+    "int64": pa.int64(),
+    "bool": pa.bool_(),
+}
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def table_schema(table: str) -> pa.Schema:
+    """
+    表的 Arrow schema
+
+    Args:
+        table: 表名，见 `TABLES`
+
+    Returns:
+        Arrow schema
+    """
+    return pa.schema([pa.field(name, _TYPES[kind]) for name, kind in TABLES[table]])
+
+
+class _Dictionary:
+    """
+    字典列的取值表，编码只增不改，后一批的字典总是前一批的扩展，Arrow IPC 可以只写增量
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str | None) -> int | None:
+        if value is None or value == "":
+            return None
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _TableBuilder:
+    """
+    按列缓冲一张表的行，攒满一批后写成一个 RecordBatch
+    """
+
+    def __init__(self, table: str, path: str, fmt: str, compression: str | None):
+        self.path = path
+        self.fmt = fmt
+        self.compression = compression
+        self.schema = table_schema(table)
+        self.kinds = [kind for _, kind in TABLES[table]]
+        self.columns: list[list] = [[] for _ in self.kinds]
+        # 宫位名称预置为固定顺序，不同文件中同一宫位的编码一致
+        self.dictionaries = [
+            (_Dictionary(PALACE_NAMES) if name == "palace_name" else _Dictionary()) if kind == "dict" else None
+            for name, kind in TABLES[table]
+        ]
+        self.rows = 0
+        self.total_rows = 0
+        self._writer = None
+
+    def append(self, row: tuple):
+        for column, dictionary, value in zip(self.columns, self.dictionaries, row, strict=True):
+            column.append(value if dictionary is None else dictionary.code(value))
+        self.rows += 1
+
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = []
+        for column, dictionary, field in zip(self.columns, self.dictionaries, self.schema, strict=True):
+            if dictionary is None:
+                arrays.append(pa.array(column, type=field.type))
+            else:
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(column, type=pa.int32()), pa.array(dictionary.values, type=pa.string())
+                    )
+                )
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression or "none")
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=self.compression, emit_dictionary_deltas=True)
+                self._writer = pa.ipc.new_file(self.path, self.schema, options=options)
+        self._writer.write_batch(batch)
+        self.total_rows += self.rows
+        self.columns = [[] for _ in self.kinds]
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ChartArrowWriter:
+    """
+    把星盘与运限增量写成 Arrow/Parquet 列式文件
+
+    每张表（见 `TABLES`）写入目录下的一个文件，如 `palaces.parquet`、`stars.parquet`；
+    行按列缓冲，每满 `batch_rows` 行写出一个 RecordBatch（Parquet 中为一个 row group），
+    导出上百万个星盘时内存占用也只与批大小有关。星曜、宫位等名称按字典编码。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = "parquet",
+        batch_rows: int = 65536,
+        compression: str | None = "zstd",
+    ):
+        """
+        Args:
+            directory: 输出目录，不存在时自动创建
+            fmt: 文件格式【parquet|arrow】，arrow 为 Arrow IPC 文件
+            batch_rows: 每批的行数
+            compression: 压缩算法【默认 zstd】，None 为不压缩
+        """
+        if fmt not in _EXTENSIONS:
+            raise ValueError(f"不支持的格式: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.compression = compression
+        self._tables: dict[str, _TableBuilder] = {}
+        self._next_chart_id = 0
+
+    def _table(self, name: str) -> _TableBuilder:
+        builder = self._tables.get(name)
+        if builder is None:
+            path = os.path.join(self.directory, name + _EXTENSIONS[self.fmt])
+            builder = self._tables[name] = _TableBuilder(name, path, self.fmt, self.compression)
+        return builder
+
+    def _maybe_flush(self):
+        for builder in self._tables.values():
+            if builder.rows >= self.batch_rows:
+                builder.flush()
+
+    def write_chart(self, astrolabe: AstrolabeModel, chart_id: int | None = None) -> int:
+        """
+        写入一个星盘
+
+        Args:
+            astrolabe: 星盘
+            chart_id: 星盘ID【可选】，默认按写入顺序从 0 开始编号
+
+        Returns:
+            星盘ID，写入该星盘的运限时使用
+        """
+        if chart_id is None:
+            chart_id = self._next_chart_id
+        self._next_chart_id = chart_id + 1
+
+        palaces = self._table("palaces")
+        stars = self._table("stars")
+        for palace in astrolabe.palaces:
+            decadal = palace.decadal.range or [None, None]
+            palaces.append(
+                (
+                    chart_id,
+                    astrolabe.solar_date,
+                    astrolabe.lunar_date,
+                    astrolabe.gender,
+                    astrolabe.time,
+                    astrolabe.five_elements_class,
+                    astrolabe.soul,
+                    astrolabe.body,
+                    palace.index,
+                    palace.name,
+                    palace.heavenly_stem,
+                    palace.earthly_branch,
+                    palace.is_body_palace,
+                    palace.is_original_palace,
+                    palace.changsheng12,
+                    palace.boshi12,
+                    palace.jiangqian12,
+                    palace.suiqian12,
+                    decadal[0],
+                    decadal[1],
+                )
+            )
+            for star in (*palace.major_stars, *palace.minor_stars, *palace.adjective_stars):
+                stars.append(
+                    (
+                        chart_id,
+                        palace.index,
+                        palace.name,
+                        palace.earthly_branch,
+                        star.name,
+                        star.type,
+                        star.brightness,
+                        star.mutagen,
+                    )
+                )
+        self._maybe_flush()
+        return chart_id
+
+    def write_horoscope(self, chart_id: int, horoscope: HoroscopeModel, target_time_index: int | None = None):
+        """
+        写入一个运限
+
+        Args:
+            chart_id: 所属星盘ID
+            horoscope: 运限
+            target_time_index: 目标时辰序号【可选】
+        """
+        palaces = self._table("horoscope_palaces")
+        stars = self._table("horoscope_stars")
+        for layer in HOROSCOPE_LAYERS:
+            item = getattr(horoscope, layer)
+            mutagen = [*item.mutagen, None, None, None, None][:4]
+            nominal_age = getattr(item, "nominal_age", None)
+            for palace_index, palace_name in enumerate(item.palace_names):
+                palaces.append(
+                    (
+                        chart_id,
+                        horoscope.solar_date,
+                        target_time_index,
+                        layer,
+                        item.index,
+                        item.heavenly_stem,
+                        item.earthly_branch,
+                        nominal_age,
+                        *mutagen,
+                        palace_index,
+                        palace_name,
+                    )
+                )
+            for palace_index, palace_stars in enumerate(item.stars or ()):
+                for star in palace_stars:
+                    stars.append(
+                        (
+                            chart_id,
+                            horoscope.solar_date,
+                            target_time_index,
+                            layer,
+                            palace_index,
+                            star.name,
+                            star.type,
+                            star.scope,
+                        )
+                    )
+        self._maybe_flush()
+
+    def flush(self):
+        """
+        把所有表缓冲中的行写出
+        """
+        for builder in self._tables.values():
+            builder.flush()
+
+    def close(self) -> dict[str, int]:
+        """
+        写出剩余的行并关闭文件
+
+        Returns:
+            各表写入的行数
+        """
+        for builder in self._tables.values():
+            builder.close()
+        return {name: builder.total_rows for name, builder in self._tables.items()}
+
+    def __enter__(self) -> "ChartArrowWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_charts(
+    astrolabes: Iterable[AstrolabeModel],
+    directory: str,
+    fmt: str = "parquet",
+    batch_rows: int = 65536,
+    compression: str | None = "zstd",
+) -> dict[str, int]:
+    """
+    把星盘序列导出为 Arrow/Parquet 列式文件
+
+    Args:
+        astrolabes: 星盘序列，可以是生成器
+        directory: 输出目录
+        fmt: 文件格式【parquet|arrow】
+        batch_rows: 每批的行数
+        compression: 压缩算法【默认 zstd】
+
+    Returns:
+        各表写入的行数
+    """
+    writer = ChartArrowWriter(directory, fmt, batch_rows, compression)
+    try:
+        for astrolabe in astrolabes:
+            writer.write_chart(astrolabe)
+    finally:
+        rows = writer.close()
+    return rows
@@ -0,0 +1,315 @@
+"""
+合盘打分
+
+从星盘的定长位向量编码（见 `py_iztro.encoding`）中取出合盘用到的少量特征，压缩为每张星盘几个小整数，
+两张星盘之间的互动特征全部用整数位运算与广播计算，一对多、多对多都不需要重新排盘，也不需要遍历星盘模型。
+"""
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import numpy as np
+
+from py_iztro.encoding import (
+    BLOCK_OFFSETS,
+    FEATURE_WORDS,
+    MAJOR_STARS,
+    MINOR_STARS,
+    MUTAGEN_STARS,
+    MUTAGENS,
+    PALACE_NAMES,
+    encode,
+    unpack_features,
+)
+from py_iztro.models import AstrolabeModel
+
+# 默认的特征权重，得分为各特征取值的加权和
+DEFAULT_WEIGHTS = {
+    "soul_same": 1.0,  # 命宫同宫
+    "soul_trine": 2.0,  # 命宫三合
+    "soul_harmony": 3.0,  # 命宫六合
+    "soul_clash": -2.0,  # 命宫六冲
+    "ming_shared": 1.0,  # 命宫共同主星数
+    "spouse_match": 2.0,  # 一方夫妻宫主星坐在另一方命宫的数量，双向相加
+    "lu_in": 2.0,  # 一方化禄主星坐在另一方命宫、夫妻宫的数量，双向相加
+    "ke_in": 1.0,  # 化科，同上
+    "ji_in": -2.0,  # 化忌，同上
+    "lucky_spouse": 0.5,  # 双方夫妻宫六吉星数之和
+    "unlucky_spouse": -0.5,  # 双方夫妻宫六煞星数之和
+    "body_same": 1.0,  # 身宫落在同名宫位
+}
+PAIR_FEATURES = tuple(DEFAULT_WEIGHTS)
+
+LUCKY_STARS = ("左辅", "右弼", "文昌", "文曲", "天魁", "天钺")
+UNLUCKY_STARS = ("擎羊", "陀罗", "火星", "铃星", "地空", "地劫")
+
+# 多对多打分时每块最多的星盘对数，避免产生过大的临时矩阵
+_CHUNK_PAIRS = 1 << 22
+
+_MING = PALACE_NAMES.index("命宫")
+_SPOUSE = PALACE_NAMES.index("夫妻")
+_MAJOR_BITS = np.uint16(1) << np.arange(len(MAJOR_STARS), dtype=np.uint16)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << len(MAJOR_STARS))], dtype=np.int8)
+_LUCKY_ROWS = [MINOR_STARS.index(star) for star in LUCKY_STARS]
+_UNLUCKY_ROWS = [MINOR_STARS.index(star) for star in UNLUCKY_STARS]
+_MUTAGEN_MAJOR_COLS = [MUTAGEN_STARS.index(star) for star in MAJOR_STARS]
+
+
+def _block(bits: np.ndarray, name: str, rows: int, cols: int) -> np.ndarray:
+    start = BLOCK_OFFSETS[name]
+    return bits[:, start : start + rows * cols].reshape(len(bits), rows, cols)
+
+
+class ChartTraits(NamedTuple):
+    """
+    一组星盘的合盘特征，每个字段是与星盘一一对应的数组
+
+    主星集合用 14 位掩码表示，第 i 位对应 `MAJOR_STARS[i]`。
+    """
+
+    soul_branch: np.ndarray  # 命宫地支序号，0 为子
+    ming: np.ndarray  # 命宫主星掩码
+    spouse: np.ndarray  # 夫妻宫主星掩码
+    mutagens: np.ndarray  # 形状为 (N, 4)，化禄、化权、化科、化忌的主星掩码
+    lucky_spouse: np.ndarray  # 夫妻宫六吉星数
+    unlucky_spouse: np.ndarray  # 夫妻宫六煞星数
+    body_palace: np.ndarray  # 身宫所在宫位名称的序号，见 `PALACE_NAMES`
+
+    def __len__(self) -> int:
+        return len(self.soul_branch)
+
+    def take(self, rows) -> "ChartTraits":
+        """
+        取出部分星盘的特征
+
+        Args:
+            rows: 行号、切片、行号数组或布尔数组
+
+        Returns:
+            特征
+        """
+        if isinstance(rows, int | np.integer):
+            rows = slice(rows, rows + 1)
+        return ChartTraits(*(field[rows] for field in self))
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray) -> "ChartTraits":
+        """
+        从位向量编码中提取特征
+
+        Args:
+            vectors: 形状为 (FEATURE_WORDS,) 或 (N, FEATURE_WORDS) 的 uint64 编码
+
+        Returns:
+            特征
+        """
+        vectors = np.asarray(vectors, dtype=np.uint64).reshape(-1, FEATURE_WORDS)
+        bits = unpack_features(vectors)
+        major = _block(bits, "major", len(MAJOR_STARS), len(PALACE_NAMES)).astype(np.uint16)
+        minor = _block(bits, "minor", len(MINOR_STARS), len(PALACE_NAMES))
+        mutagen_star = _block(bits, "mutagen_star", len(MUTAGENS), len(MUTAGEN_STARS)).astype(np.uint16)
+        # 编码中的命宫位置是 iztro 的宫位索引（0 为寅宫），换算为地支序号
+        soul_index = _block(bits, "soul_palace", 1, 12)[:, 0].argmax(axis=1)
+        return cls(
+            soul_branch=((soul_index + 2) % 12).astype(np.int8),
+            ming=(major[:, :, _MING] * _MAJOR_BITS).sum(axis=1, dtype=np.uint16),
+            spouse=(major[:, :, _SPOUSE] * _MAJOR_BITS).sum(axis=1, dtype=np.uint16),
+            mutagens=(mutagen_star[:, :, _MUTAGEN_MAJOR_COLS] * _MAJOR_BITS).sum(axis=2, dtype=np.uint16),
+            lucky_spouse=minor[:, _LUCKY_ROWS, _SPOUSE].sum(axis=1, dtype=np.int8),
+            unlucky_spouse=minor[:, _UNLUCKY_ROWS, _SPOUSE].sum(axis=1, dtype=np.int8),
+            body_palace=_block(bits, "body_palace", 1, 12)[:, 0].argmax(axis=1).astype(np.int8),
+        )
+
+    @classmethod
+    def from_charts(cls, astrolabes: Iterable[AstrolabeModel]) -> "ChartTraits":
+        """
+        从星盘提取特征
+
+        Args:
+            astrolabes: zh-CN 星盘序列
+
+        Returns:
+            特征
+        """
+        vectors = [encode(astrolabe) for astrolabe in astrolabes]
+        return cls.from_vectors(np.stack(vectors) if vectors else np.zeros((0, FEATURE_WORDS), dtype=np.uint64))
+
+
+def _as_traits(charts: "ChartTraits | AstrolabeModel | Iterable[AstrolabeModel] | np.ndarray") -> ChartTraits:
+    if isinstance(charts, ChartTraits):
+        return charts
+    if isinstance(charts, AstrolabeModel):
+        return ChartTraits.from_charts([charts])
+    if isinstance(charts, np.ndarray):
+        return ChartTraits.from_vectors(charts)
+    return ChartTraits.from_charts(charts)
+
+
+def pair_features(a: ChartTraits, b: ChartTraits) -> dict[str, np.ndarray]:
+    """
+    计算 a 中每张星盘与 b 中每张星盘的互动特征，互动特征对两张星盘是对称的
+
+    Args:
+        a: 特征，N 张星盘
+        b: 特征，M 张星盘
+
+    Returns:
+        特征名（见 `PAIR_FEATURES`）-> 形状为 (N, M) 的 int8 数组
+    """
+    diff = (a.soul_branch[:, None] - b.soul_branch[None, :]) % 12
+    mutagens_a, mutagens_b = a.mutagens[:, None, :], b.mutagens[None, :, :]
+    # 对方的命宫与夫妻宫主星
+    target_a = (a.ming | a.spouse)[:, None, None]
+    target_b = (b.ming | b.spouse)[None, :, None]
+    mutagens_in = _POPCOUNT[mutagens_a & target_b] + _POPCOUNT[mutagens_b & target_a]
+    return {
+        "soul_same": (diff == 0).astype(np.int8),
+        "soul_trine": ((diff == 4) | (diff == 8)).astype(np.int8),
+        "soul_harmony": ((a.soul_branch[:, None] + b.soul_branch[None, :]) % 12 == 1).astype(np.int8),
+        "soul_clash": (diff == 6).astype(np.int8),
+        "ming_shared": _POPCOUNT[a.ming[:, None] & b.ming[None, :]],
+        "spouse_match": _POPCOUNT[a.spouse[:, None] & b.ming[None, :]] + _POPCOUNT[b.spouse[None, :] & a.ming[:, None]],
+        "lu_in": mutagens_in[:, :, 0],
+        "ke_in": mutagens_in[:, :, 2],
+        "ji_in": mutagens_in[:, :, 3],
+        "lucky_spouse": a.lucky_spouse[:, None] + b.lucky_spouse[None, :],
+        "unlucky_spouse": a.unlucky_spouse[:, None] + b.unlucky_spouse[None, :],
+        "body_same": (a.body_palace[:, None] == b.body_palace[None, :]).astype(np.int8),
+    }
+
+
+def _weight_vector(weights: dict[str, float] | None) -> dict[str, float]:
+    if weights is None:
+        return DEFAULT_WEIGHTS
+    unknown = set(weights) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"未知的合盘特征: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_WEIGHTS, **weights}
+
+
+def _pair_table(weights: dict[str, float]) -> np.ndarray:
+    """
+    命宫地支与身宫位置各只有 12 种取值，两张星盘的 (命宫地支, 身宫位置) 组合得分预先算成 144 × 144 的表，
+    行列号为 命宫地支 * 12 + 身宫位置
+    """
+    branch = np.arange(12)
+    diff = (branch[:, None] - branch[None, :]) % 12
+    soul = (
+        weights["soul_same"] * (diff == 0)
+        + weights["soul_trine"] * ((diff == 4) | (diff == 8))
+        + weights["soul_harmony"] * ((branch[:, None] + branch[None, :]) % 12 == 1)
+        + weights["soul_clash"] * (diff == 6)
+    )
+    body = weights["body_same"] * np.eye(12)
+    return (soul[:, None, :, None] + body[None, :, None, :]).reshape(144, 144).astype(np.float32)
+
+
+def _profiles(traits: ChartTraits) -> tuple[np.ndarray, np.ndarray]:
+    """
+    按主星掩码（命宫、夫妻宫、四化）给星盘分类。命宫、夫妻宫的主星只取决于紫微所在宫位与命宫地支，
+    四化只取决于年干，同一配置下最多 144 × 10 类，与星盘数量无关
+
+    Returns:
+        (每类的代表行号, 每张星盘的类号)
+    """
+    mutagens = np.zeros(len(traits), dtype=np.uint64)
+    for column in range(len(MUTAGENS)):
+        mutagens |= traits.mutagens[:, column].astype(np.uint64) << np.uint64(14 * column)
+    _, mutagen_codes = np.unique(mutagens, return_inverse=True)
+    key = (traits.ming.astype(np.uint64) << np.uint64(46)) | (traits.spouse.astype(np.uint64) << np.uint64(32))
+    key |= mutagen_codes.reshape(-1).astype(np.uint64)
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def _mask_scores(a: ChartTraits, b: ChartTraits, weights: dict[str, float]) -> np.ndarray:
+    """主星掩码相关特征（命宫共同主星、夫妻宫对命宫、四化入命宫与夫妻宫）的加权和"""
+    popcount = _POPCOUNT.astype(np.float32)
+    target_a, target_b = a.ming | a.spouse, b.ming | b.spouse
+    pairs = [
+        ("ming_shared", a.ming[:, None], b.ming[None, :]),
+        ("spouse_match", a.spouse[:, None], b.ming[None, :]),
+        ("spouse_match", a.ming[:, None], b.spouse[None, :]),
+    ]
+    for name, column in (("lu_in", 0), ("ke_in", 2), ("ji_in", 3)):
+        pairs += [
+            (name, a.mutagens[:, None, column], target_b[None, :]),
+            (name, target_a[:, None], b.mutagens[None, :, column]),
+        ]
+    scores = np.zeros((len(a), len(b)), dtype=np.float32)
+    for name, left, right in pairs:
+        if weights[name]:
+            scores += np.float32(weights[name]) * popcount[left & right]
+    return scores
+
+
+def compatibility_scores(
+    a: "ChartTraits | AstrolabeModel | Iterable[AstrolabeModel] | np.ndarray",
+    b: "ChartTraits | AstrolabeModel | Iterable[AstrolabeModel] | np.ndarray",
+    weights: dict[str, float] | None = None,
+) -> np.ndarray:
+    """
+    多对多合盘打分，结果与按 `pair_features` 加权求和相同
+
+    星盘对的得分拆成三部分：只取决于单张星盘的夫妻宫吉煞星数按星盘算好后广播相加；命宫地支与身宫查 144 × 144 的组合表；
+    主星掩码相关的特征只在两边的主星分类之间计算一次，再按类号查表。每对星盘只需两次查表和几次加法。
+
+    Args:
+        a: N 张星盘，可以是特征、星盘、星盘序列或位向量编码
+        b: M 张星盘，同上
+        weights: 特征权重【可选】，只需传入要覆盖的特征，默认见 `DEFAULT_WEIGHTS`
+
+    Returns:
+        形状为 (N, M) 的 float32 得分矩阵，越大越合
+    """
+    a, b = _as_traits(a), _as_traits(b)
+    weights = _weight_vector(weights)
+    table = _pair_table(weights)
+    (first_a, profile_a), (first_b, profile_b) = _profiles(a), _profiles(b)
+    mask_table = _mask_scores(a.take(first_a), b.take(first_b), weights)
+
+    def chart_terms(traits: ChartTraits) -> tuple[np.ndarray, np.ndarray]:
+        code = traits.soul_branch.astype(np.intp) * 12 + traits.body_palace
+        single = weights["lucky_spouse"] * traits.lucky_spouse + weights["unlucky_spouse"] * traits.unlucky_spouse
+        return code, single.astype(np.float32)
+
+    (code_a, single_a), (code_b, single_b) = chart_terms(a), chart_terms(b)
+    scores = np.empty((len(a), len(b)), dtype=np.float32)
+    step = max(_CHUNK_PAIRS // max(len(b), 1), 1)
+    for start in range(0, len(a), step):
+        rows = slice(start, start + step)
+        chunk = scores[rows]
+        np.take(table[code_a[rows]], code_b, axis=1, out=chunk)
+        chunk += np.take(mask_table[profile_a[rows]], profile_b, axis=1)
+        chunk += single_a[rows, None]
+        chunk += single_b[None, :]
+    return scores
+
+
+def top_compatible(
+    reference: "ChartTraits | AstrolabeModel | np.ndarray",
+    candidates: "ChartTraits | Iterable[AstrolabeModel] | np.ndarray",
+    k: int = 10,
+    weights: dict[str, float] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    一对多合盘：返回与参考盘得分最高的 k 张候选星盘
+
+    Args:
+        reference: 参考星盘、其位向量编码或单张星盘的特征
+        candidates: 候选星盘，可以是特征、星盘序列或位向量编码矩阵
+        k: 返回数量
+        weights: 特征权重【可选】
+
+    Returns:
+        (候选行号, 得分)，按得分从高到低排列，得分相同时按候选行号排列
+    """
+    scores = compatibility_scores(reference, candidates, weights)[0]
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    # 先取第 k 名的得分作为阈值，再在阈值内按 (得分, 行号) 排序，保证并列时结果稳定
+    threshold = np.partition(-scores, k - 1)[k - 1]
+    rows = np.flatnonzero(-scores <= threshold)
+    top = rows[np.lexsort((rows, -scores[rows]))][:k]
+    return top, scores[top]
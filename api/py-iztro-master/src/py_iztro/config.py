@@ -0,0 +1,86 @@
+"""
+排盘引擎配置
+
+iztro 的 `config`、`loadPlugins` 修改的是模块级的全局状态（`withOptions` 也只是先调用 `config` 再排盘），
+同一个 JS 模块在不同配置之间切换会互相影响，运限计算时也会读取当时的全局配置。因此每种配置使用一个独立的
+引擎上下文（单独执行一遍 iztro 脚本得到的模块实例），配置只在创建上下文时设置一次。
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class EngineConfig(BaseModel):
+    """
+    排盘引擎配置，字段均为空时与默认引擎相同
+    """
+
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
+
+    year_divide: Literal["normal", "exact"] | None = Field(
+        default=None, alias="yearDivide", title="年份分界，normal 为正月初一，exact 为立春"
+    )
+    horoscope_divide: Literal["normal", "exact"] | None = Field(
+        default=None, alias="horoscopeDivide", title="运限分界，normal 为正月初一，exact 为立春"
+    )
+    mutagens: dict[str, tuple[str, str, str, str]] = Field(
+        default_factory=dict, alias="mutagens", title="天干 -> 化禄、化权、化科、化忌 的星曜，覆盖默认四化"
+    )
+    brightness: dict[str, tuple[str, ...]] = Field(
+        default_factory=dict, alias="brightness", title="星曜 -> 按宫位索引排列的十二个亮度，覆盖默认亮度"
+    )
+    plugins: tuple[str, ...] = Field(
+        default=(), alias="plugins", title="插件的 JS 源码，每段求值为一个函数，按顺序传给 loadPlugins"
+    )
+
+    def key(self) -> tuple:
+        """
+        配置的规范化表示，可以作为字典键和缓存键的一部分；默认配置为空元组
+
+        Returns:
+            配置键
+        """
+        items = []
+        if self.year_divide is not None:
+            items.append(("yearDivide", self.year_divide))
+        if self.horoscope_divide is not None:
+            items.append(("horoscopeDivide", self.horoscope_divide))
+        if self.mutagens:
+            items.append(("mutagens", tuple(sorted(self.mutagens.items()))))
+        if self.brightness:
+            items.append(("brightness", tuple(sorted(self.brightness.items()))))
+        if self.plugins:
+            items.append(("plugins", self.plugins))
+        return tuple(items)
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    @property
+    def is_default(self) -> bool:
+        """
+        是否为默认配置
+        """
+        return not self.key()
+
+    def to_js(self) -> dict:
+        """
+        传给 iztro `config` 的参数，不包括插件
+
+        Returns:
+            配置字典
+        """
+        options = {}
+        if self.year_divide is not None:
+            options["yearDivide"] = self.year_divide
+        if self.horoscope_divide is not None:
+            options["horoscopeDivide"] = self.horoscope_divide
+        if self.mutagens:
+            options["mutagens"] = {stem: list(stars) for stem, stars in self.mutagens.items()}
+        if self.brightness:
+            options["brightness"] = {star: list(values) for star, values in self.brightness.items()}
+        return options
+
+
+DEFAULT_CONFIG = EngineConfig()
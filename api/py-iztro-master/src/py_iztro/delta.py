@@ -0,0 +1,96 @@
+"""
+运限序列的增量编码
+
+同一星盘按日、按时辰连续计算的运限中，大限、小限、流年往往不变，只有流日、流时变化。
+增量模式下第一个条目携带完整运限（`horoscope`），之后的条目只携带与上一个相比发生变化的字段（`delta`）：
+
+    {"horoscope": {"solarDate": "2024-1-1", "decadal": {...}, ..., "hourly": {...}}}
+    {"delta": {"solarDate": "2024-1-2", "daily": {...}, "hourly": {...}}}
+
+条目中的其他字段（如序号、目标时辰）原样保留，解码时忽略；带 `error` 的条目表示该位置计算失败，
+编码端在其后总是重新发送完整运限。
+"""
+
+from collections.abc import Iterable, Iterator
+
+from py_iztro.models import HoroscopeModel
+
+# 字段别名 -> 模型属性名
+_FIELDS = {field.alias or name: name for name, field in HoroscopeModel.model_fields.items()}
+
+
+def encode_horoscope_deltas(
+    horoscopes: Iterable[HoroscopeModel | dict],
+    keyframe_every: int = 0,
+) -> Iterator[dict]:
+    """
+    把运限序列编码为增量条目
+
+    Args:
+        horoscopes: 运限序列，`HoroscopeModel` 或按别名导出的字典
+        keyframe_every: 每隔多少个条目重新发送一次完整运限【默认 0，只有第一个】，便于中途加入的客户端同步
+
+    Returns:
+        增量条目迭代器
+    """
+    previous = None
+    for i, horoscope in enumerate(horoscopes):
+        data = horoscope.model_dump(by_alias=True) if isinstance(horoscope, HoroscopeModel) else horoscope
+        if previous is None or (keyframe_every > 0 and i % keyframe_every == 0):
+            yield {"horoscope": data}
+        else:
+            yield {"delta": {key: value for key, value in data.items() if previous.get(key) != value}}
+        previous = data
+
+
+class HoroscopeDeltaDecoder:
+    """
+    从增量条目重建完整的运限模型
+
+    未变化的字段直接复用上一个模型中已校验的对象，只校验发生变化的字段。
+    """
+
+    def __init__(self):
+        self.current: HoroscopeModel | None = None
+
+    def apply(self, item: dict) -> HoroscopeModel | None:
+        """
+        应用一个条目
+
+        Args:
+            item: 增量条目
+
+        Returns:
+            重建后的运限，`error` 条目返回 None
+        """
+        if "error" in item:
+            self.current = None
+            return None
+        if "horoscope" in item:
+            self.current = HoroscopeModel.model_validate(item["horoscope"])
+            return self.current
+        if self.current is None:
+            raise ValueError("增量条目之前缺少完整运限")
+
+        update = {}
+        for key, value in item["delta"].items():
+            name = _FIELDS[key]
+            annotation = HoroscopeModel.model_fields[name].annotation
+            update[name] = annotation.model_validate(value) if hasattr(annotation, "model_validate") else value
+        self.current = self.current.model_copy(update=update)
+        return self.current
+
+
+def decode_horoscope_deltas(items: Iterable[dict]) -> Iterator[HoroscopeModel | None]:
+    """
+    把增量条目序列还原为完整的运限序列
+
+    Args:
+        items: 增量条目，如逐行解析的 NDJSON 响应
+
+    Returns:
+        运限迭代器，`error` 条目对应 None
+    """
+    decoder = HoroscopeDeltaDecoder()
+    for item in items:
+        yield decoder.apply(item)
@@ -0,0 +1,143 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from py_iztro.bitset import word_count
+from py_iztro.models import AstrolabeModel
+
+# 编码使用 zh-CN 的星曜与宫位名称，星盘需以 zh-CN 排盘
+MAJOR_STARS = (
+    "紫微", "天机", "太阳", "武曲", "天同", "廉贞", "天府",
+    "太阴", "贪狼", "巨门", "天相", "天梁", "七杀", "破军",
+)  # fmt: skip
+MINOR_STARS = (
+    "左辅", "右弼", "文昌", "文曲", "天魁", "天钺", "禄存",
+    "天马", "擎羊", "陀罗", "火星", "铃星", "地空", "地劫",
+)  # fmt: skip
+MUTAGEN_STARS = (*MAJOR_STARS, "文昌", "文曲", "左辅", "右弼")
+MUTAGENS = ("禄", "权", "科", "忌")
+PALACE_NAMES = ("命宫", "兄弟", "夫妻", "子女", "财帛", "疾厄", "迁移", "仆役", "官禄", "田宅", "福德", "父母")
+
+# 特征分块：(块名称, 行标签, 列标签)，每块占 行数*列数 个比特
+FEATURE_BLOCKS = (
+    ("major", MAJOR_STARS, PALACE_NAMES),
+    ("minor", MINOR_STARS, PALACE_NAMES),
+    ("mutagen_star", MUTAGENS, MUTAGEN_STARS),
+    ("mutagen_palace", MUTAGENS, PALACE_NAMES),
+    ("soul_palace", ("命宫",), tuple(range(12))),
+    ("body_palace", ("身宫",), PALACE_NAMES),
+)
+
+
+def _block_offsets() -> dict[str, int]:
+    offsets, offset = {}, 0
+    for name, rows, cols in FEATURE_BLOCKS:
+        offsets[name] = offset
+        offset += len(rows) * len(cols)
+    offsets["_total"] = offset
+    return offsets
+
+
+BLOCK_OFFSETS = _block_offsets()
+FEATURE_BITS = BLOCK_OFFSETS["_total"]
+FEATURE_WORDS = word_count(FEATURE_BITS)
+
+_STAR_ROWS = {
+    "major": {star: i for i, star in enumerate(MAJOR_STARS)},
+    "minor": {star: i for i, star in enumerate(MINOR_STARS)},
+}
+_MUTAGEN_STAR_COLS = {star: i for i, star in enumerate(MUTAGEN_STARS)}
+_MUTAGEN_ROWS = {mutagen: i for i, mutagen in enumerate(MUTAGENS)}
+_PALACE_COLS = {name: i for i, name in enumerate(PALACE_NAMES)}
+_BLOCK_COLS = {name: len(cols) for name, _, cols in FEATURE_BLOCKS}
+
+
+def _bit(block: str, row: int, col: int) -> int:
+    return BLOCK_OFFSETS[block] + row * _BLOCK_COLS[block] + col
+
+
+def feature_bits(astrolabe: AstrolabeModel) -> list[int]:
+    """
+    计算星盘的特征比特位置
+
+    特征包括：主星落宫、辅星落宫、四化落在哪颗星、四化落在哪个宫、命宫所在宫位索引、身宫所在宫位名称
+
+    Args:
+        astrolabe: zh-CN 星盘
+
+    Returns:
+        取值为 1 的比特位置列表
+    """
+    bits = []
+    for palace in astrolabe.palaces:
+        col = _PALACE_COLS.get(palace.name)
+        if col is None:
+            continue
+        if palace.name == "命宫":
+            bits.append(_bit("soul_palace", 0, palace.index))
+        if palace.is_body_palace:
+            bits.append(_bit("body_palace", 0, col))
+        for star in (*palace.major_stars, *palace.minor_stars):
+            for block, rows in _STAR_ROWS.items():
+                if star.name in rows:
+                    bits.append(_bit(block, rows[star.name], col))
+            if star.mutagen in _MUTAGEN_ROWS and star.name in _MUTAGEN_STAR_COLS:
+                bits.append(_bit("mutagen_star", _MUTAGEN_ROWS[star.mutagen], _MUTAGEN_STAR_COLS[star.name]))
+                bits.append(_bit("mutagen_palace", _MUTAGEN_ROWS[star.mutagen], col))
+    return bits
+
+
+def encode(astrolabe: AstrolabeModel) -> np.ndarray:
+    """
+    将星盘编码为定长位向量
+
+    Args:
+        astrolabe: zh-CN 星盘
+
+    Returns:
+        形状为 (FEATURE_WORDS,) 的 uint64 位向量
+    """
+    bools = np.zeros(FEATURE_WORDS * 64, dtype=np.uint8)
+    bools[feature_bits(astrolabe)] = 1
+    return np.packbits(bools, bitorder="little").view(np.uint64)
+
+
+def encode_many(astrolabes: Iterable[AstrolabeModel]) -> np.ndarray:
+    """
+    批量编码星盘
+
+    Args:
+        astrolabes: zh-CN 星盘序列
+
+    Returns:
+        形状为 (星盘数量, FEATURE_WORDS) 的 uint64 矩阵
+    """
+    vectors = [encode(astrolabe) for astrolabe in astrolabes]
+    if not vectors:
+        return np.zeros((0, FEATURE_WORDS), dtype=np.uint64)
+    return np.stack(vectors)
+
+
+def unpack_features(vectors: np.ndarray) -> np.ndarray:
+    """
+    将位向量展开为 0/1 特征矩阵
+
+    Args:
+        vectors: 形状为 (..., FEATURE_WORDS) 的 uint64 位向量
+
+    Returns:
+        形状为 (..., FEATURE_BITS) 的 uint8 矩阵
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.uint64)
+    bits = np.unpackbits(vectors.view(np.uint8), axis=-1, bitorder="little")
+    return bits[..., :FEATURE_BITS]
+
+
+def feature_names() -> list[str]:
+    """
+    所有特征的可读名称，与比特位置一一对应，如 `major:紫微@命宫`
+    """
+    names = []
+    for block, rows, cols in FEATURE_BLOCKS:
+        names.extend(f"{block}:{row}@{col}" for row in rows for col in cols)
+    return names
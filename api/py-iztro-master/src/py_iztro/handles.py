@@ -0,0 +1,145 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class JsHandlePool:
+    """
+    iztro 星盘 JS 对象的句柄池
+
+    星盘模型不直接持有 JS 对象，而是通过键向句柄池借用；句柄池最多保留 `max_handles` 个 JS 对象，
+    超出时释放最久未使用的对象，被释放的星盘在下次计算运限时按出生信息重新创建（re-hydrate）。
+    每释放 `gc_every` 个 JS 对象触发一次 JS 垃圾回收。
+    """
+
+    def __init__(self, max_handles: int = 128, gc_every: int = 1000, collect: Callable[[], Any] | None = None):
+        """
+        Args:
+            max_handles: 最多保留的 JS 对象数量
+            gc_every: 每释放多少个 JS 对象触发一次垃圾回收，0 表示不主动回收
+            collect: 触发 JS 垃圾回收的函数【可选】，如 `pythonmonkey.collect`
+        """
+        if max_handles <= 0:
+            raise ValueError("max_handles 必须大于 0")
+        self.max_handles = max_handles
+        self.gc_every = gc_every
+        self._collect = collect
+        self._handles: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_release = 0
+        self.created = 0
+        self.rehydrated = 0
+        self.released = 0
+        self.gc_runs = 0
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def put(self, key: tuple, js_obj: Any):
+        """
+        登记新创建的 JS 对象
+        """
+        with self._lock:
+            self.created += 1
+            self._store(key, js_obj)
+        self._maybe_collect()
+
+    def get(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        借用 JS 对象，已被释放时调用 `factory` 重新创建
+
+        Args:
+            key: 句柄键
+            factory: 重新创建 JS 对象的函数
+
+        Returns:
+            JS 对象
+        """
+        with self._lock:
+            js_obj = self._handles.get(key)
+            if js_obj is not None:
+                self._handles.move_to_end(key)
+                return js_obj
+        js_obj = factory()
+        with self._lock:
+            self.rehydrated += 1
+            self._store(key, js_obj)
+        self._maybe_collect()
+        return js_obj
+
+    def _store(self, key: tuple, js_obj: Any):
+        self._handles[key] = js_obj
+        self._handles.move_to_end(key)
+        while len(self._handles) > self.max_handles:
+            self._handles.popitem(last=False)
+            self.released += 1
+            self._pending_release += 1
+
+    def _maybe_collect(self):
+        if self.gc_every > 0 and self._pending_release >= self.gc_every:
+            self.collect()
+
+    def discard(self, key: tuple):
+        """
+        立即释放指定的 JS 对象
+        """
+        with self._lock:
+            if self._handles.pop(key, None) is not None:
+                self.released += 1
+                self._pending_release += 1
+
+    def clear(self):
+        """
+        释放全部 JS 对象并触发垃圾回收
+        """
+        with self._lock:
+            self.released += len(self._handles)
+            self._handles.clear()
+        self.collect()
+
+    def collect(self):
+        """
+        触发 JS 垃圾回收
+        """
+        with self._lock:
+            self._pending_release = 0
+        if self._collect is not None:
+            self._collect()
+            with self._lock:
+                self.gc_runs += 1
+
+    def stats(self) -> dict:
+        """
+        句柄池统计信息
+        """
+        with self._lock:
+            return {
+                "live_handles": len(self._handles),
+                "max_handles": self.max_handles,
+                "created": self.created,
+                "rehydrated": self.rehydrated,
+                "released": self.released,
+                "gc_runs": self.gc_runs,
+            }
+
+
+def rss_bytes() -> int | None:
+    """
+    当前进程的常驻内存（RSS）字节数，无法获取时返回 None
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+
+        # 非 Linux 系统退回峰值 RSS，macOS 单位为字节，其他为 KB
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
@@ -0,0 +1,396 @@
+"""
+运限的四化与流耀查表
+
+运限各层（大限、流年、流月、流日、流时）的四化只由该层天干决定，流耀只由该层天干、地支决定，
+流年的将前、岁前十二神只由流年地支决定，都与本命盘无关。这里的表与 iztro 2.4.4 的 zh-CN 输出逐项核对过，
+按 (层, 宫位索引, 天干, 地支) 即可不经过引擎得到与 `AstrolabeModel.horoscope()` 相同的运限对象。
+各层的宫位索引与干支由本命盘和目标日期决定，`HoroscopeTimeline` 按 iztro 2.4.4 的算法计算（流月按交节时刻分界）。
+"""
+
+from datetime import date, datetime
+from functools import cache
+
+from py_iztro.lunar import solar_to_lunar
+from py_iztro.models import (
+    AstrolabeModel,
+    HoroscopeItemAgeModel,
+    HoroscopeItemModel,
+    HoroscopeItemYearlyModel,
+    StarModel,
+)
+from py_iztro.solar_terms import jie_month_ordinal, lichun_year
+
+HEAVENLY_STEMS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
+EARTHLY_BRANCHES = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
+HOROSCOPE_SCOPES = ("decadal", "yearly", "monthly", "daily", "hourly")
+
+# 天干四化，依次为化禄、化权、化科、化忌的星曜
+MUTAGENS_BY_STEM: dict[str, tuple[str, str, str, str]] = {
+    "甲": ("廉贞", "破军", "武曲", "太阳"),
+    "乙": ("天机", "天梁", "紫微", "太阴"),
+    "丙": ("天同", "天机", "文昌", "廉贞"),
+    "丁": ("太阴", "天同", "天机", "巨门"),
+    "戊": ("贪狼", "太阴", "右弼", "天机"),
+    "己": ("武曲", "贪狼", "天梁", "文曲"),
+    "庚": ("太阳", "武曲", "太阴", "天同"),
+    "辛": ("巨门", "太阳", "文曲", "文昌"),
+    "壬": ("天梁", "紫微", "左辅", "武曲"),
+    "癸": ("破军", "巨门", "太阴", "贪狼"),
+}
+
+# 运限十二宫名称，运限命宫所在宫位为第 0 个，按宫位索引递增依次排列
+HOROSCOPE_PALACE_NAMES = (
+    "命宫", "父母", "福德", "田宅", "官禄", "仆役", "迁移", "疾厄", "财帛", "子女", "夫妻", "兄弟"
+)  # fmt: skip
+
+# 各层流耀的名称，依次为 魁、钺、昌、曲、禄、羊、陀、马、鸾、喜
+# iztro 2.4.4 没有流月、流日、流时星曜的中文名称，原样输出
+HOROSCOPE_STAR_NAMES: dict[str, tuple[str, ...]] = {
+    "decadal": ("运魁", "运钺", "运昌", "运曲", "运禄", "运羊", "运陀", "运马", "运鸾", "运喜"),
+    "yearly": ("流魁", "流钺", "流昌", "流曲", "流禄", "流羊", "流陀", "流马", "流鸾", "流喜"),
+    "monthly": ("yuekui", "yueyue", "yuechang", "yuequ", "yuelu", "yueyang", "yuetuo", "yuema", "yueluan", "yuexi"),
+    "daily": ("rikui", "riyue", "richang", "riqu", "rilu", "riyang", "rituo", "rima", "riluan", "rixi"),
+    "hourly": ("shikui", "shiyue", "shichang", "shiqu", "shilu", "shiyang", "shituo", "shima", "shiluan", "shixi"),
+}
+_STAR_TYPES = ("soft", "soft", "soft", "soft", "lucun", "tough", "tough", "tianma", "flower", "flower")
+
+# 天干 -> 魁、钺、昌、曲、禄、羊、陀 的宫位索引
+_STEM_STAR_INDEXES: dict[str, tuple[int, ...]] = {
+    "甲": (11, 5, 3, 7, 0, 1, 11),
+    "乙": (10, 6, 4, 6, 1, 2, 0),
+    "丙": (9, 7, 6, 4, 3, 4, 2),
+    "丁": (9, 7, 7, 3, 4, 5, 3),
+    "戊": (11, 5, 6, 4, 3, 4, 2),
+    "己": (10, 6, 7, 3, 4, 5, 3),
+    "庚": (11, 5, 9, 1, 6, 7, 5),
+    "辛": (4, 0, 10, 0, 7, 8, 6),
+    "壬": (1, 3, 0, 10, 9, 10, 8),
+    "癸": (1, 3, 1, 9, 10, 11, 9),
+}
+# 地支 -> 马、鸾、喜、年解 的宫位索引，年解只出现在流年
+_BRANCH_STAR_INDEXES: dict[str, tuple[int, ...]] = {
+    "子": (0, 1, 7, 8),
+    "丑": (9, 0, 6, 7),
+    "寅": (6, 11, 5, 6),
+    "卯": (3, 10, 4, 5),
+    "辰": (0, 9, 3, 4),
+    "巳": (9, 8, 2, 3),
+    "午": (6, 7, 1, 2),
+    "未": (3, 6, 0, 1),
+    "申": (0, 5, 11, 0),
+    "酉": (9, 4, 10, 11),
+    "戌": (6, 3, 9, 10),
+    "亥": (3, 2, 8, 9),
+}
+
+# 岁前十二神，岁建在流年地支所在宫位
+SUIQIAN12 = ("岁建", "晦气", "丧门", "贯索", "官符", "小耗", "大耗", "龙德", "白虎", "天德", "吊客", "病符")
+# 将前十二神，将星在流年地支三合局的帝旺位
+JIANGQIAN12 = ("将星", "攀鞍", "岁驿", "息神", "华盖", "劫煞", "灾煞", "天煞", "指背", "咸池", "月煞", "亡神")
+_JIANGQIAN_START = {
+    "寅": 4, "午": 4, "戌": 4, "申": 10, "子": 10, "辰": 10, "巳": 7, "酉": 7, "丑": 7, "亥": 1, "卯": 1, "未": 1
+}  # fmt: skip
+
+# 各层运限的名称
+HOROSCOPE_ITEM_NAMES = {
+    "decadal": "大限",
+    "childhood": "童限",
+    "age": "小限",
+    "yearly": "流年",
+    "monthly": "流月",
+    "daily": "流日",
+    "hourly": "流时",
+}
+
+# 童限：虚岁小于第一个大限的起始年龄时，虚岁 1~6 依次以这些宫位为大限
+CHILDHOOD_PALACES = ("命宫", "财帛", "疾厄", "夫妻", "福德", "官禄")
+
+# 目标日期不晚于出生当天（虚岁不大于 0）时 iztro 输出的大限、小限干支占位值
+_PLACEHOLDERS = {"jia": "甲", "zi": "子"}
+# 节月序号与月干支的偏移：1900年小寒至立春为丁丑月
+_MONTH_GANZHI_OFFSET = 13
+# 公历序数日与日干支的偏移：date(2000, 8, 16) 为丙午日
+_DAY_GANZHI_OFFSET = (42 - date(2000, 8, 16).toordinal()) % 60
+
+
+def branch_palace_index(earthly_branch: str) -> int:
+    """
+    地支所在的宫位索引，宫位从寅宫起排
+    """
+    return (EARTHLY_BRANCHES.index(earthly_branch) - 2) % 12
+
+
+def yearly_stem_branch(year: int) -> tuple[str, str]:
+    """
+    流年的天干地支
+
+    iztro 的运限按立春分界，立春（公历 2 月 3~5 日）之前的日期属于上一年的流年，与农历正月初一无关
+
+    Args:
+        year: 按立春分界的年份
+
+    Returns:
+        (天干, 地支)
+    """
+    return HEAVENLY_STEMS[(year - 4) % 10], EARTHLY_BRANCHES[(year - 4) % 12]
+
+
+def _parse_date(date_str: str) -> date:
+    try:
+        year, month, day = (int(part) for part in date_str.strip().split(" ")[0].split("-")[:3])
+        return date(year, month, day)
+    except ValueError as e:
+        raise ValueError(f"阳历日期格式错误: {date_str}") from e
+
+
+def horoscope_stem_branches(target_date: str, time_index: int = 0) -> dict[str, tuple[str, str]]:
+    """
+    流年、流月、流日、流时的天干地支，与 iztro 2.4.4 默认配置（`horoscope_divide` 为 `exact`）一致
+
+    iztro 取时辰的中点（如寅时为 03:30，早子时为 00:30，晚子时为 23:30）计算干支：
+    流年按立春所在的日期分界，流月按交节时刻分界，晚子时的流日为次日，流时的天干由流日天干按五鼠遁得到。
+
+    Args:
+        target_date: 阳历日期【YYYY-M-D】
+        time_index: 时辰序号【0~12】
+
+    Returns:
+        层 -> (天干, 地支)，层为 yearly、monthly、daily、hourly
+    """
+    solar = _parse_date(target_date)
+    hour = max(2 * time_index - 1, 0)
+    month = (jie_month_ordinal(datetime(solar.year, solar.month, solar.day, hour, 30)) + _MONTH_GANZHI_OFFSET) % 60
+    day = (solar.toordinal() + (time_index == 12) + _DAY_GANZHI_OFFSET) % 60
+    branch = time_index % 12
+    stem = (day % 10 % 5 * 2 + branch) % 10
+    return {
+        "yearly": yearly_stem_branch(lichun_year(solar)),
+        "monthly": (HEAVENLY_STEMS[month % 10], EARTHLY_BRANCHES[month % 12]),
+        "daily": (HEAVENLY_STEMS[day % 10], EARTHLY_BRANCHES[day % 12]),
+        "hourly": (HEAVENLY_STEMS[stem], EARTHLY_BRANCHES[branch]),
+    }
+
+
+def horoscope_palace_names(index: int) -> list[str]:
+    """
+    运限命宫在 `index` 宫位时的运限十二宫名称
+
+    Args:
+        index: 运限命宫所在的宫位索引
+
+    Returns:
+        按宫位索引排列的十二宫名称
+    """
+    return [HOROSCOPE_PALACE_NAMES[(i - index) % 12] for i in range(12)]
+
+
+@cache
+def _star_layout(heavenly_stem: str, earthly_branch: str, scope: str) -> tuple[tuple[tuple[str, str], ...], ...]:
+    layout: list[list[tuple[str, str]]] = [[] for _ in range(12)]
+    ma, luan, xi, nianjie = _BRANCH_STAR_INDEXES[earthly_branch]
+    if scope == "yearly":
+        layout[nianjie].append(("年解", "helper"))
+    indexes = (*_STEM_STAR_INDEXES[heavenly_stem], ma, luan, xi)
+    for index, name, star_type in zip(indexes, HOROSCOPE_STAR_NAMES[scope], _STAR_TYPES, strict=True):
+        layout[index].append((name, star_type))
+    return tuple(tuple(stars) for stars in layout)
+
+
+def horoscope_stars(heavenly_stem: str, earthly_branch: str, scope: str) -> list[list[StarModel]]:
+    """
+    运限流耀
+
+    Args:
+        heavenly_stem: 该层天干
+        earthly_branch: 该层地支
+        scope: 层【decadal|yearly|monthly|daily|hourly】
+
+    Returns:
+        按宫位索引排列的流耀
+    """
+    return [
+        [StarModel(name=name, type=star_type, scope=scope) for name, star_type in stars]
+        for stars in _star_layout(heavenly_stem, earthly_branch, scope)
+    ]
+
+
+def horoscope_mutagens(heavenly_stem: str) -> list[str]:
+    """
+    天干四化，依次为化禄、化权、化科、化忌的星曜
+    """
+    return list(MUTAGENS_BY_STEM[heavenly_stem])
+
+
+def yearly_dec_star(earthly_branch: str) -> HoroscopeItemYearlyModel.YearlyDecStarModel:
+    """
+    流年将前、岁前十二神
+
+    Args:
+        earthly_branch: 流年地支
+
+    Returns:
+        按宫位索引排列的将前十二神与岁前十二神
+    """
+    suiqian_start = branch_palace_index(earthly_branch)
+    jiangqian_start = _JIANGQIAN_START[earthly_branch]
+    return HoroscopeItemYearlyModel.YearlyDecStarModel(
+        jiangqian12=[JIANGQIAN12[(i - jiangqian_start) % 12] for i in range(12)],
+        suiqian12=[SUIQIAN12[(i - suiqian_start) % 12] for i in range(12)],
+    )
+
+
+def horoscope_item(
+    layer: str,
+    index: int,
+    heavenly_stem: str,
+    earthly_branch: str,
+    nominal_age: int | None = None,
+    childhood: bool = False,
+) -> HoroscopeItemModel:
+    """
+    不经过引擎构建一层运限，四化、流耀、运限十二宫、流年十二神均查表得到
+
+    各层的宫位索引与干支可由 `HoroscopeTimeline.layers` 得到。
+
+    Args:
+        layer: 层【decadal|age|yearly|monthly|daily|hourly】
+        index: 该层命宫所在的宫位索引
+        heavenly_stem: 该层天干
+        earthly_branch: 该层地支
+        nominal_age: 虚岁，小限必填
+        childhood: 大限是否为童限
+
+    Returns:
+        运限对象，小限为 `HoroscopeItemAgeModel`，流年为 `HoroscopeItemYearlyModel`
+    """
+    data = {
+        "index": index,
+        "name": HOROSCOPE_ITEM_NAMES["childhood" if childhood else layer],
+        "heavenlyStem": heavenly_stem,
+        "earthlyBranch": earthly_branch,
+        "palaceNames": horoscope_palace_names(index),
+        "mutagen": horoscope_mutagens(heavenly_stem),
+    }
+    if layer == "age":
+        # 小限没有流耀
+        return HoroscopeItemAgeModel(**data, stars=[], nominalAge=nominal_age)
+    data["stars"] = horoscope_stars(heavenly_stem, earthly_branch, layer)
+    if layer == "yearly":
+        return HoroscopeItemYearlyModel(**data, yearlyDecStar=yearly_dec_star(earthly_branch))
+    return HoroscopeItemModel(**data)
+
+
+class HoroscopeTimeline:
+    """
+    不经过引擎的运限时间线
+
+    按 iztro 2.4.4 的算法由本命盘和目标日期得到各层的宫位索引与干支，再用 `horoscope_item` 查表构建运限对象，
+    结果与 `AstrolabeModel.horoscope()`（zh-CN、默认配置）逐层相同：
+
+    - 大限、小限：虚岁所在的大限宫、小限宫，虚岁的算法见 `nominal_age`
+    - 流年：流年地支所在的宫位
+    - 流月：流年宫位 - 本命生月地支 + 本命生时地支 + 流月地支（地支均按寅宫起排的宫位计，生时地支按子起计）
+    - 流日：流月宫位 + 目标日期的农历日 - 1
+    - 流时：流日宫位 + 流时地支（按子起计）
+    """
+
+    def __init__(self, astrolabe: AstrolabeModel):
+        """
+        Args:
+            astrolabe: zh-CN 本命盘
+        """
+        _, month, _, hour = astrolabe.chinese_date.split(" ")
+        # 流月宫位中只与本命盘有关的部分
+        self._month_offset = EARTHLY_BRANCHES.index(hour[1]) - branch_palace_index(month[1])
+        self.birth_lunar = solar_to_lunar(astrolabe.solar_date)[:3]
+        self.palaces = astrolabe.palaces
+
+    def nominal_age(self, target_date: str) -> int:
+        """
+        目标日期的虚岁，与 iztro 2.4.4 的算法一致：农历年份差，目标农历月份大于出生月份，
+        或者同年同月且日期在出生日之后时再加 1
+
+        Args:
+            target_date: 阳历日期【YYYY-M-D】
+
+        Returns:
+            虚岁
+        """
+        year, month, day, _ = solar_to_lunar(target_date)
+        birth_year, birth_month, birth_day = self.birth_lunar
+        later = (year == birth_year and month == birth_month and day > birth_day) or month > birth_month
+        return year - birth_year + later
+
+    def _decadal(self, age: int) -> tuple[tuple[int, str, str], bool]:
+        """
+        虚岁所在的大限
+
+        Returns:
+            ((宫位索引, 天干, 地支), 是否童限)
+        """
+        for palace in self.palaces:
+            if palace.decadal.range[0] <= age <= palace.decadal.range[1]:
+                return (palace.index, palace.decadal.heavenly_stem, palace.decadal.earthly_branch), False
+        if 1 <= age <= len(CHILDHOOD_PALACES):
+            for palace in self.palaces:
+                if palace.name == CHILDHOOD_PALACES[age - 1]:
+                    return (palace.index, palace.heavenly_stem, palace.earthly_branch), True
+        # iztro 的占位值，大限地支经过翻译而天干没有
+        return (-1, "jia", "子"), False
+
+    def layers(self, target_date: str, time_index: int = 0) -> dict[str, tuple[int, str, str]]:
+        """
+        各层运限命宫的宫位索引与干支
+
+        目标日期不晚于出生当天时虚岁不大于 0，没有对应的大限、小限，宫位索引为 -1，干支与 iztro 一样为未翻译的占位值
+
+        Args:
+            target_date: 阳历日期【YYYY-M-D】
+            time_index: 时辰序号【0~12】
+
+        Returns:
+            层 -> (宫位索引, 天干, 地支)，层依次为 decadal、age、yearly、monthly、daily、hourly
+        """
+        age = self.nominal_age(target_date)
+        small = next((p for p in self.palaces if age in p.ages), None)
+
+        stem_branches = horoscope_stem_branches(target_date, time_index)
+        yearly = branch_palace_index(stem_branches["yearly"][1])
+        monthly = (yearly + self._month_offset + branch_palace_index(stem_branches["monthly"][1])) % 12
+        daily = (monthly + solar_to_lunar(target_date)[2] - 1) % 12
+        hourly = (daily + EARTHLY_BRANCHES.index(stem_branches["hourly"][1])) % 12
+        return {
+            "decadal": self._decadal(age)[0],
+            "age": (small.index, small.heavenly_stem, small.earthly_branch) if small else (-1, "jia", "zi"),
+            "yearly": (yearly, *stem_branches["yearly"]),
+            "monthly": (monthly, *stem_branches["monthly"]),
+            "daily": (daily, *stem_branches["daily"]),
+            "hourly": (hourly, *stem_branches["hourly"]),
+        }
+
+    def horoscope(self, target_date: str, time_index: int = 0) -> dict[str, HoroscopeItemModel]:
+        """
+        各层运限对象，与 `AstrolabeModel.horoscope(target_date, time_index)` 的同名字段相同
+
+        Args:
+            target_date: 阳历日期【YYYY-M-D】
+            time_index: 时辰序号【0~12】
+
+        Returns:
+            层 -> 运限对象，层依次为 decadal、age、yearly、monthly、daily、hourly
+        """
+        age = self.nominal_age(target_date)
+        childhood = self._decadal(age)[1]
+        items = {}
+        for layer, (index, stem, branch) in self.layers(target_date, time_index).items():
+            # 占位值按甲子查四化与流耀，输出中保留占位值
+            item = horoscope_item(
+                layer,
+                index,
+                _PLACEHOLDERS.get(stem, stem),
+                _PLACEHOLDERS.get(branch, branch),
+                nominal_age=age,
+                childhood=layer == "decadal" and childhood,
+            )
+            items[layer] = item.model_copy(update={"heavenly_stem": stem, "earthly_branch": branch})
+        return items
@@ -0,0 +1,147 @@
+from bisect import bisect_right
+from collections.abc import Iterator
+from datetime import date, timedelta
+
+# 农历每年的月份信息，自农历1899年起逐年排列
+# 低4位为闰月月份（0表示无闰月），第4~15位依次表示十二月至正月是否为大月（30天），第16位表示闰月是否为大月
+# iztro 本身不带农历表（2.4.4 通过 lunar-javascript 换算），此表已与 iztro 2.4.4 的 `byLunar` 核对：
+# 1900~2100年每个农历月的首日与末日换算出的阳历日期均相同（如2057年八月小、九月大）。
+# 唯一的差别是闰月三十：iztro 按同名的非闰月校验日数，闰月为大月而该月为小月时（如2017年闰六月）
+# 报错 "only 29 days"，这里按闰月本身的天数换算
+# fmt: off
+LUNAR_INFO = (
+    0x0ab50, 0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950, 0x16554, 0x056a0, 0x09ad0,
+    0x055d2, 0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540, 0x0d6a0, 0x0ada2, 0x095b0,
+    0x14977, 0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54, 0x02b60, 0x09570, 0x052f2,
+    0x04970, 0x06566, 0x0d4a0, 0x0ea50, 0x16a95, 0x05ad0, 0x02b60, 0x186e3, 0x092e0, 0x1c8d7,
+    0x0c950, 0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0, 0x092d0, 0x0d2b2, 0x0a950,
+    0x0b557, 0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5b0, 0x14573, 0x052b0, 0x0a9a8, 0x0e950,
+    0x06aa0, 0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260, 0x0f263, 0x0d950, 0x05b57,
+    0x056a0, 0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250, 0x0d558, 0x0b540, 0x0b6a0,
+    0x195a6, 0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50, 0x06d40, 0x0af46, 0x0ab60,
+    0x09570, 0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58, 0x05ac0, 0x0ab60, 0x096d5,
+    0x092e0, 0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0, 0x0abb7, 0x025d0, 0x092d0,
+    0x0cab5, 0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0, 0x0a5b0, 0x15176, 0x052b0,
+    0x0a930, 0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65,
+    0x0d530, 0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520,
+    0x0dd45, 0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0, 0x0aa50, 0x1b255, 0x06d20,
+    0x0ada0, 0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6, 0x0ea50, 0x06aa0, 0x1a6c4,
+    0x0aae0, 0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50, 0x05d55, 0x056a0, 0x0a6d0,
+    0x055d4, 0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0,
+    0x052b0, 0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55, 0x04b60, 0x0a570, 0x054e4,
+    0x0d160, 0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150,
+    0x0f252, 0x0d520,
+)
+# fmt: on
+LUNAR_MIN_YEAR = 1899
+LUNAR_MAX_YEAR = LUNAR_MIN_YEAR + len(LUNAR_INFO) - 1
+# 农历1899年正月初一对应的阳历日期
+LUNAR_BASE_DATE = date(1899, 2, 10)
+
+
+def _month_lengths(year: int) -> list[tuple[int, bool, int]]:
+    """
+    某个农历年按顺序排列的所有月份
+
+    Returns:
+        [(月份, 是否闰月, 天数), ...]
+    """
+    info = LUNAR_INFO[year - LUNAR_MIN_YEAR]
+    leap_month = info & 0xF
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == leap_month:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return months
+
+
+def _build_new_year_dates() -> list[date]:
+    dates, current = [], LUNAR_BASE_DATE
+    for year in range(LUNAR_MIN_YEAR, LUNAR_MAX_YEAR + 1):
+        dates.append(current)
+        current += timedelta(days=sum(days for _, _, days in _month_lengths(year)))
+    return dates
+
+
+_NEW_YEAR_DATES = _build_new_year_dates()
+
+
+def iter_lunar_months() -> Iterator[tuple[date, int, int, bool, int]]:
+    """
+    按顺序遍历农历表范围内的所有月份
+
+    Returns:
+        (该月初一的阳历日期, 农历年, 农历月, 是否闰月, 天数) 的迭代器
+    """
+    for year, new_year in zip(range(LUNAR_MIN_YEAR, LUNAR_MAX_YEAR + 1), _NEW_YEAR_DATES, strict=True):
+        first_day = new_year
+        for month, leap, days in _month_lengths(year):
+            yield first_day, year, month, leap, days
+            first_day += timedelta(days=days)
+
+
+def get_leap_month(year: int) -> int:
+    """
+    获取农历年的闰月月份，没有闰月时返回 0
+    """
+    return LUNAR_INFO[year - LUNAR_MIN_YEAR] & 0xF
+
+
+def lunar_to_solar(lunar_date_str: str, is_leap_month: bool = False) -> str:
+    """
+    农历日期转阳历日期，与 iztro 的 `lunar2solar` 行为一致；闰月三十在 iztro 中可能报错，这里按闰月的实际天数换算
+
+    Args:
+        lunar_date_str: 农历日期【YYYY-M-D】
+        is_leap_month: 是否闰月，当年该月不是闰月时忽略此参数
+
+    Returns:
+        阳历日期【YYYY-M-D】
+    """
+    try:
+        year, month, day = (int(part) for part in lunar_date_str.strip().split(" ")[0].split("-")[:3])
+    except ValueError as e:
+        raise ValueError(f"农历日期格式错误: {lunar_date_str}") from e
+    if not LUNAR_MIN_YEAR <= year <= LUNAR_MAX_YEAR:
+        raise ValueError(f"农历年份超出范围({LUNAR_MIN_YEAR}-{LUNAR_MAX_YEAR}): {year}")
+    if not 1 <= month <= 12:
+        raise ValueError(f"农历月份错误: {year}年{month}月")
+
+    is_leap_month = is_leap_month and get_leap_month(year) == month
+    offset = 0
+    for m, leap, days in _month_lengths(year):
+        if m == month and leap == is_leap_month:
+            if not 1 <= day <= days:
+                raise ValueError(f"农历{year}年{'闰' if leap else ''}{month}月只有{days}天")
+            solar = _NEW_YEAR_DATES[year - LUNAR_MIN_YEAR] + timedelta(days=offset + day - 1)
+            return f"{solar.year}-{solar.month}-{solar.day}"
+        offset += days
+    raise ValueError(f"农历月份错误: {year}年{month}月")
+
+
+def solar_to_lunar(solar_date_str: str) -> tuple[int, int, int, bool]:
+    """
+    阳历日期转农历日期，与 iztro 的 `solar2lunar` 行为一致
+
+    Args:
+        solar_date_str: 阳历日期【YYYY-M-D】
+
+    Returns:
+        (农历年, 农历月, 农历日, 是否闰月)
+    """
+    try:
+        year, month, day = (int(part) for part in solar_date_str.strip().split(" ")[0].split("-")[:3])
+        solar = date(year, month, day)
+    except ValueError as e:
+        raise ValueError(f"阳历日期格式错误: {solar_date_str}") from e
+
+    lunar_year = LUNAR_MIN_YEAR + bisect_right(_NEW_YEAR_DATES, solar) - 1
+    if lunar_year < LUNAR_MIN_YEAR:
+        raise ValueError(f"阳历日期超出农历表范围: {solar_date_str}")
+    offset = (solar - _NEW_YEAR_DATES[lunar_year - LUNAR_MIN_YEAR]).days
+    for m, leap, days in _month_lengths(lunar_year):
+        if offset < days:
+            return lunar_year, m, offset + 1, leap
+        offset -= days
+    raise ValueError(f"阳历日期超出农历表范围: {solar_date_str}")
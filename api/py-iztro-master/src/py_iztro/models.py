@@ -7,6 +7,11 @@ GenderType = Literal["男", "女"]
 LangueType = Literal["en-US", "ja-JP", "ko-KR", "zh-CN", "zh-TW", "vi-VN"]
 StarType = Literal["major", "soft", "tough", "adjective", "flower", "helper", "lucun", "tianma"]
 
+# 三方四正宫位索引表，第 i 行依次为 本宫、对宫、三方位（财帛位）、三方位（官禄位）的宫位索引
+SURROUNDED_PALACE_INDEXES: tuple[tuple[int, int, int, int], ...] = tuple(
+    (i, (i + 6) % 12, (i + 8) % 12, (i + 4) % 12) for i in range(12)
+)
+
 
 class StarModel(BaseModel):
     """
@@ -154,7 +159,53 @@ class AstrolabeModel(BaseModel):
     five_elements_class: str = Field(alias="fiveElementsClass", title="五行局")
     palaces: list[PalaceModel] = Field(alias="palaces", title="十二宫数据")
 
-    _js_astro_obj: Any = PrivateAttr()
+    _js_astro_obj: Any = PrivateAttr(default=None)
+    # 句柄池借用信息：(句柄池, 句柄键, 重新创建 JS 对象的函数)
+    _js_handle: Any = PrivateAttr(default=None)
+
+    @property
+    def attached(self) -> bool:
+        """
+        是否可以计算运限（直接持有 JS 对象，或可以从句柄池借用）
+        """
+        return self._js_astro_obj is not None or self._js_handle is not None
+
+    def detach(self) -> "AstrolabeModel":
+        """
+        释放对 JS 对象的引用，之后不能再计算运限，用于长期保存或跨进程传递星盘
+
+        Returns:
+            星盘自身
+        """
+        self._js_astro_obj = None
+        self._js_handle = None
+        return self
+
+    def bind_handle(self, pool: Any, key: tuple, factory: Any) -> "AstrolabeModel":
+        """
+        改为从句柄池借用 JS 对象，不再直接持有
+
+        Args:
+            pool: 句柄池 `JsHandlePool`
+            key: 句柄键
+            factory: JS 对象被释放后重新创建它的函数
+
+        Returns:
+            星盘自身
+        """
+        if self._js_astro_obj is not None:
+            pool.put(key, self._js_astro_obj)
+        self._js_astro_obj = None
+        self._js_handle = (pool, key, factory)
+        return self
+
+    def _get_js_astro_obj(self) -> Any:
+        if self._js_astro_obj is not None:
+            return self._js_astro_obj
+        if self._js_handle is not None:
+            pool, key, factory = self._js_handle
+            return pool.get(key, factory)
+        raise RuntimeError("星盘已释放 JS 对象，无法计算运限，请通过 Astro 重新排盘")
 
     def horoscope(self, date: str | None = None, time_index: TimeIndexType | None = None):
         """
@@ -167,7 +218,7 @@ class AstrolabeModel(BaseModel):
         Returns:
 
         """
-        result = self._js_astro_obj.horoscope(date, time_index)
+        result = self._get_js_astro_obj().horoscope(date, time_index)
 
         def _get_horoscope_item_dict(_data: dict) -> dict:
             _new_data = dict(
@@ -194,6 +245,65 @@ class AstrolabeModel(BaseModel):
             hourly=HoroscopeItemModel(**_get_horoscope_item_dict(result.hourly)),
         )
 
+    def palace(self, index_or_name: int | str) -> PalaceModel:
+        """
+        获取宫位
+
+        Args:
+            index_or_name: 宫位索引【0~11】或宫位名称，名称为`来因`、`身宫`时分别返回来因宫、身宫
+
+        Returns:
+            宫位数据
+        """
+        if isinstance(index_or_name, int):
+            if not 0 <= index_or_name < len(self.palaces):
+                raise ValueError(f"宫位索引超出范围: {index_or_name}")
+            return self.palaces[index_or_name]
+
+        for palace in self.palaces:
+            if (
+                palace.name == index_or_name
+                or (index_or_name == "来因" and palace.is_original_palace)
+                or (index_or_name == "身宫" and palace.is_body_palace)
+            ):
+                return palace
+        raise ValueError(f"未找到宫位: {index_or_name}")
+
+    def surrounded_palaces(self, index_or_name: int | str) -> SurroundedPalacesModel:
+        """
+        获取三方四正宫位，直接在已排好的十二宫上查表，不调用排盘引擎
+
+        Args:
+            index_or_name: 宫位索引【0~11】或宫位名称
+
+        Returns:
+            三方四正宫位
+        """
+        target, opposite, wealth, career = SURROUNDED_PALACE_INDEXES[self.palace(index_or_name).index]
+        return SurroundedPalacesModel(
+            target=self.palaces[target],
+            opposite=self.palaces[opposite],
+            wealth=self.palaces[wealth],
+            career=self.palaces[career],
+        )
+
+    def all_surrounded_palaces(self) -> list[SurroundedPalacesModel]:
+        """
+        一次性获取十二宫各自的三方四正，列表第 i 项对应宫位索引 i
+
+        Returns:
+            三方四正宫位列表
+        """
+        return [
+            SurroundedPalacesModel(
+                target=self.palaces[target],
+                opposite=self.palaces[opposite],
+                wealth=self.palaces[wealth],
+                career=self.palaces[career],
+            )
+            for target, opposite, wealth, career in SURROUNDED_PALACE_INDEXES
+        ]
+
     @classmethod
     def from_js_astro_obj(cls, js_astro_obj: Any) -> "AstrolabeModel":
         astro = cls(**js_astro_obj)
@@ -0,0 +1,207 @@
+import json
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from py_iztro.bitset import pack_ids, popcount, unpack_ids, word_count
+from py_iztro.models import AstrolabeModel, LangueType
+from py_iztro.space import NatalInput, NatalInputSpace
+
+FACETS = ("palace", "branch", "brightness", "mutagen")
+
+IndexKey = tuple[str, str, str]
+
+
+class StarCondition(NamedTuple):
+    """
+    反查条件：某颗星曜的落宫、亮度、四化，未指定的字段不参与过滤
+    """
+
+    star: str
+    palace: str | None = None
+    branch: str | None = None
+    brightness: str | None = None
+    mutagen: str | None = None
+
+
+def iter_index_keys(astrolabe: AstrolabeModel) -> Iterable[IndexKey]:
+    """
+    提取一张星盘的所有索引键
+
+    每颗星曜产生 (星曜, 维度, 取值) 形式的键，维度为 宫位名称、宫位地支、亮度、四化，
+    没有亮度或四化的星曜不产生对应维度的键。
+
+    Args:
+        astrolabe: 星盘
+
+    Returns:
+        索引键迭代器
+    """
+    for palace in astrolabe.palaces:
+        for star in (*palace.major_stars, *palace.minor_stars, *palace.adjective_stars):
+            yield star.name, "palace", palace.name
+            yield star.name, "branch", palace.earthly_branch
+            if star.brightness:
+                yield star.name, "brightness", star.brightness
+            if star.mutagen:
+                yield star.name, "mutagen", star.mutagen
+
+
+class ReverseIndex:
+    """
+    星曜落宫倒排索引
+
+    对一个出生信息空间离线排盘，把 (星曜, 宫位名称|宫位地支|亮度|四化) 映射到输入ID位图，
+    查询时只需对位图按位与，即可找出满足条件的全部出生信息。
+    """
+
+    def __init__(self, space: NatalInputSpace, keys: list[IndexKey], bitmaps: np.ndarray, language: LangueType):
+        """
+        Args:
+            space: 出生信息输入空间
+            keys: 索引键列表，与 bitmaps 的行一一对应
+            bitmaps: uint64 位图矩阵，形状为 (键数量, 位图字数)
+            language: 建索引时使用的输出语言，查询时的星曜、宫位名称需使用同一语言
+        """
+        self.space = space
+        self.keys = keys
+        self.bitmaps = bitmaps
+        self.language = language
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    @classmethod
+    def build(
+        cls,
+        astro: Any,
+        space: NatalInputSpace,
+        ids: Iterable[int] | None = None,
+        fix_leap: bool = True,
+        language: LangueType = "zh-CN",
+        progress: Callable[[int, int], None] | None = None,
+    ) -> "ReverseIndex":
+        """
+        离线排盘并构建索引
+
+        Args:
+            astro: 排盘引擎，通常为 `Astro` 实例
+            space: 出生信息输入空间
+            ids: 只为这部分输入ID建索引【可选】，用于分片构建后再 `merge`，默认整个空间
+            fix_leap: 是否调整闰月情况
+            language: 输出语言
+            progress: 进度回调【可选】，参数为 (已完成数量, 总数量)
+
+        Returns:
+            倒排索引
+        """
+        ids = range(len(space)) if ids is None else list(ids)
+        postings: dict[IndexKey, list[int]] = {}
+        for done, input_id in enumerate(ids, 1):
+            solar_date, time_index, gender = space[input_id]
+            astrolabe = astro.by_solar(solar_date, time_index, gender, fix_leap, language)
+            for key in iter_index_keys(astrolabe):
+                postings.setdefault(key, []).append(input_id)
+            if progress:
+                progress(done, len(ids))
+
+        keys = sorted(postings)
+        bitmaps = np.zeros((len(keys), word_count(len(space))), dtype=np.uint64)
+        for row, key in enumerate(keys):
+            bitmaps[row] = pack_ids(postings[key], len(space))
+        return cls(space, keys, bitmaps, language)
+
+    @classmethod
+    def merge(cls, indexes: list["ReverseIndex"]) -> "ReverseIndex":
+        """
+        合并同一输入空间上分片构建的索引
+
+        Args:
+            indexes: 待合并的索引
+
+        Returns:
+            合并后的索引
+        """
+        first = indexes[0]
+        keys = sorted({key for index in indexes for key in index.keys})
+        rows = {key: row for row, key in enumerate(keys)}
+        bitmaps = np.zeros((len(keys), first.bitmaps.shape[1]), dtype=np.uint64)
+        for index in indexes:
+            if index.space.to_dict() != first.space.to_dict() or index.language != first.language:
+                raise ValueError("只能合并同一输入空间、同一语言的索引")
+            target = [rows[key] for key in index.keys]
+            bitmaps[target] |= index.bitmaps
+        return cls(first.space, keys, bitmaps, first.language)
+
+    def bitmap(self, star: str, facet: str, value: str) -> np.ndarray:
+        """
+        获取单个索引键的位图，键不存在时返回全 0 位图
+        """
+        if facet not in FACETS:
+            raise ValueError(f"不支持的索引维度: {facet}")
+        row = self._rows.get((star, facet, value))
+        if row is None:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint64)
+        return self.bitmaps[row]
+
+    def query(self, *conditions: StarCondition) -> np.ndarray:
+        """
+        按条件求交，返回满足所有条件的输入ID位图
+
+        Args:
+            conditions: 反查条件，多个条件之间为“且”的关系
+
+        Returns:
+            uint64 位图
+        """
+        result = pack_ids(range(len(self.space)), len(self.space))
+        for condition in conditions:
+            for facet in FACETS:
+                value = getattr(condition, facet)
+                if value is None:
+                    continue
+                if facet == "mutagen":
+                    value = value.removeprefix("化")
+                result = result & self.bitmap(condition.star, facet, value)
+            if not any(getattr(condition, facet) is not None for facet in FACETS):
+                # 只给出星曜时，要求该星曜出现在盘中
+                present = [row for key, row in self._rows.items() if key[0] == condition.star and key[1] == "branch"]
+                if not present:
+                    return np.zeros_like(result)
+                result = result & np.bitwise_or.reduce(self.bitmaps[present], axis=0)
+        return result
+
+    def ids(self, *conditions: StarCondition) -> np.ndarray:
+        """
+        满足条件的输入ID数组
+        """
+        return unpack_ids(self.query(*conditions), len(self.space))
+
+    def count(self, *conditions: StarCondition) -> int:
+        """
+        满足条件的输入数量
+        """
+        return int(popcount(self.query(*conditions)))
+
+    def inputs(self, *conditions: StarCondition) -> list[NatalInput]:
+        """
+        满足条件的出生信息列表
+        """
+        return [self.space[int(input_id)] for input_id in self.ids(*conditions)]
+
+    def save(self, path: str):
+        """
+        将索引保存为压缩文件
+        """
+        meta = {"space": self.space.to_dict(), "language": self.language, "keys": self.keys}
+        np.savez_compressed(path, bitmaps=self.bitmaps, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+
+    @classmethod
+    def load(cls, path: str) -> "ReverseIndex":
+        """
+        从文件加载索引
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            bitmaps = data["bitmaps"]
+        keys = [tuple(key) for key in meta["keys"]]
+        return cls(NatalInputSpace.from_dict(meta["space"]), keys, bitmaps, meta["language"])
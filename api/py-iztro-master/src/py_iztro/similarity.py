@@ -0,0 +1,200 @@
+import json
+from collections.abc import Callable, Iterable
+from typing import Any, Literal, NamedTuple
+
+import numpy as np
+
+from py_iztro.bitset import popcount
+from py_iztro.compatibility import ChartTraits, top_compatible
+from py_iztro.encoding import FEATURE_WORDS, encode
+from py_iztro.models import AstrolabeModel
+from py_iztro.space import NatalInput, NatalInputSpace
+
+MetricType = Literal["shared", "hamming"]
+
+# 分块打分的行数，避免百万级语料时产生过大的临时矩阵
+_CHUNK_ROWS = 1 << 18
+
+
+class SimilarityMatch(NamedTuple):
+    """
+    相似盘检索结果
+    """
+
+    input_id: int
+    natal_input: NatalInput
+    score: int
+
+
+class CompatibilityMatch(NamedTuple):
+    """
+    合盘检索结果
+    """
+
+    input_id: int
+    natal_input: NatalInput
+    score: float
+
+
+class ChartCorpus:
+    """
+    星盘语料库
+
+    保存一个出生信息空间内每张星盘的定长位向量编码（见 `py_iztro.encoding`），
+    以位运算 + popcount 的方式做以盘找盘的 top-k 检索。
+    """
+
+    def __init__(self, space: NatalInputSpace, vectors: np.ndarray, ids: np.ndarray | None = None):
+        """
+        Args:
+            space: 出生信息输入空间
+            vectors: 形状为 (星盘数量, FEATURE_WORDS) 的 uint64 编码矩阵
+            ids: 每行对应的输入ID【可选】，默认第 i 行即输入ID i
+        """
+        if vectors.ndim != 2 or vectors.shape[1] != FEATURE_WORDS:
+            raise ValueError(f"编码矩阵的形状应为 (N, {FEATURE_WORDS})")
+        self.space = space
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.uint64)
+        self.ids = np.arange(len(vectors), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self._traits: ChartTraits | None = None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @classmethod
+    def build(
+        cls,
+        astro: Any,
+        space: NatalInputSpace,
+        ids: Iterable[int] | None = None,
+        fix_leap: bool = True,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> "ChartCorpus":
+        """
+        离线排盘并编码，构建语料库
+
+        Args:
+            astro: 排盘引擎，通常为 `Astro` 实例
+            space: 出生信息输入空间
+            ids: 只编码这部分输入ID【可选】，默认整个空间
+            fix_leap: 是否调整闰月情况
+            progress: 进度回调【可选】，参数为 (已完成数量, 总数量)
+
+        Returns:
+            语料库
+        """
+        ids = list(range(len(space)) if ids is None else ids)
+        vectors = np.zeros((len(ids), FEATURE_WORDS), dtype=np.uint64)
+        for row, input_id in enumerate(ids):
+            solar_date, time_index, gender = space[input_id]
+            vectors[row] = encode(astro.by_solar(solar_date, time_index, gender, fix_leap, "zh-CN"))
+            if progress:
+                progress(row + 1, len(ids))
+        return cls(space, vectors, np.asarray(ids, dtype=np.int64))
+
+    def scores(self, reference: AstrolabeModel | np.ndarray, metric: MetricType = "shared") -> np.ndarray:
+        """
+        计算语料库中每张星盘与参考盘的得分
+
+        Args:
+            reference: 参考星盘或其位向量编码
+            metric: `shared` 为共同特征数（越大越相似），`hamming` 为汉明距离（越小越相似）
+
+        Returns:
+            int64 得分数组，与语料库行一一对应
+        """
+        query = encode(reference) if isinstance(reference, AstrolabeModel) else np.asarray(reference, np.uint64)
+        scores = np.empty(len(self), dtype=np.int64)
+        for start in range(0, len(self), _CHUNK_ROWS):
+            chunk = self.vectors[start : start + _CHUNK_ROWS]
+            if metric == "shared":
+                scores[start : start + len(chunk)] = popcount(chunk & query)
+            elif metric == "hamming":
+                scores[start : start + len(chunk)] = popcount(chunk ^ query)
+            else:
+                raise ValueError(f"不支持的相似度: {metric}")
+        return scores
+
+    def search(
+        self, reference: AstrolabeModel | np.ndarray, k: int = 10, metric: MetricType = "shared"
+    ) -> list[SimilarityMatch]:
+        """
+        以盘找盘，返回最相似的 k 张星盘
+
+        Args:
+            reference: 参考星盘或其位向量编码
+            k: 返回数量
+            metric: `shared` 为共同特征数，`hamming` 为汉明距离
+
+        Returns:
+            按相似度从高到低排列的检索结果
+        """
+        scores = self.scores(reference, metric)
+        order_key = -scores if metric == "shared" else scores
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        # 先取第 k 名的得分作为阈值，再在阈值内按 (得分, 输入ID) 排序，保证并列时结果稳定
+        threshold = np.partition(order_key, k - 1)[k - 1]
+        candidates = np.flatnonzero(order_key <= threshold)
+        top = candidates[np.lexsort((self.ids[candidates], order_key[candidates]))][:k]
+        return [SimilarityMatch(int(self.ids[row]), self.space[int(self.ids[row])], int(scores[row])) for row in top]
+
+    def traits(self) -> ChartTraits:
+        """
+        语料库中每张星盘的合盘特征（见 `py_iztro.compatibility`），第一次调用时从编码中提取
+        """
+        if self._traits is None:
+            self._traits = ChartTraits.from_vectors(self.vectors)
+        return self._traits
+
+    def compatible(
+        self, reference: AstrolabeModel | np.ndarray, k: int = 10, weights: dict[str, float] | None = None
+    ) -> list[CompatibilityMatch]:
+        """
+        合盘检索，返回与参考盘合盘得分最高的 k 张星盘
+
+        Args:
+            reference: 参考星盘或其位向量编码
+            k: 返回数量
+            weights: 合盘特征权重【可选】，见 `py_iztro.compatibility.DEFAULT_WEIGHTS`
+
+        Returns:
+            按得分从高到低排列的检索结果
+        """
+        rows, scores = top_compatible(reference, self.traits(), k, weights)
+        return [
+            CompatibilityMatch(int(self.ids[row]), self.space[int(self.ids[row])], float(score))
+            for row, score in zip(rows, scores, strict=True)
+        ]
+
+    @classmethod
+    def merge(cls, corpora: list["ChartCorpus"]) -> "ChartCorpus":
+        """
+        合并同一输入空间上分片构建的语料库
+        """
+        first = corpora[0]
+        if any(corpus.space.to_dict() != first.space.to_dict() for corpus in corpora):
+            raise ValueError("只能合并同一输入空间的语料库")
+        return cls(
+            first.space,
+            np.concatenate([corpus.vectors for corpus in corpora]),
+            np.concatenate([corpus.ids for corpus in corpora]),
+        )
+
+    def save(self, path: str):
+        """
+        将语料库保存为压缩文件
+        """
+        meta = {"space": self.space.to_dict(), "feature_words": FEATURE_WORDS}
+        np.savez_compressed(path, vectors=self.vectors, ids=self.ids, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str) -> "ChartCorpus":
+        """
+        从文件加载语料库
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            vectors, ids = data["vectors"], data["ids"]
+        return cls(NatalInputSpace.from_dict(meta["space"]), vectors, ids)
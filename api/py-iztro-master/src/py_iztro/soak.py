@@ -0,0 +1,227 @@
+"""
+内存泄漏浸泡测试
+
+连续执行大量本命盘与运限计算，按间隔采样 tracemalloc、进程 RSS 与存活的 JS 对象句柄，
+预热结束后的增长超过阈值或计算出错次数超过上限时以非零状态退出，可直接放进 CI：
+
+    python -m py_iztro.soak --iterations 1000000 --max-rss-growth-mb 64
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable
+from contextlib import ExitStack
+
+MB = 1024 * 1024
+# 用于计算运限的最近星盘数量，预热期间会先填满，避免把测试自身保留的星盘算作增长
+RECENT_CHARTS = 64
+
+
+def random_birth(rng: random.Random) -> tuple[str, int, str]:
+    """
+    随机出生信息
+
+    Returns:
+        (阳历日期, 时辰序号, 性别)
+    """
+    solar_date = f"{rng.randint(1900, 2099)}-{rng.randint(1, 12)}-{rng.randint(1, 28)}"
+    return solar_date, rng.randint(0, 12), rng.choice("男女")
+
+
+def take_sample(astro, iteration: int, started: float, trace: bool) -> dict:
+    """
+    先做一次完整的 Python 与 JS 垃圾回收再采样，避免把尚未回收的对象算作泄漏
+    """
+    gc.collect()
+    astro.collect_garbage()
+    stats = astro.memory_stats()
+    handles = stats["js_handles"] or {}
+    return {
+        "iteration": iteration,
+        "elapsed": round(time.monotonic() - started, 3),
+        "rss_bytes": stats["rss_bytes"],
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if trace else None,
+        "live_handles": handles.get("live_handles"),
+        "rehydrated": handles.get("rehydrated"),
+    }
+
+
+def _growth(samples: list[dict], field: str, window: int) -> int | None:
+    """
+    增长量：末尾窗口的最小值减去开头窗口的最小值，取最小值以排除瞬时峰值
+    """
+    values = [sample[field] for sample in samples if sample[field] is not None]
+    if len(values) < 2:
+        return None
+    window = max(min(window, len(values) // 2), 1)
+    return min(values[-window:]) - min(values[:window])
+
+
+def run_soak(
+    astro,
+    iterations: int = 1_000_000,
+    horoscope_ratio: float = 0.3,
+    sample_every: int = 10_000,
+    warmup: int = 10_000,
+    max_rss_growth_mb: float = 64,
+    max_traced_growth_mb: float = 16,
+    max_errors: int = 0,
+    trace: bool = True,
+    seed: int = 0,
+    on_sample: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    执行浸泡测试
+
+    Args:
+        astro: `Astro` 实例
+        iterations: 计算次数（不含预热）
+        horoscope_ratio: 运限计算所占比例，0 为只排本命盘，1 为只算运限
+        sample_every: 每多少次计算采样一次
+        warmup: 预热计算次数，预热期间的增长（JIT、内部缓存等）不计入
+        max_rss_growth_mb: RSS 允许的增长（MB）
+        max_traced_growth_mb: tracemalloc 统计的 Python 内存允许的增长（MB）
+        max_errors: 允许的计算出错次数【默认 0】，出错的计算不产生星盘，内存不增长也不能算通过
+        trace: 是否开启 tracemalloc（会明显降低速度）
+        seed: 随机种子
+        on_sample: 每次采样后的回调【可选】
+
+    Returns:
+        测试报告，`passed` 为是否通过，`failures` 为未通过的原因
+    """
+    rng = random.Random(seed)
+    recent = deque(maxlen=RECENT_CHARTS)
+    handle_limit = astro.handles.max_handles if astro.handles is not None else None
+
+    def step():
+        if recent and rng.random() < horoscope_ratio:
+            # 运限使用较早排出的星盘，其 JS 对象可能已被句柄池释放，顺带覆盖重新创建的路径
+            target = f"{rng.randint(2000, 2049)}-{rng.randint(1, 12)}-{rng.randint(1, 28)}"
+            rng.choice(recent).horoscope(target, rng.randint(0, 12))
+        else:
+            recent.append(astro.by_solar(*random_birth(rng)))
+
+    while len(recent) < RECENT_CHARTS:
+        recent.append(astro.by_solar(*random_birth(rng)))
+    for _ in range(warmup):
+        step()
+
+    if trace:
+        tracemalloc.start()
+    started = time.monotonic()
+    samples = [take_sample(astro, 0, started, trace)]
+    first_snapshot = tracemalloc.take_snapshot() if trace else None
+    if on_sample is not None:
+        on_sample(samples[0])
+
+    errors = 0
+    error_messages: dict[str, int] = {}
+    for iteration in range(1, iterations + 1):
+        try:
+            step()
+        except Exception as e:
+            errors += 1
+            message = f"{type(e).__name__}: {e}"[:200]
+            error_messages[message] = error_messages.get(message, 0) + 1
+        if iteration % sample_every == 0 or iteration == iterations:
+            samples.append(take_sample(astro, iteration, started, trace))
+            if on_sample is not None:
+                on_sample(samples[-1])
+
+    top_allocations = []
+    if trace:
+        diff = tracemalloc.take_snapshot().compare_to(first_snapshot, "lineno")
+        top_allocations = [str(stat) for stat in diff[:10]]
+        tracemalloc.stop()
+
+    rss_growth = _growth(samples, "rss_bytes", 3)
+    traced_growth = _growth(samples, "traced_bytes", 3)
+    failures = []
+    if errors > max_errors:
+        failures.append(f"计算出错 {errors} 次，超过上限 {max_errors} 次")
+    if rss_growth is not None and rss_growth > max_rss_growth_mb * MB:
+        failures.append(f"RSS 增长 {rss_growth / MB:.1f}MB 超过阈值 {max_rss_growth_mb}MB")
+    if traced_growth is not None and traced_growth > max_traced_growth_mb * MB:
+        failures.append(f"Python 内存增长 {traced_growth / MB:.1f}MB 超过阈值 {max_traced_growth_mb}MB")
+    live_handles = max((sample["live_handles"] or 0) for sample in samples)
+    if handle_limit is not None and live_handles > handle_limit:
+        failures.append(f"存活的 JS 对象句柄 {live_handles} 超过上限 {handle_limit}")
+    elapsed = time.monotonic() - started
+
+    return {
+        "passed": not failures,
+        "failures": failures,
+        "iterations": iterations,
+        "errors": errors,
+        "error_messages": error_messages,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(iterations / elapsed, 1) if elapsed > 0 else None,
+        "rss_growth_bytes": rss_growth,
+        "traced_growth_bytes": traced_growth,
+        "max_live_handles": live_handles,
+        "samples": len(samples),
+        "top_allocations": top_allocations,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m py_iztro.soak", description="py_iztro 内存泄漏浸泡测试")
+    parser.add_argument("--iterations", type=int, default=1_000_000, help="计算次数（不含预热）")
+    parser.add_argument("--horoscope-ratio", type=float, default=0.3, help="运限计算所占比例，0~1")
+    parser.add_argument("--sample-every", type=int, default=10_000, help="每多少次计算采样一次")
+    parser.add_argument("--warmup", type=int, default=10_000, help="预热计算次数")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64, help="RSS 允许的增长（MB）")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=16, help="Python 内存允许的增长（MB）")
+    parser.add_argument("--max-errors", type=int, default=0, help="允许的计算出错次数")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不开启 tracemalloc")
+    parser.add_argument("--cache-size", type=int, default=0, help="星盘缓存容量")
+    parser.add_argument("--js-handle-limit", type=int, default=128, help="最多保留的星盘 JS 对象数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--samples-file", help="把每次采样以 JSON Lines 写入该文件【可选】")
+    args = parser.parse_args(argv)
+
+    from py_iztro import Astro
+
+    astro = Astro(cache_size=args.cache_size, js_handle_limit=args.js_handle_limit)
+    with ExitStack() as stack:
+        samples_file = (
+            stack.enter_context(open(args.samples_file, "w", encoding="utf-8")) if args.samples_file else None
+        )
+
+        def on_sample(sample: dict):
+            print(
+                f"[{sample['elapsed']:>9.1f}s] {sample['iteration']:>10} 次  "
+                f"RSS {(sample['rss_bytes'] or 0) / MB:8.1f}MB  Python {(sample['traced_bytes'] or 0) / MB:7.1f}MB  "
+                f"JS 句柄 {sample['live_handles']}",
+                file=sys.stderr,
+            )
+            if samples_file is not None:
+                samples_file.write(json.dumps(sample) + "\n")
+                samples_file.flush()
+
+        report = run_soak(
+            astro,
+            iterations=args.iterations,
+            horoscope_ratio=args.horoscope_ratio,
+            sample_every=args.sample_every,
+            warmup=args.warmup,
+            max_rss_growth_mb=args.max_rss_growth_mb,
+            max_traced_growth_mb=args.max_traced_growth_mb,
+            max_errors=args.max_errors,
+            trace=not args.no_tracemalloc,
+            seed=args.seed,
+            on_sample=on_sample,
+        )
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+节气表：每年十二个"节"的交节时刻
+
+iztro 的流月按节分月（立春起寅月、惊蛰起卯月……），并以交节的时刻而不是日期分界，
+流年按立春所在的日期分界，这里的表用于不经过引擎得到与 iztro 相同的流年、流月干支。
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+
+# 每年的十二个节，依次为各节月的起点
+JIE_NAMES = ("小寒", "立春", "惊蛰", "清明", "立夏", "芒种", "小暑", "立秋", "白露", "寒露", "立冬", "大雪")
+
+# 每年十二个节的交节时刻：北京时间距当年1月1日零时的分钟数（不足一分钟的向上取整），自1900年起逐年排列
+# 由 iztro 2.4.4 内置的 lunar-javascript（`getJieQiTable`）导出，1900~2100年的每个节都与之核对过。
+# iztro 取时辰中点（如寅时为 03:30:00）判断节月，交节时刻本身属于新的节月，向上取整后比较结果不变
+# fmt: off
+JIE_INFO = (
+    (7324, 49792, 92662, 136193, 180476, 225399, 270671, 315891, 360677, 404774, 448120, 490856),
+    (7674, 50140, 93011, 136545, 180831, 225757, 271028, 316247, 361031, 405127, 448475, 491213),
+    (8032, 50499, 93368, 136898, 181179, 226100, 271367, 316583, 361367, 405466, 448818, 491562),
+    (8384, 50852, 93719, 137246, 181526, 226448, 271717, 316936, 361723, 405822, 449174, 491916),
+    (8738, 51205, 94072, 137599, 181879, 226801, 272072, 317292, 362078, 406176, 449525, 492266),
+    (7648, 50116, 92986, 136515, 180795, 225714, 270980, 316197, 360982, 405080, 448430, 491171),
+    (7994, 50464, 93337, 136868, 181149, 226069, 271336, 316552, 361337, 405435, 448787, 491530),
+    (8352, 50819, 93688, 137215, 181494, 226413, 271680, 316896, 361683, 405783, 449137, 491880),
+    (8702, 51168, 94034, 137560, 181839, 226760, 272028, 317247, 362033, 406131, 449483, 492224),
+    (7606, 50073, 92941, 136470, 180751, 225674, 270944, 316163, 360947, 405044, 448394, 491135),
+    (7958, 50428, 93297, 136823, 181100, 226017, 271282, 316498, 361283, 405382, 448734, 491477),
+    (8301, 50771, 93639, 137165, 181441, 226358, 271625, 316845, 361634, 405735, 449087, 491828),
+    (8648, 51114, 93981, 137509, 181788, 226708, 271977, 317198, 361986, 406087, 449439, 492179),
+    (7558, 50023, 92889, 136416, 180695, 225614, 270879, 316096, 360883, 404984, 448338, 491082),
+    (7903, 50370, 93236, 136762, 181041, 225960, 271228, 316446, 361233, 405335, 448692, 491438),
+    (8261, 50726, 93589, 137110, 181383, 226301, 271568, 316788, 361578, 405681, 449038, 491784),
+    (8608, 51074, 93938, 137458, 181730, 226646, 271914, 317135, 361925, 406028, 449383, 492127),
+    (7510, 49978, 92845, 136370, 180646, 225564, 270831, 316051, 360840, 404943, 448297, 491041),
+    (7865, 50334, 93201, 136726, 180999, 225911, 271173, 316388, 361176, 405281, 448639, 491387),
+    (8212, 50680, 93546, 137069, 181342, 226257, 271521, 316739, 361528, 405634, 448992, 491738),
+    (8561, 51027, 93892, 137415, 181692, 226611, 271879, 317099, 361887, 405990, 449345, 492091),
+    (7474, 49941, 92806, 136329, 180605, 225522, 270787, 316004, 360790, 404891, 448246, 490992),
+    (7817, 50287, 93154, 136678, 180953, 225871, 271138, 316358, 361147, 405250, 448606, 491351),
+    (8174, 50641, 93505, 137026, 181299, 226215, 271483, 316705, 361498, 405604, 448961, 491705),
+    (8526, 50990, 93853, 137374, 181646, 226562, 271830, 317053, 361846, 405953, 449310, 492053),
+    (7434, 49897, 92760, 136283, 180558, 225477, 270745, 315968, 360761, 404868, 448227, 490973),
+    (7795, 50259, 93120, 136639, 180909, 225822, 271086, 316305, 361096, 405205, 448568, 491319),
+    (8145, 50611, 93471, 136987, 181254, 226165, 271430, 316652, 361446, 405556, 448917, 491667),
+    (8492, 50957, 93818, 137335, 181604, 226518, 271785, 317008, 361802, 405910, 449270, 492018),
+    (7403, 49869, 92732, 136252, 180521, 225431, 270692, 315909, 360700, 404808, 448168, 490917),
+    (7743, 50212, 93077, 136598, 180867, 225779, 271040, 316257, 361049, 405158, 448521, 491271),
+    (8096, 50561, 93423, 136941, 181210, 226122, 271386, 316605, 361398, 405507, 448870, 491621),
+    (8446, 50910, 93770, 137287, 181556, 226468, 271733, 316952, 361743, 405850, 449210, 491959),
+    (7344, 49810, 92672, 136191, 180462, 225378, 270645, 315866, 360658, 404764, 448123, 490872),
+    (7697, 50164, 93027, 136544, 180811, 225722, 270985, 316204, 360997, 405105, 448467, 491217),
+    (8043, 50509, 93371, 136887, 181153, 226062, 271326, 316548, 361345, 405456, 448818, 491565),
+    (8387, 50850, 93710, 137227, 181497, 226411, 271679, 316904, 361701, 405813, 449175, 491923),
+    (7304, 49766, 92625, 136142, 180411, 225323, 270586, 315806, 360600, 404711, 448076, 490827),
+    (7652, 50115, 92974, 136489, 180756, 225667, 270932, 316153, 360949, 405062, 448429, 491182),
+    (8008, 50471, 93327, 136838, 181102, 226012, 271279, 316504, 361303, 405417, 448784, 491537),
+    (8364, 50828, 93684, 137195, 181457, 226365, 271629, 316852, 361650, 405763, 449127, 491878),
+    (7264, 49730, 92591, 136105, 180370, 225280, 270544, 315766, 360564, 404679, 448045, 490796),
+    (7623, 50089, 92950, 136464, 180727, 225633, 270892, 316111, 360907, 405022, 448392, 491147),
+    (7975, 50441, 93299, 136812, 181074, 225979, 271239, 316459, 361256, 405371, 448739, 491493),
+    (8320, 50783, 93641, 137154, 181420, 226331, 271597, 316819, 361616, 405729, 449095, 491848),
+    (7235, 49700, 92558, 136072, 180337, 225246, 270507, 315726, 360519, 404630, 447995, 490748),
+    (7577, 50044, 92905, 136419, 180682, 225589, 270851, 316072, 360868, 404981, 448348, 491101),
+    (7927, 50391, 93248, 136761, 181023, 225932, 271196, 316421, 361222, 405338, 448705, 491457),
+    (8281, 50742, 93598, 137110, 181373, 226281, 271544, 316767, 361565, 405681, 449047, 491798),
+    (7182, 49643, 92500, 136012, 180277, 225187, 270452, 315675, 360475, 404592, 447960, 490714),
+    (7539, 50001, 92856, 136365, 180625, 225531, 270794, 316016, 360814, 404932, 448304, 491062),
+    (7891, 50354, 93207, 136713, 180970, 225873, 271134, 316358, 361159, 405277, 448647, 491403),
+    (8230, 50693, 93548, 137056, 181315, 226221, 271485, 316711, 361514, 405633, 449002, 491756),
+    (7143, 49606, 92463, 135973, 180233, 225137, 270395, 315615, 360413, 404531, 447901, 490657),
+    (7486, 49951, 92809, 136320, 180579, 225481, 270740, 315960, 360758, 404878, 448251, 491009),
+    (7836, 50298, 93151, 136659, 180918, 225824, 271086, 316311, 361112, 405233, 448606, 491363),
+    (8191, 50652, 93505, 137012, 181270, 226176, 271438, 316661, 361459, 405576, 448946, 491703),
+    (7091, 49555, 92411, 135919, 180179, 225085, 270349, 315573, 360373, 404490, 447861, 490616),
+    (7445, 49910, 92765, 136273, 180530, 225433, 270694, 315918, 360719, 404840, 448212, 490970),
+    (7799, 50263, 93117, 136624, 180879, 225781, 271040, 316265, 361068, 405190, 448563, 491318),
+    (8143, 50604, 93457, 136964, 181223, 226129, 271393, 316620, 361426, 405549, 448923, 491678),
+    (7063, 49523, 92375, 135883, 180142, 225046, 270307, 315529, 360330, 404451, 447827, 490586),
+    (7415, 49878, 92730, 136235, 180490, 225392, 270652, 315874, 360676, 404798, 448175, 490937),
+    (7767, 50228, 93078, 136579, 180832, 225735, 270998, 316226, 361032, 405157, 448533, 491293),
+    (8123, 50585, 93436, 136939, 181192, 226092, 271353, 316577, 361380, 405502, 448876, 491634),
+    (7022, 49487, 92341, 135847, 180102, 225003, 270262, 315485, 360288, 404412, 447787, 490546),
+    (7375, 49838, 92692, 136197, 180451, 225350, 270607, 315829, 360633, 404757, 448136, 490898),
+    (7729, 50191, 93042, 136545, 180798, 225697, 270954, 316175, 360978, 405102, 448478, 491238),
+    (8067, 50528, 93378, 136881, 181136, 226040, 271302, 316528, 361332, 405455, 448830, 491589),
+    (6977, 49439, 92291, 135795, 180050, 224952, 270212, 315435, 360236, 404357, 447732, 490492),
+    (7322, 49786, 92639, 136142, 180394, 225293, 270551, 315775, 360578, 404702, 448078, 490838),
+    (7666, 50126, 92975, 136476, 180729, 225629, 270892, 316121, 360931, 405059, 448437, 491196),
+    (8022, 50481, 93329, 136829, 181082, 225982, 271243, 316469, 361276, 405402, 448780, 491539),
+    (6926, 49385, 92233, 135734, 179987, 224887, 270148, 315373, 360180, 404308, 447688, 490451),
+    (7280, 49741, 92588, 136085, 180334, 225232, 270492, 315718, 360526, 404655, 448038, 490805),
+    (7638, 50100, 92946, 136442, 180688, 225583, 270840, 316065, 360874, 405003, 448383, 491147),
+    (7978, 50440, 93289, 136787, 181035, 225932, 271191, 316419, 361229, 405359, 448739, 491501),
+    (6892, 49354, 92205, 135706, 179956, 224853, 270108, 315331, 360136, 404264, 447646, 490411),
+    (7244, 49707, 92559, 136060, 180309, 225204, 270457, 315678, 360483, 404611, 447995, 490761),
+    (7592, 50053, 92900, 136398, 180648, 225546, 270805, 316031, 360840, 404971, 448353, 491118),
+    (7949, 50410, 93257, 136755, 181005, 225904, 271164, 316389, 361194, 405320, 448699, 491462),
+    (6853, 49316, 92166, 135666, 179915, 224813, 270072, 315298, 360104, 404230, 447609, 490372),
+    (7203, 49666, 92515, 136013, 180260, 225156, 270415, 315642, 360452, 404583, 447965, 490729),
+    (7559, 50020, 92868, 136365, 180611, 225506, 270764, 315990, 360801, 404932, 448313, 491074),
+    (7901, 50359, 93205, 136703, 180951, 225849, 271110, 316338, 361150, 405283, 448666, 491429),
+    (6816, 49272, 92117, 135614, 179863, 224760, 270019, 315245, 360054, 404185, 447570, 490337),
+    (7169, 49628, 92473, 135967, 180211, 225105, 270361, 315586, 360395, 404527, 447913, 490681),
+    (7513, 49972, 92814, 136305, 180546, 225439, 270699, 315930, 360745, 404880, 448266, 491033),
+    (7864, 50323, 93167, 136660, 180902, 225795, 271053, 316281, 361092, 405225, 448609, 491375),
+    (6766, 49228, 92075, 135570, 179814, 224706, 269960, 315184, 359994, 404128, 447514, 490281),
+    (7114, 49574, 92420, 135913, 180156, 225047, 270301, 315526, 360338, 404474, 447864, 490635),
+    (7469, 49929, 92773, 136265, 180507, 225399, 270653, 315878, 360688, 404822, 448208, 490976),
+    (7809, 50269, 93113, 136606, 180849, 225743, 271001, 316228, 361039, 405172, 448558, 491325),
+    (6717, 49178, 92023, 135518, 179762, 224656, 269913, 315138, 359948, 404081, 447466, 490234),
+    (7069, 49531, 92378, 135872, 180115, 225005, 270260, 315485, 360296, 404430, 447816, 490583),
+    (7415, 49873, 92717, 136209, 180451, 225343, 270601, 315832, 360649, 404788, 448176, 490943),
+    (7772, 50228, 93070, 136563, 180807, 225701, 270960, 316189, 361003, 405139, 448527, 491294),
+    (6685, 49142, 91985, 135477, 179720, 224613, 269870, 315097, 359909, 404046, 447435, 490205),
+    (7039, 49497, 92338, 135825, 180064, 224954, 270211, 315440, 360256, 404396, 447789, 490562),
+    (7398, 49858, 92698, 136185, 180421, 225310, 270565, 315795, 360610, 404749, 448138, 490908),
+    (7741, 50201, 93043, 136532, 180771, 225659, 270914, 316143, 360960, 405099, 448489, 491258),
+    (6650, 49109, 91953, 135445, 179685, 224574, 269827, 315053, 359867, 404006, 447397, 490169),
+    (7004, 49465, 92308, 135799, 180038, 224925, 270177, 315400, 360212, 404350, 447742, 490515),
+    (7348, 49806, 92645, 136133, 180371, 225260, 270516, 315745, 360561, 404701, 448094, 490866),
+    (7699, 50157, 92996, 136484, 180723, 225614, 270872, 316100, 360913, 405050, 448439, 491209),
+    (6603, 49064, 91906, 135395, 179633, 224522, 269777, 315004, 359817, 403954, 447343, 490113),
+    (6947, 49408, 92249, 135736, 179971, 224857, 270112, 315341, 360160, 404302, 447695, 490467),
+    (7301, 49759, 92598, 136085, 180321, 225208, 270462, 315692, 360510, 404652, 448045, 490815),
+    (7645, 50101, 92939, 136426, 180664, 225552, 270807, 316037, 360855, 404997, 448391, 491163),
+    (6555, 49010, 91848, 135334, 179571, 224460, 269714, 314942, 359758, 403901, 447297, 490073),
+    (6909, 49368, 92207, 135691, 179925, 224810, 270063, 315290, 360105, 404247, 447643, 490419),
+    (7255, 49713, 92550, 136032, 180264, 225148, 270402, 315634, 360455, 404600, 447995, 490769),
+    (7604, 50063, 92902, 136386, 180620, 225506, 270761, 315991, 360810, 404952, 448346, 491119),
+    (6514, 48974, 91815, 135303, 179539, 224424, 269675, 314901, 359717, 403859, 447254, 490029),
+    (6865, 49324, 92163, 135647, 179880, 224764, 270015, 315243, 360062, 404208, 447607, 490385),
+    (7221, 49679, 92516, 136000, 180233, 225119, 270373, 315602, 360420, 404563, 447959, 490734),
+    (7569, 50027, 92864, 136348, 180582, 225469, 270724, 315954, 360772, 404914, 448308, 491082),
+    (6476, 48935, 91773, 135258, 179492, 224377, 269631, 314861, 359679, 403823, 447218, 489993),
+    (6829, 49289, 92129, 135613, 179846, 224730, 269982, 315211, 360030, 404175, 447572, 490346),
+    (7179, 49635, 92470, 135952, 180183, 225067, 270321, 315554, 360377, 404526, 447925, 490699),
+    (7531, 49984, 92817, 136299, 180532, 225419, 270675, 315907, 360729, 404876, 448274, 491050),
+    (6444, 48899, 91734, 135216, 179448, 224333, 269586, 314814, 359633, 403780, 447179, 489958),
+    (6795, 49251, 92084, 135561, 179786, 224666, 269918, 315150, 359973, 404123, 447526, 490307),
+    (7145, 49603, 92437, 135914, 180139, 225019, 270271, 315503, 360327, 404476, 447876, 490653),
+    (7490, 49948, 92783, 136263, 180491, 225370, 270621, 315850, 360672, 404820, 448221, 490997),
+    (6393, 48851, 91688, 135169, 179398, 224277, 269525, 314752, 359572, 403722, 447125, 489905),
+    (6744, 49203, 92039, 135520, 179749, 224629, 269877, 315103, 359922, 404070, 447473, 490253),
+    (7090, 49547, 92380, 135858, 180086, 224966, 270217, 315447, 360269, 404418, 447819, 490598),
+    (7435, 49892, 92725, 136204, 180433, 225316, 270571, 315802, 360623, 404769, 448168, 490945),
+    (6342, 48801, 91638, 135119, 179348, 224230, 269483, 314712, 359532, 403679, 447077, 489854),
+    (6691, 49149, 91984, 135461, 179687, 224565, 269816, 315048, 359873, 404026, 447429, 490208),
+    (7043, 49499, 92331, 135809, 180036, 224916, 270169, 315403, 360231, 404383, 447786, 490563),
+    (7396, 49849, 92681, 136158, 180386, 225268, 270521, 315753, 360578, 404731, 448135, 490914),
+    (6308, 48762, 91593, 135068, 179294, 224174, 269425, 314656, 359481, 403634, 447041, 489825),
+    (6665, 49121, 91953, 135426, 179649, 224527, 269778, 315009, 359834, 403987, 447394, 490177),
+    (7016, 49472, 92302, 135774, 179995, 224871, 270121, 315355, 360183, 404338, 447744, 490526),
+    (7364, 49820, 92652, 136126, 180350, 225227, 270478, 315709, 360535, 404689, 448095, 490876),
+    (6274, 48732, 91566, 135044, 179270, 224147, 269395, 314623, 359446, 403598, 447004, 489787),
+    (6627, 49084, 91916, 135390, 179611, 224486, 269733, 314961, 359786, 403942, 447351, 490137),
+    (6977, 49433, 92263, 135736, 179958, 224836, 270086, 315318, 360144, 404297, 447703, 490485),
+    (7324, 49780, 92611, 136086, 180309, 225188, 270439, 315670, 360494, 404646, 448049, 490830),
+    (6228, 48685, 91518, 134993, 179215, 224090, 269339, 314569, 359394, 403547, 446953, 489736),
+    (6575, 49033, 91866, 135341, 179563, 224438, 269687, 314919, 359746, 403901, 447308, 490089),
+    (6925, 49379, 92208, 135680, 179902, 224778, 270028, 315261, 360090, 404248, 447656, 490437),
+    (7273, 49724, 92552, 136023, 180246, 225124, 270376, 315609, 360437, 404593, 448002, 490785),
+    (6183, 48636, 91465, 134937, 179160, 224037, 269288, 314520, 359345, 403501, 446910, 489696),
+    (6536, 48991, 91818, 135285, 179501, 224372, 269620, 314853, 359683, 403842, 447254, 490041),
+    (6882, 49338, 92165, 135633, 179849, 224721, 269970, 315206, 360038, 404198, 447607, 490391),
+    (7229, 49685, 92514, 135985, 180204, 225078, 270327, 315559, 360388, 404547, 447957, 490741),
+    (6139, 48593, 91423, 134894, 179113, 223984, 269229, 314458, 359285, 403445, 446858, 489647),
+    (6488, 48944, 91773, 135243, 179462, 224335, 269582, 314812, 359641, 403800, 447214, 490002),
+    (6842, 49296, 92122, 135590, 179807, 224681, 269929, 315162, 359991, 404150, 447562, 490349),
+    (7188, 49643, 92469, 135937, 180155, 225029, 270280, 315513, 360342, 404500, 447910, 490695),
+    (6096, 48553, 91383, 134854, 179074, 223948, 269197, 314430, 359259, 403416, 446826, 489612),
+    (6452, 48908, 91735, 135203, 179418, 224287, 269534, 314767, 359600, 403762, 447176, 489963),
+    (6803, 49256, 92081, 135548, 179764, 224636, 269885, 315121, 359955, 404119, 447533, 490318),
+    (7156, 49607, 92432, 135900, 180118, 224992, 270242, 315476, 360307, 404469, 447883, 490671),
+    (6070, 48522, 91347, 134813, 179027, 223896, 269142, 314374, 359204, 403366, 446783, 489575),
+    (6418, 48874, 91700, 135164, 179376, 224245, 269491, 314725, 359558, 403721, 447137, 489927),
+    (6769, 49224, 92049, 135512, 179724, 224592, 269839, 315073, 359906, 404071, 447486, 490274),
+    (7114, 49568, 92394, 135860, 180073, 224941, 270187, 315419, 360251, 404413, 447829, 490617),
+    (6018, 48474, 91302, 134770, 178986, 223857, 269102, 314333, 359162, 403324, 446740, 489530),
+    (6373, 48827, 91651, 135115, 179327, 224195, 269438, 314669, 359500, 403664, 447082, 489874),
+    (6717, 49171, 91994, 135457, 179668, 224538, 269785, 315020, 359853, 404017, 447432, 490221),
+    (7061, 49515, 92339, 135804, 180018, 224890, 270140, 315374, 360206, 404368, 447782, 490569),
+    (5969, 48424, 91249, 134714, 178925, 223792, 269037, 314269, 359102, 403266, 446683, 489473),
+    (6315, 48769, 91594, 135058, 179269, 224136, 269382, 314617, 359453, 403621, 447039, 489828),
+    (6667, 49117, 91938, 135401, 179612, 224481, 269729, 314965, 359802, 403971, 447390, 490181),
+    (7019, 49469, 92289, 135750, 179961, 224829, 270077, 315311, 360146, 404313, 447733, 490526),
+    (5928, 48381, 91202, 134664, 178875, 223743, 268991, 314226, 359061, 403227, 446647, 489442),
+    (6287, 48742, 91562, 135020, 179225, 224088, 269332, 314567, 359404, 403573, 446995, 489791),
+    (6636, 49091, 91913, 135371, 179575, 224438, 269683, 314919, 359758, 403928, 447349, 490141),
+    (6983, 49437, 92261, 135724, 179934, 224800, 270045, 315279, 360115, 404283, 447704, 490496),
+    (5899, 48353, 91177, 134639, 178848, 223711, 268951, 314180, 359013, 403181, 446604, 489400),
+    (6246, 48701, 91524, 134985, 179193, 224058, 269301, 314533, 359368, 403537, 446960, 489754),
+    (6598, 49051, 91871, 135331, 179540, 224407, 269653, 314888, 359724, 403891, 447312, 490104),
+    (6947, 49400, 92221, 135680, 179888, 224754, 270000, 315234, 360069, 404235, 447653, 490445),
+    (5848, 48303, 91127, 134589, 178798, 223665, 268911, 314146, 358983, 403151, 446570, 489362),
+    (6205, 48657, 91478, 134936, 179142, 224005, 269249, 314484, 359324, 403496, 446919, 489713),
+    (6553, 49003, 91821, 135277, 179482, 224346, 269592, 314829, 359670, 403843, 447267, 490060),
+    (6900, 49348, 92165, 135623, 179831, 224698, 269946, 315183, 360022, 404194, 447619, 490414),
+    (5816, 48266, 91083, 134537, 178740, 223601, 268843, 314077, 358915, 403087, 446513, 489312),
+    (6159, 48612, 91430, 134883, 179083, 223942, 269185, 314421, 359263, 403438, 446864, 489662),
+    (6506, 48958, 91776, 135230, 179432, 224292, 269536, 314773, 359614, 403789, 447216, 490012),
+    (6855, 49307, 92125, 135580, 179783, 224643, 269883, 315116, 359954, 404127, 447554, 490351),
+    (5756, 48210, 91031, 134488, 178693, 223555, 268796, 314029, 358867, 403040, 446468, 489267),
+    (6114, 48566, 91384, 134838, 179039, 223899, 269140, 314373, 359212, 403387, 446816, 489616),
+    (6463, 48915, 91732, 135185, 179385, 224245, 269488, 314724, 359564, 403738, 447163, 489960),
+    (6805, 49258, 92077, 135533, 179737, 224600, 269846, 315084, 359924, 404096, 447521, 490317),
+    (5721, 48175, 90995, 134450, 178652, 223511, 268751, 313985, 358824, 402998, 446425, 489223),
+    (6069, 48522, 91342, 134796, 178997, 223855, 269097, 314333, 359176, 403354, 446783, 489580),
+    (6422, 48871, 91686, 135140, 179343, 224206, 269451, 314690, 359533, 403711, 447141, 489939),
+    (6781, 49229, 92043, 135495, 179696, 224558, 269801, 315036, 359876, 404052, 447481, 490281),
+    (5687, 48139, 90954, 134406, 178606, 223467, 268711, 313948, 358790, 402966, 446396, 489197),
+    (6045, 48497, 91311, 134760, 178956, 223812, 269054, 314292, 359136, 403315, 446747, 489548),
+    (6395, 48847, 91662, 135111, 179306, 224160, 269401, 314639, 359483, 403663, 447093, 489892),
+    (6736, 49187, 92003, 135456, 179656, 224514, 269757, 314993, 359837, 404015, 447446, 490246),
+    (5651, 48102, 90918, 134370, 178568, 223424, 268661, 313893, 358733, 402911, 446344, 489148),
+    (5997, 48449, 91264, 134713, 178909, 223763, 269002, 314237, 359079, 403258, 446691, 489493),
+    (6339, 48790, 91603, 135052, 179249, 224108, 269352, 314590, 359434, 403612, 447043, 489843),
+    (6689, 49140, 91955, 135404, 179601, 224458, 269699, 314934, 359775, 403951, 447380, 490180),
+)
+# fmt: on
+
+JIE_MIN_YEAR = 1900
+JIE_MAX_YEAR = JIE_MIN_YEAR + len(JIE_INFO) - 1
+
+
+def _build_jie_moments() -> list[datetime]:
+    return [
+        datetime(JIE_MIN_YEAR + i, 1, 1) + timedelta(minutes=minutes)
+        for i, row in enumerate(JIE_INFO)
+        for minutes in row
+    ]
+
+
+_JIE_MOMENTS = _build_jie_moments()
+
+
+def jie_moment(year: int, index: int) -> datetime:
+    """
+    交节时刻（北京时间，精确到分钟）
+
+    Args:
+        year: 年份
+        index: 节的序号，见 `JIE_NAMES`
+
+    Returns:
+        交节时刻
+    """
+    if not JIE_MIN_YEAR <= year <= JIE_MAX_YEAR:
+        raise ValueError(f"年份超出节气表范围: {year}")
+    return _JIE_MOMENTS[(year - JIE_MIN_YEAR) * 12 + index]
+
+
+def jie_month_ordinal(moment: datetime) -> int:
+    """
+    `moment` 所在的节月序号，1900年小寒至立春为第 0 个节月，之后每过一个节加 1
+
+    与 lunar-javascript 的 `getMonthGanExact`、`getMonthZhiExact` 一样按交节时刻分界，交节时刻本身属于新的节月
+
+    Args:
+        moment: 北京时间
+
+    Returns:
+        节月序号，1900年小寒之前为 -1
+    """
+    if not JIE_MIN_YEAR <= moment.year <= JIE_MAX_YEAR:
+        raise ValueError(f"日期超出节气表范围: {moment}")
+    return bisect_right(_JIE_MOMENTS, moment) - 1
+
+
+def lichun_year(solar: date) -> int:
+    """
+    按立春分界的年份，与 lunar-javascript 的 `getYearGanByLiChun` 一样只比较日期，立春当天属于新的一年
+
+    Args:
+        solar: 阳历日期
+
+    Returns:
+        年份，立春之前的日期属于上一年
+    """
+    return solar.year if solar >= jie_moment(solar.year, 1).date() else solar.year - 1
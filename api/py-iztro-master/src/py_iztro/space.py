@@ -0,0 +1,110 @@
+from collections.abc import Iterator
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from py_iztro.models import GenderType, TimeIndexType
+
+ALL_TIME_INDICES: tuple[int, ...] = tuple(range(13))
+ALL_GENDERS: tuple[str, ...] = ("男", "女")
+
+
+class NatalInput(NamedTuple):
+    """
+    一组出生信息，即 `Astro.by_solar` 的输入
+    """
+
+    solar_date: str
+    time_index: TimeIndexType
+    gender: GenderType
+
+
+def _to_date(value: str | date) -> date:
+    if isinstance(value, date):
+        return value
+    year, month, day = map(int, value.split("-"))
+    return date(year, month, day)
+
+
+class NatalInputSpace:
+    """
+    出生信息输入空间
+
+    按 日期 -> 时辰 -> 性别 的顺序为空间内每组出生信息分配连续的整数ID，ID与出生信息可以互相换算，
+    因此索引、语料库等只需要保存ID即可。
+    """
+
+    def __init__(
+        self,
+        start_date: str | date,
+        end_date: str | date,
+        time_indices: tuple[int, ...] = ALL_TIME_INDICES,
+        genders: tuple[str, ...] = ALL_GENDERS,
+    ):
+        """
+        Args:
+            start_date: 起始阳历日期（包含）【YYYY-M-D】
+            end_date: 结束阳历日期（包含）【YYYY-M-D】
+            time_indices: 参与枚举的时辰序号，默认 0~12 全部时辰
+            genders: 参与枚举的性别，默认男女都枚举
+        """
+        self.start_date = _to_date(start_date)
+        self.end_date = _to_date(end_date)
+        if self.end_date < self.start_date:
+            raise ValueError("end_date 不能早于 start_date")
+        self.time_indices = tuple(time_indices)
+        self.genders = tuple(genders)
+        self.days = (self.end_date - self.start_date).days + 1
+
+    def __len__(self) -> int:
+        return self.days * len(self.time_indices) * len(self.genders)
+
+    def __iter__(self) -> Iterator[NatalInput]:
+        for input_id in range(len(self)):
+            yield self[input_id]
+
+    def __getitem__(self, input_id: int) -> NatalInput:
+        if not 0 <= input_id < len(self):
+            raise IndexError(f"输入ID超出范围: {input_id}")
+        rest, gender_idx = divmod(input_id, len(self.genders))
+        day_offset, time_idx = divmod(rest, len(self.time_indices))
+        day = self.start_date + timedelta(days=day_offset)
+        return NatalInput(
+            f"{day.year}-{day.month}-{day.day}",
+            self.time_indices[time_idx],
+            self.genders[gender_idx],
+        )
+
+    def index_of(self, solar_date: str | date, time_index: int, gender: str) -> int:
+        """
+        获取出生信息对应的输入ID
+
+        Args:
+            solar_date: 阳历日期【YYYY-M-D】
+            time_index: 时辰序号
+            gender: 性别
+
+        Returns:
+            输入ID
+        """
+        day_offset = (_to_date(solar_date) - self.start_date).days
+        if not 0 <= day_offset < self.days:
+            raise KeyError(f"日期不在输入空间内: {solar_date}")
+        slot = day_offset * len(self.time_indices) + self.time_indices.index(time_index)
+        return slot * len(self.genders) + self.genders.index(gender)
+
+    def to_dict(self) -> dict:
+        return {
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "time_indices": list(self.time_indices),
+            "genders": list(self.genders),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NatalInputSpace":
+        return cls(
+            data["start_date"],
+            data["end_date"],
+            tuple(data["time_indices"]),
+            tuple(data["genders"]),
+        )
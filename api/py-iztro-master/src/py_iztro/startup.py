@@ -0,0 +1,113 @@
+"""
+冷启动基准
+
+每轮启动一个新的 Python 进程，依次测量导入 py_iztro、加载引擎（ready）、第一次排盘、第一次计算运限的耗时，
+并检查 `import py_iztro` 没有连带导入 pythonmonkey。导入耗时超过 `--import-budget` 时以状态码 1 退出，可以放在 CI 中：
+
+    py-iztro startup --runs 5 --import-budget 0.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# 在子进程中执行的测量脚本，各阶段的时间都从导入 py_iztro 之前算起
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import py_iztro
+result = {"import": time.perf_counter() - started, "engine_imported": "pythonmonkey" in sys.modules}
+if sys.argv[1] == "1":
+    astro = py_iztro.Astro().load()
+    result["ready"] = time.perf_counter() - started
+    chart = astro.by_solar("2000-8-16", 2, "女")
+    result["first_chart"] = time.perf_counter() - started
+    chart.horoscope("2025-1-1", 6)
+    result["first_horoscope"] = time.perf_counter() - started
+print(json.dumps(result))
+"""
+
+PHASES = ("import", "ready", "first_chart", "first_horoscope", "process")
+
+
+def _probe_env() -> dict:
+    """
+    子进程环境，保证能导入与当前进程相同的 py_iztro
+    """
+    env = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_once(engine: bool = True) -> dict:
+    """
+    在新进程中测量一次冷启动
+
+    Args:
+        engine: 是否加载引擎并排盘，为 False 时只测量导入
+
+    Returns:
+        各阶段的耗时（秒），`process` 为包括解释器启动在内的进程总耗时
+    """
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, "1" if engine else "0"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_probe_env(),
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - started
+    return result
+
+
+def run_startup(runs: int = 5, engine: bool = True, import_budget: float | None = None) -> dict:
+    """
+    执行冷启动基准
+
+    Args:
+        runs: 轮数
+        engine: 是否加载引擎并排盘
+        import_budget: 导入 py_iztro 的耗时预算（秒）【可选】，按中位数判断
+
+    Returns:
+        报告：各阶段耗时的中位数与最大值（毫秒），`passed` 为是否通过，`failures` 为未通过的原因
+    """
+    samples = [measure_once(engine) for _ in range(runs)]
+    phases = {}
+    for phase in PHASES:
+        values = [sample[phase] for sample in samples if phase in sample]
+        if values:
+            phases[phase] = {
+                "median_ms": round(statistics.median(values) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+            }
+
+    failures = []
+    if any(sample["engine_imported"] for sample in samples):
+        failures.append("import py_iztro 导入了 pythonmonkey")
+    if import_budget is not None and phases["import"]["median_ms"] > import_budget * 1000:
+        failures.append(f"导入耗时 {phases['import']['median_ms']}ms 超出预算 {import_budget * 1000:g}ms")
+    return {"runs": runs, "phases": phases, "passed": not failures, "failures": failures}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="py-iztro startup", description="py_iztro 冷启动基准")
+    parser.add_argument("--runs", type=int, default=5, help="轮数，每轮启动一个新进程")
+    parser.add_argument("--import-only", action="store_true", help="只测量导入，不加载引擎")
+    parser.add_argument("--import-budget", type=float, help="导入耗时预算（秒），超出时以状态码 1 退出")
+    args = parser.parse_args(argv)
+
+    report = run_startup(args.runs, not args.import_only, args.import_budget)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+from py_iztro import Astro
+from py_iztro.analytics import ChartTable
+from py_iztro.space import NatalInputSpace
+
+
+def main():
+    astro = Astro()
+    space = NatalInputSpace("2000-8-1", "2000-8-10")
+    charts = [astro.by_solar(*space[i]) for i in range(len(space))]
+    table = ChartTable.from_charts(charts)
+
+    # 与逐个遍历星盘的结果对照
+    def star(chart, name):
+        for palace in chart.palaces:
+            for s in (*palace.major_stars, *palace.minor_stars, *palace.adjective_stars):
+                if s.name == name:
+                    return palace, s
+        return None, None
+
+    expected = sum(star(chart, "紫微")[0].name == "命宫" for chart in charts)
+    print(int(table.star_mask("紫微", palace="命宫").sum()), expected)
+    expected = sum(star(chart, "太阳")[1].brightness == "旺" for chart in charts)
+    print(int(table.star_mask("太阳", brightness="旺").sum()), expected)
+    expected = sum(chart.five_elements_class == "木三局" for chart in charts)
+    print(int(table.where("five_elements_class", "木三局").sum()), expected)
+
+    print(table.value_counts("five_elements_class"))
+    print(table.share(table.mutagen_mask("忌", "疾厄")))
+
+    # 取值写错时报错，而不是匹配所有没有亮度的星曜
+    try:
+        table.star_mask("天魁", brightness="妙")
+    except ValueError as e:
+        print(e)
+
+
+if __name__ == "__main__":
+    main()
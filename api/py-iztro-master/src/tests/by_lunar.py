@@ -0,0 +1,14 @@
+from py_iztro import Astro
+
+
+def main():
+    astro = Astro(cache_size=1024)
+    # 2023年闰二月初十
+    lunar = astro.by_lunar("2023-2-10", 2, "女", is_leap_month=True)
+    solar = astro.by_solar("2023-03-31", 2, "女")
+    print(lunar.solar_date, lunar.lunar_date)
+    print(lunar is solar, astro.cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from py_iztro import Astro
+from py_iztro.horoscope_tables import HoroscopeTimeline
+from py_iztro.solar_terms import jie_moment
+
+LAYERS = ("decadal", "age", "yearly", "monthly", "daily", "hourly")
+
+
+def main():
+    astro = Astro()
+    charts = [
+        astro.by_solar("2000-8-16", 2, "女"),
+        astro.by_solar("1985-2-4", 12, "男"),
+        astro.by_solar("1962-11-30", 0, "女"),
+    ]
+
+    # 每个节的交节当天的每个时辰，以及前后一天的早子时、晚子时，
+    # 覆盖流年按立春分界、流月按交节时刻分界、晚子时换日、童限与大限的切换
+    targets = []
+    for year in (1963, 1990, 2025):
+        for index in range(12):
+            jie = jie_moment(year, index).date()
+            targets += [(jie, range(13)), (jie - timedelta(days=1), (0, 12)), (jie + timedelta(days=1), (0, 12))]
+
+    total = 0
+    mismatches = dict.fromkeys(LAYERS, 0)
+    for chart in charts:
+        timeline = HoroscopeTimeline(chart)
+        for target, time_indexes in targets:
+            target_date = f"{target.year}-{target.month}-{target.day}"
+            for time_index in time_indexes:
+                expected = chart.horoscope(target_date, time_index)
+                items = timeline.horoscope(target_date, time_index)
+                total += 1
+                for layer in LAYERS:
+                    if items[layer].model_dump() != getattr(expected, layer).model_dump():
+                        mismatches[layer] += 1
+                        print(chart.solar_date, target_date, time_index, layer)
+    print(total, mismatches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from py_iztro import Astro
+
+
+def main():
+    astro = Astro(cache_size=1024, js_handle_limit=8)
+    charts = [astro.by_solar(f"2000-8-{day}", 2, "女") for day in range(1, 29)]
+    # 只保留最近的 8 个 JS 对象，较早的星盘计算运限时重新创建
+    print(charts[0].horoscope("2024-1-1", 3).yearly.heavenly_stem)
+    print(astro.memory_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from py_iztro import Astro
+from py_iztro.reverse_index import ReverseIndex, StarCondition
+from py_iztro.space import NatalInputSpace
+
+
+def main():
+    space = NatalInputSpace("2000-8-1", "2000-8-31")
+    index = ReverseIndex.build(Astro(), space, progress=lambda done, total: print(f"\r{done}/{total}", end=""))
+    print()
+
+    condition = StarCondition("紫微", palace="命宫")
+    print(index.count(condition))
+    for natal_input in index.inputs(condition, StarCondition("武曲", mutagen="权")):
+        print(natal_input)
+
+
+if __name__ == "__main__":
+    main()
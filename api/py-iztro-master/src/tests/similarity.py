@@ -0,0 +1,18 @@
+from py_iztro import Astro
+from py_iztro.similarity import ChartCorpus
+from py_iztro.space import NatalInputSpace
+
+
+def main():
+    astro = Astro()
+    corpus = ChartCorpus.build(astro, NatalInputSpace("2000-8-1", "2000-8-31"))
+
+    reference = astro.by_solar("2000-8-16", 2, "女")
+    for match in corpus.search(reference, k=5):
+        print(match)
+    for match in corpus.search(reference, k=5, metric="hamming"):
+        print(match)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+API 测试，在 api 目录下运行：python -m unittest discover -s tests -t .
+"""
@@ -0,0 +1,114 @@
+"""
+Redis 协议远程缓存与近端缓存测试，使用本地替身服务，不依赖外部 Redis
+"""
+import time
+import unittest
+
+from app.services.cache_backends import CacheBackend, NearCacheBackend, RedisCacheBackend
+from app.utils.resp_server import RespStandInServer
+
+# 包含 RESP 分隔符、空字节与非 UTF-8 字节的值，确认按二进制安全传输
+BINARY_VALUE = b"\x00\xff\r\n$-1\r\n*2\r\n" + bytes(range(256))
+
+
+class RedisCacheBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.server = RespStandInServer().start()
+        self.backend = RedisCacheBackend(self.server.url, prefix="test:", timeout=0.5, retry_interval=0.5)
+
+    def tearDown(self):
+        self.backend.close()
+        self.server.stop()
+
+    def test_get_many_set_many(self):
+        self.backend.set_many([("a", b"1"), ("b", b"2"), ("c", b"3")])
+        self.assertEqual(self.backend.get_many(["a", "missing", "c", "b"]), [b"1", None, b"3", b"2"])
+        self.assertEqual(self.backend.get_many([]), [])
+        stats = self.backend.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["errors"]), (3, 1, 0))
+        # 批量写入与批量读取各只有一次网络往返
+        self.assertEqual(stats["round_trips"], 2)
+
+    def test_prefix_and_delete(self):
+        self.backend.set("key", b"value")
+        self.assertEqual(self.server.store.execute("GET", [b"test:key"]), b"value")
+        self.backend.delete("key")
+        self.assertIsNone(self.backend.get("key"))
+
+    def test_ttl_expiry(self):
+        self.backend.set_many([("short", b"x")], ttl=1)
+        self.backend.set("forever", b"y")
+        self.assertEqual(self.backend.get("short"), b"x")
+        time.sleep(1.2)
+        self.assertEqual(self.backend.get_many(["short", "forever"]), [None, b"y"])
+
+    def test_binary_values(self):
+        self.backend.set_many([("binary", BINARY_VALUE), ("empty", b"")])
+        self.assertEqual(self.backend.get_many(["binary", "empty"]), [BINARY_VALUE, b""])
+
+    def test_server_down_fallback(self):
+        self.backend.set("key", b"value")
+        self.server.stop()
+        # 远程服务不可用时按未命中处理，不抛出异常，写入也只记录错误
+        self.assertEqual(self.backend.get_many(["key", "other"]), [None, None])
+        self.backend.set("key", b"new")
+        stats = self.backend.stats()
+        self.assertEqual(stats["errors"], 1)
+        self.assertFalse(stats["available"])
+
+        # 暂停期间不再连接，之后重新尝试，服务恢复后可以继续读写
+        self.server = RespStandInServer(port=int(self.server.server_address[1])).start()
+        self.assertIsNone(self.backend.get("key"))
+        time.sleep(0.6)
+        self.backend.set("key", b"back")
+        self.assertEqual(self.backend.get("key"), b"back")
+        self.assertTrue(self.backend.stats()["available"])
+
+
+class NearCacheBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.server = RespStandInServer().start()
+        self.remote = RedisCacheBackend(self.server.url, prefix="test:", timeout=0.5, retry_interval=60)
+        self.backend = NearCacheBackend(self.remote, local_size=16, local_ttl=60)
+
+    def tearDown(self):
+        self.backend.close()
+        self.server.stop()
+
+    def test_reads_through_and_fills_local(self):
+        other = RedisCacheBackend(self.server.url, prefix="test:")
+        other.set_many([("a", b"1"), ("b", BINARY_VALUE)])
+        other.close()
+
+        self.assertEqual(self.backend.get_many(["a", "b", "c"]), [b"1", BINARY_VALUE, None])
+        round_trips = self.remote.round_trips
+        # 近端缓存命中的键不再访问远程，只有未命中的键发往远程
+        self.assertEqual(self.backend.get_many(["a", "b"]), [b"1", BINARY_VALUE])
+        self.assertEqual(self.remote.round_trips, round_trips)
+        self.backend.get_many(["a", "c"])
+        self.assertEqual(self.remote.round_trips, round_trips + 1)
+
+    def test_writes_both_levels(self):
+        self.backend.set_many([("k", b"v")], ttl=30)
+        self.assertEqual(self.backend.local.get("k"), b"v")
+        self.assertEqual(self.remote.get("k"), b"v")
+
+    def test_local_hits_survive_remote_outage(self):
+        self.backend.set("k", b"v")
+        self.server.stop()
+        self.assertEqual(self.backend.get_many(["k", "missing"]), [b"v", None])
+        self.assertFalse(self.backend.stats()["available"])
+
+
+class CacheBackendInterfaceTest(unittest.TestCase):
+    def test_abstract_methods_required(self):
+        class Incomplete(CacheBackend):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+if __name__ == "__main__":
+    unittest.main()
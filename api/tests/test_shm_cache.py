@@ -0,0 +1,126 @@
+"""
+共享内存结果缓存的并发写入测试
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from unittest import mock
+
+from app.utils import shm_cache
+from app.utils.shm_cache import SharedMemoryCache, _SEQ
+
+SLOT_SIZE = 256
+WAYS = 8
+# 只有一组，所有键的写入都落在同一组上
+SINGLE_SET_SIZE = 64 + 8 + WAYS * SLOT_SIZE
+WRITES = 300
+
+
+class _SlowHeader:
+    """写入槽位头时先让出线程"""
+
+    def __init__(self, header):
+        self._header = header
+
+    def unpack_from(self, *args):
+        return self._header.unpack_from(*args)
+
+    def pack_into(self, *args):
+        time.sleep(0.0005)
+        self._header.pack_into(*args)
+
+
+def _open(name: str) -> SharedMemoryCache:
+    return SharedMemoryCache(name, size=SINGLE_SET_SIZE, slot_size=SLOT_SIZE, ways=WAYS)
+
+
+def _write_keys(name: str, worker: int, writes: int):
+    """子进程：不断写入新键，与其他进程争用同一组的槽位"""
+    cache = _open(name)
+    try:
+        with mock.patch.object(shm_cache, "_SLOT_HEADER", _SlowHeader(shm_cache._SLOT_HEADER)):
+            for i in range(writes):
+                cache.set(f"p{worker}-{i}", f"{worker}:{i}".encode())
+    finally:
+        cache.close()
+
+
+class SharedMemoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.name = f"iztro-test-{uuid.uuid4().hex[:12]}"
+        self.cache = _open(self.name)
+
+    def tearDown(self):
+        self.cache.unlink()
+        self.cache.close()
+        os.unlink(os.path.join(tempfile.gettempdir(), f"{self.name}.lock"))
+
+    def _sequences(self):
+        return [_SEQ.unpack_from(self.cache._buf, self.cache._slot_offset(0, way))[0] for way in range(WAYS)]
+
+    def test_concurrent_threads(self):
+        def write(worker):
+            barrier.wait()
+            for i in range(WRITES):
+                # 每次写入新键，多个线程会同时选中同一个空槽位或淘汰同一个槽位
+                self.cache.set(f"k{worker}-{i}", f"{worker}:{i}".encode())
+
+        barrier = threading.Barrier(4)
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        # 写入槽位头时让出线程，放大序列号加一与加二之间的窗口
+        with mock.patch.object(shm_cache, "_SLOT_HEADER", _SlowHeader(shm_cache._SLOT_HEADER)):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertTrue(all(seq % 2 == 0 for seq in self._sequences()), self._sequences())
+        for worker in range(4):
+            self.cache.set(f"k{worker}", b"value")
+        for worker in range(4):
+            self.assertEqual(self.cache.get(f"k{worker}"), b"value")
+
+    def test_concurrent_processes(self):
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=_write_keys, args=(self.name, worker, WRITES)) for worker in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertTrue(all(seq % 2 == 0 for seq in self._sequences()), self._sequences())
+        for worker in range(3):
+            self.cache.set(f"p{worker}", b"value")
+        for worker in range(3):
+            self.assertEqual(self.cache.get(f"p{worker}"), b"value")
+
+    def test_odd_sequence_recovered_by_next_write(self):
+        self.cache.set("key", b"old")
+        # 模拟写入中途崩溃留下的奇数序列号
+        way = next(way for way in range(WAYS) if self._sequences()[way])
+        offset = self.cache._slot_offset(0, way)
+        _SEQ.pack_into(self.cache._buf, offset, _SEQ.unpack_from(self.cache._buf, offset)[0] + 1)
+        self.assertIsNone(self.cache.get("key"))
+
+        self.cache.set("key", b"new")
+        self.assertEqual(self.cache.get("key"), b"new")
+        self.assertEqual(self._sequences()[way] % 2, 0)
+
+    def test_shared_between_instances(self):
+        other = _open(self.name)
+        try:
+            other.set("key", b"value")
+            self.assertEqual(self.cache.get("key"), b"value")
+            self.assertIsNone(self.cache.get("missing"))
+            self.assertFalse(self.cache.set("big", bytes(SLOT_SIZE)))
+        finally:
+            other.close()
+
+
+if __name__ == "__main__":
+    unittest.main()